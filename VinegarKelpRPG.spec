@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets'), ('ui', 'ui'), ('screens', 'screens'), ('config.py', '.')],
+    datas=[('assets', 'assets'), ('ui', 'ui'), ('screens', 'screens'), ('data', 'data'), ('config.py', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -7,4 +7,6 @@ TILESET_COLUMNS = 8
 MAP_CSV = "assets/maps/rustic_map01.csv"
 TILESET_IMAGE = "assets/maps/rustic_tileset.png"
 PLAYER_SPEED = 2.0
+MOVE_CELLS_PER_SEC = 8.0   # マップ移動の速さ（1秒に何マス）
+FIXED_TIMESTEP = 1 / 60    # 移動の更新刻み（秒）
 BG = (0.07, 0.08, 0.09, 1.0)
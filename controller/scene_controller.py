@@ -1,40 +1,198 @@
 # controller/scene_controller.py
 
+from kivy.clock import Clock
 from kivy.uix.screenmanager import ScreenManager
-from screens.title import TitleScreen
-from screens.town import TownScreen
-from screens.field import FieldScreen
-from screens.battle import BattleScreen
+from systems.assets.texture_cache import texture_cache
 from systems.audio.bgm_manager import BgmManager
 from systems.battle.battle_controller import BattleController
+from systems.battle.enemy_repository import EnemyDataError, EnemyRepository
+from systems.events.events_loader import EventManager
+from systems.input.dispatcher import input_dispatcher
+from systems.maps.encounters import EncounterService
+from systems.maps.exploration import ExplorationStore
+from systems.rng import rng_service
+from systems.save.save_data import (
+    TAG_EXPLORATION, TAG_PLAYER, TAG_POSITION, TAG_RNG,
+    MapPosition, encode_player, encode_positions, encode_rng,
+)
+from systems.save.save_manager import SaveManager
+from systems.startup_profiler import profiler
 from entities.status import Status
 from pathlib import Path
-import json
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+SAVE_PATH = BASE_DIR / "saves" / "slot1.sav"
+
+# セーブに「今いる画面」として書く画面（戦闘中・タイトルは、その前にいたマップで再開する）
+RESUMABLE_SCREENS = ("town", "field", "dungeon")
+# 入るとプレイヤーが全回復する画面
+HEAL_SCREENS = ("town",)
+
+
+# 画面は最初に遷移したときに作る（import もそのとき）。
+# import は関数の中に直接書いておく（PyInstaller が静的に見つけられるように）
+def _title_screen():
+    from screens.title import TitleScreen
+    return TitleScreen(name="title")
+
+
+def _town_screen():
+    from screens.town import TownScreen
+    return TownScreen(name="town")
+
+
+def _field_screen():
+    from screens.field import FieldScreen
+    return FieldScreen(name="field")
+
+
+def _battle_screen():
+    from screens.battle import BattleScreen
+    return BattleScreen(name="battle")
+
+
+def _dungeon_screen():
+    from screens.dungeon import DungeonScreen
+    return DungeonScreen(name="dungeon")
+
+
+SCREEN_FACTORIES = {
+    "title": _title_screen,
+    "town": _town_screen,
+    "field": _field_screen,
+    "battle": _battle_screen,
+    "dungeon": _dungeon_screen,
+}
 
 
 class SceneController(ScreenManager):
     def __init__(self, **kwargs):
+        self._factories = dict(SCREEN_FACTORIES)
         super().__init__(**kwargs)
 
         self.bgm = BgmManager()
 
+        # 敵データは起動時に1回だけ読む（壊れていればここで気付ける）
+        # 読めなければ警告だけ出して、敵なし（エンカウントなし）で起動する
+        enemies_path = BASE_DIR / "data" / "input" / "enemies.json"
+        try:
+            self.enemies = EnemyRepository(enemies_path)
+        except (OSError, ValueError, EnemyDataError) as e:
+            print(f"[WARN] enemy table load failed: {enemies_path} ({e}); encounters are disabled")
+            self.enemies = EnemyRepository.empty(enemies_path)
+        self.encounters = EncounterService(self.enemies)
+        # マップのイベント（NPC・看板など）は、そのマップに初めて入ったときに読む
+        self.events = EventManager()
+        # 行ったマスの記録（マップごとに1マス1bit。地図・ミニマップ・踏破率はここを読む）
+        self.exploration = ExplorationStore()
+
+        # プレイヤーは1人ぶんをずっと持つ（戦闘で減ったHPは次へ持ち越す。町に入ると全回復）
+        self.player = Status(name="Hero", max_hp=30, attack=8, defense=2)
+        self.resume_screen = "town"
+        # セーブから戻す位置（その画面が作られたときに渡す）
+        self._resume_positions: dict[str, MapPosition] = {}
+
+        # セーブ: 画面が切り替わるたびに、変わったセクションがあれば裏のスレッドで書く
+        self.saves = SaveManager(SAVE_PATH)
+        self.saves.add_section(TAG_PLAYER, lambda: encode_player(self.player))
+        self.saves.add_section(TAG_POSITION, self._encode_positions)
+        self.saves.add_section(TAG_EXPLORATION, self.exploration.to_blob, lambda: self.exploration.version)
+        self.saves.add_section(TAG_RNG, lambda: encode_rng(rng_service.snapshot()))
+        self._load_save()
+
         self.bgm_paths = {
             "town": "assets/sounds/fantasy_town.mp3",
             "field": "assets/sounds/fantasy_everyday.mp3",
             "battle_default": "assets/sounds/battle.mp3",
         }
 
-        self.add_widget(TitleScreen(name="title"))
-        self.add_widget(TownScreen(name="town"))
-        self.add_widget(FieldScreen(name="field"))
-        self.add_widget(BattleScreen(name="battle"))
+        # キー入力は InputDispatcher が Window に1回だけ bind し、表示中の画面へだけ配る
+        input_dispatcher.install(self)
 
+        # ここで作られるのはタイトルだけ（他の画面は get_screen で初めて頼まれたとき）
         self.current = "title"
+
+        # 敵画像は最初のフレームを出した後に先読みしておく（戦闘突入時のデコード待ちをなくす）
+        Clock.schedule_once(lambda dt: texture_cache.prewarm(self.enemies.image_paths()), 0)
+        # BGM も裏のスレッドで先読み（戦闘BGMが最優先。無いファイルはここで覚えて以後は見に行かない）
+        Clock.schedule_once(lambda dt: self.bgm.preload(self._bgm_preload_paths()), 0)
     
     
+    # ----------------------------
+    # 画面の遅延生成
+    # ----------------------------
+    def get_screen(self, name):
+        """登録済みならそれを、まだなら factory で作って登録してから返す"""
+        for screen in self.screens:
+            if screen.name == name:
+                return screen
+        factory = self._factories.pop(name, None)
+        if factory is None:
+            return super().get_screen(name)  # 知らない名前は ScreenManager と同じ例外
+        with profiler.section("screen", name):
+            screen = factory()
+        self.add_widget(screen)
+        position = self._resume_positions.pop(name, None)
+        if position is not None and hasattr(screen, "restore_position"):
+            screen.restore_position(position)
+        return screen
+
+    def has_screen(self, name):
+        return name in self._factories or super().has_screen(name)
+
+    def on_current(self, instance, value):
+        super().on_current(instance, value)
+        # 町が回復ポイント（宿屋の代わり）。HP はフィールドの戦闘をまたいで持ち越す
+        if value in HEAL_SCREENS:
+            self.player.heal_full()
+        if value in RESUMABLE_SCREENS:
+            self.resume_screen = value
+        # 画面の切り替えごとにオートセーブ（変わっていなければ何も書かない）
+        if value != "title":
+            self.saves.autosave()
+
+    # ----------------------------
+    # セーブ
+    # ----------------------------
+    def _load_save(self) -> None:
+        save = self.saves.load()
+        if save is None:
+            return
+        if save.player is not None:
+            self.player = save.player
+        if save.screen in RESUMABLE_SCREENS:
+            self.resume_screen = save.screen
+        self._resume_positions = dict(save.positions)
+        if save.exploration is not None:
+            try:
+                self.exploration.load_blob(save.exploration)
+            except Exception as e:
+                print(f"[WARN] exploration data in save is broken ({e})")
+        if save.rng is not None:
+            rng_service.restore(save.rng)
+
+    def _encode_positions(self) -> bytes:
+        positions = dict(self._resume_positions)
+        for screen in self.screens:
+            save_position = getattr(screen, "save_position", None)
+            position = save_position() if save_position is not None else None
+            if position is not None:
+                positions[screen.name] = position
+        return encode_positions(self.resume_screen, positions)
+
+    def save_game(self) -> None:
+        """今すぐ書いて、書き終わるまで待つ（アプリを閉じるとき）"""
+        self.saves.save_now()
+
+    def _bgm_preload_paths(self) -> list[str]:
+        return [
+            self.bgm_paths["battle_default"],
+            self.bgm_paths["town"],
+            self.bgm_paths["field"],
+            *self.enemies.bgm_paths(),
+        ]
+
     def play_screen_bgm(self, screen_name: str):
         if screen_name == "town":
             self.bgm.play(self.bgm_paths["town"])
@@ -51,7 +209,7 @@ class SceneController(ScreenManager):
         controller = BattleController(player=player, enemy=enemy)
 
         # 2) BattleScreen取得（ScreenManagerに登録済み前提）
-        battle_screen: BattleScreen = self.get_screen("battle")  # nameは登録名に合わせる
+        battle_screen = self.get_screen("battle")  # nameは登録名に合わせる
 
         # 3) DI接着して遷移
         battle_screen.set_battle(controller=controller, enemy_info=enemy_info)
@@ -60,26 +218,20 @@ class SceneController(ScreenManager):
         battle_bgm = None
         if enemy_info:
             battle_bgm = enemy_info.get("bgm")
-        if not battle_bgm:
+        # 曲が無い敵（ファイルが見つからない・読めなかった）は、いつもの戦闘BGMにする
+        if not battle_bgm or self.bgm.is_missing(battle_bgm):
             battle_bgm = self.bgm_paths["battle_default"]
             
         self.bgm.play(battle_bgm)
         self.current = "battle"
 
     def load_enemy_status(self, enemy_id: str):
-        data_path = BASE_DIR / "data" / "input" / "enemies.json"
-        data = json.loads(data_path.read_text(encoding="utf-8"))
-        info = data[enemy_id]
-
-        status = Status(
-            name=info["name"],
-            max_hp=info["max_hp"],
-            attack=info["attack"],
-            defense=info.get("defense", 0),
-        )
-        return status, info        
+        # ディスクは読まない（EnemyRepository のひな形から作る）
+        return self.enemies.load(enemy_id)
             
             
     def get_player_status(self) -> Status:
-    # 今は最小固定（あとでセーブや成長に差し替え可能）
-        return Status(name="Hero", max_hp=30, attack=8, defense=2)
\ No newline at end of file
+        """ずっと同じ Status を返す（HP は戦闘をまたいで持ち越す。町に入るか、倒れていたら全回復）"""
+        if self.player.is_dead:
+            self.player.heal_full()
+        return self.player
\ No newline at end of file
@@ -1,56 +1,167 @@
 # controller.py
 # プレイヤーの入力（キーボード操作）とキャラクターの挙動を制御するモジュールです。
+#
+# キーを押した回数（OSのキーリピート）ではなく「押されている間」だけ動かします。
+# 移動は Clock の固定タイムステップで進め、マスとマスの間はなめらかに補間しますわ。
+
+from __future__ import annotations
+
+from collections import deque
+
+from config import FIXED_TIMESTEP, MOVE_CELLS_PER_SEC
+
+# 方向名 → (dx, dy)。Kivyは上がプラス
+DIRECTIONS = {
+    "up": (0, 1),
+    "down": (0, -1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+# Kivyのキーコード → 方向名（矢印キーと WASD）
+# 273=Up, 274=Down, 276=Left, 275=Right / 119=w, 115=s, 97=a, 100=d
+KEY_DIRECTIONS = {
+    273: "up", 119: "up",
+    274: "down", 115: "down",
+    276: "left", 97: "left",
+    275: "right", 100: "right",
+}
+
+
+def _direction_to(dx: int, dy: int) -> str | None:
+    for name, delta in DIRECTIONS.items():
+        if delta == (dx, dy):
+            return name
+    return None
+
 
 class PlayerController:
     """
     プレイヤーの入力を受け取り、移動やアクション（決定キーなど）を制御します。
+
+    map_widget に求めるもの（MapWidget が持っています）:
+        px, py            : 今いるマス（論理位置。到着した時点で更新）
+        can_walk(x, y)    : そのマスへ歩けるか
+        on_arrive()       : 1マス歩き終えたとき（歩数・画面遷移・エンカウント）
     """
-    def __init__(self, player_entity, game_instance):
-        self.player = player_entity
-        self.game = game_instance
-        # 押されているキーの状態を管理します
-        self.active_keys = set()
 
-    def update(self, dt):
+    def __init__(self, map_widget, cells_per_sec: float = MOVE_CELLS_PER_SEC):
+        self.map = map_widget
+        # 押されているキーの状態を管理します（後から押した方向が優先）
+        self.active_keys: list[str] = []
+        self.step_time = 1.0 / cells_per_sec
+        self.facing = "down"
+
+        # 移動中の補間用
+        self.moving = False
+        self._from = (0, 0)
+        self._to = (0, 0)
+        self._progress = 0.0
+        self._accum = 0.0
+
+        # 自動で歩く道順（pathfinding の結果。キーを押したら捨てます）
+        self._route: deque[tuple[int, int]] = deque()
+
+    # --- 入力 ---
+    def press(self, direction: str) -> None:
+        self._route.clear()
+        if direction in self.active_keys:
+            self.active_keys.remove(direction)
+        self.active_keys.append(direction)
+
+    def release(self, direction: str) -> None:
+        if direction in self.active_keys:
+            self.active_keys.remove(direction)
+
+    def stop(self) -> None:
+        """画面が切り替わったときなど。押しっぱなし状態と移動途中を捨てます。"""
+        self.active_keys.clear()
+        self._route.clear()
+        self.moving = False
+        self._progress = 0.0
+        self._accum = 0.0
+
+    def follow(self, path) -> None:
         """
-        毎フレーム呼び出され、キーの状態に応じてプレイヤーを動かします。
+        道順（今いるマスから始まるマスの列）に沿って歩かせます。
+        クリック移動や出口までの自動歩行用。途中でキーを押すとそちらが優先ですわ。
         """
-        # バトル中などは移動を制限しますわ
-        if self.game.mode != "field":
-            return
-
-        # キー入力に応じた移動量の計算
-        dx, dy = 0, 0
-        # Kivyのキーコード（環境に合わせて調整してくださいね）
-        # 276=Left, 275=Right, 273=Up, 274=Down
-        if 276 in self.active_keys: dx -= 1
-        if 275 in self.active_keys: dx += 1
-        if 273 in self.active_keys: dy += 1 # Kivyは上がプラス
-        if 274 in self.active_keys: dy -= 1
-
-        # 斜め移動の速度調整や、衝突判定をここから呼び出します
-        if dx != 0 or dy != 0:
-            self.move_player(dx, dy)
-
-    def move_player(self, dx, dy):
+        self._route = deque(path)
+        if self._route and self._route[0] == (self.map.px, self.map.py):
+            self._route.popleft()
+
+    @property
+    def idle(self) -> bool:
+        return not self.moving and not self.active_keys and not self._route
+
+    # --- 毎フレーム ---
+    def update(self, dt: float) -> None:
         """
-        衝突判定を確認した上で、プレイヤーの位置を更新します。
+        毎フレーム呼び出され、キーの状態に応じてプレイヤーを動かします。
+        フレームの長さがばらついても、固定の刻み（FIXED_TIMESTEP）で進めますわ。
         """
-        speed = self.game.player_speed
-        new_x = self.player.px + dx * speed
-        new_y = self.player.py + dy * speed
-
-        # rect_collides（main.py等にある判定関数）を使って安全を確認しますわ
-        from main import rect_collides
-        if not rect_collides(new_x, self.player.py, self.player.w, self.player.h, self.game.grid):
-            self.player.px = new_x
-        if not rect_collides(self.player.px, new_y, self.player.w, self.player.h, self.game.grid):
-            self.player.py = new_y
-
-    def handle_action(self):
+        # 処理落ちで何秒も止まったときに一気に進まないよう上限を付けます
+        self._accum += min(dt, 0.25)
+        while self._accum >= FIXED_TIMESTEP:
+            self._accum -= FIXED_TIMESTEP
+            self._step(FIXED_TIMESTEP)
+
+    def _step(self, h: float) -> None:
+        if self.moving:
+            self._progress += h / self.step_time
+            if self._progress < 1.0:
+                return
+            # 到着
+            self.moving = False
+            self._progress = 0.0
+            self.map.px, self.map.py = self._to
+            self.map.on_arrive()
+            if not self.active_keys and not self._route:
+                return
+
+        if self.active_keys:
+            self._begin_move(self.active_keys[-1])
+        elif self._route:
+            nx, ny = self._route.popleft()
+            direction = _direction_to(nx - self.map.px, ny - self.map.py)
+            if direction is None:
+                # 道順が途切れていたら（当たり判定が変わったなど）やめます
+                self._route.clear()
+                return
+            self._begin_move(direction)
+            if not self.moving:
+                self._route.clear()
+
+    def _begin_move(self, direction: str) -> None:
+        dx, dy = DIRECTIONS[direction]
+        self.facing = direction
+        nx, ny = self.map.px + dx, self.map.py + dy
+
+        # 衝突判定を確認した上で、移動を始めます
+        if self.map.can_walk(nx, ny):
+            self._from = (self.map.px, self.map.py)
+            self._to = (nx, ny)
+            self._progress = 0.0
+            self.moving = True
+
+    def render_cell(self) -> tuple[float, float]:
+        """描画用の位置（マス単位の小数）。移動中はマスの間を補間します。"""
+        if not self.moving:
+            return float(self.map.px), float(self.map.py)
+        t = self._progress
+        (fx, fy), (tx, ty) = self._from, self._to
+        return fx + (tx - fx) * t, fy + (ty - fy) * t
+
+    def handle_action(self) -> bool:
         """
         'E'キーなどが押された時の「調べる」動作を制御します。
+        向いているマスにイベントがあれば map.trigger_event() に渡して True を返しますわ。
         """
-        # 前方の座標を計算して、イベントがないか確認します
-        # event_manager.get_event(...) を呼び出すロジックですわね
-        pass
\ No newline at end of file
+        events = getattr(self.map, "events", None)
+        if events is None or self.moving:
+            return False
+        found = events.facing(self.map.px, self.map.py, self.facing)
+        if not found:
+            return False
+        self.map.trigger_event(found[0])
+        return True
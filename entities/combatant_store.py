@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+entities/combatant_store.py
+たくさんの戦闘キャラを「列ごとの配列」でまとめて持つ入れ物（struct-of-arrays）。
+
+- 1体ずつなら entities/status.py の Status で十分
+- 何百体も同時にシミュレーション・描画するときはこちら（1体あたり数十byte）
+- as_numpy() で NumPy 配列として（コピーせずに）見られるので、
+  systems/battle/damage.py の roll_damage_batch にそのまま渡せる
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Iterable
+
+from entities.status import Status
+
+
+class CombatantStore:
+    """Status の列（hp / max_hp / attack / defense）を array で持つ。"""
+
+    __slots__ = ("names", "max_hp", "hp", "attack", "defense")
+
+    def __init__(self):
+        self.names: list[str] = []
+        self.max_hp = array("i")
+        self.hp = array("i")
+        self.attack = array("i")
+        self.defense = array("i")
+
+    @classmethod
+    def from_statuses(cls, statuses: Iterable[Status]) -> "CombatantStore":
+        store = cls()
+        for status in statuses:
+            store.add(status)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, status: Status) -> int:
+        """1体追加して、その番号を返す。"""
+        self.names.append(status.name)
+        self.max_hp.append(status.max_hp)
+        self.hp.append(status.hp)
+        self.attack.append(status.attack)
+        self.defense.append(status.defense)
+        return len(self.names) - 1
+
+    def to_status(self, index: int) -> Status:
+        """1体ぶんを Status として取り出す（コピー）"""
+        return Status(self.names[index], self.max_hp[index], self.attack[index],
+                      self.defense[index], hp=self.hp[index])
+
+    def write_back(self, index: int, status: Status) -> None:
+        """戦闘後の HP を Status に戻す。"""
+        status.hp = self.hp[index]
+
+    # --- 状態判定 ---
+    def is_alive(self, index: int) -> bool:
+        return self.hp[index] > 0
+
+    def alive_indices(self) -> list[int]:
+        return [i for i, hp in enumerate(self.hp) if hp > 0]
+
+    # --- ダメージ処理 / 回復 ---
+    def take_damage(self, index: int, damage: int) -> int:
+        """実際に減ったHP量を返す（0未満にならない）。Status.take_damage と同じ。"""
+        before = self.hp[index]
+        self.hp[index] = max(0, before - max(0, int(damage)))
+        return before - self.hp[index]
+
+    def heal_all(self) -> None:
+        self.hp[:] = self.max_hp
+
+    def as_numpy(self) -> dict:
+        """
+        列を NumPy 配列として返す（メモリ共有。書き換えるとこちらにも反映される）
+        返した配列を持っている間は add() できない（array のサイズを変えられないため）
+        """
+        import numpy as np  # 任意（ゲーム本体は NumPy なしで動く）
+
+        return {
+            "max_hp": np.frombuffer(self.max_hp, dtype=np.int32),
+            "hp": np.frombuffer(self.hp, dtype=np.int32),
+            "attack": np.frombuffer(self.attack, dtype=np.int32),
+            "defense": np.frombuffer(self.defense, dtype=np.int32),
+        }
@@ -3,15 +3,18 @@
 entities/models.py
 プロジェクトで使う「登場人物データ」をここに集約する。
 - mainやfieldやbattleは、ここにある型を使うだけ（中身を増やしても影響が局所化する）
+- 実体は entities/status.py の Status（__slots__ 付き）1つだけ。
+  以前の Stats / Character / Player / Enemy はここから同じ Status を使う形に揃えた。
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
+from typing import NamedTuple
 
+from entities.status import Status
 
-@dataclass
-class Stats:
-    """戦闘に必要な数値。レベル上げ無しでも成立する最小セット。"""
+
+class Stats(NamedTuple):
+    """戦闘に必要な数値。レベル上げ無しでも成立する最小セット（Status のひな形・変更不可）。"""
     max_hp: int
     attack: int
     defense: int = 0
@@ -19,36 +22,27 @@ class Stats:
     def clamp_hp(self, hp: int) -> int:
         return max(0, min(self.max_hp, hp))
 
+    def create(self, name: str, cls: type[Status] = Status) -> Status:
+        return cls(name, self.max_hp, self.attack, self.defense)
 
-@dataclass
-class Character:
-    """プレイヤー/敵の共通部分。"""
-    name: str
-    stats: Stats
-    hp: int
 
-    @property
-    def is_dead(self) -> bool:
-        return self.hp <= 0
+# プレイヤー/敵の共通部分は Status そのもの
+Character = Status
 
-    def heal_full(self) -> None:
-        self.hp = self.stats.max_hp
 
-    def take_damage(self, dmg: int) -> int:
-        """実際に減ったHP量を返す（0未満にならない）。"""
-        dmg = max(0, int(dmg))
-        before = self.hp
-        self.hp = self.stats.clamp_hp(self.hp - dmg)
-        return before - self.hp
+class Player(Status):
+    """主人公。必要なら所持金や所持品を後で足せる（足すときは __slots__ にも書く）。"""
+    __slots__ = ()
 
 
-@dataclass
-class Player(Character):
-    """主人公。必要なら所持金や所持品を後で足せる。"""
-    pass
+class Enemy(Status):
+    """敵。行動AIの種類などを後で足せる。"""
+    __slots__ = ("ai_type",)
 
+    def __init__(self, name: str, max_hp: int, attack: int, defense: int = 0,
+                 hp: int | None = None, ai_type: str = "basic"):
+        super().__init__(name, max_hp, attack, defense, hp=hp)
+        self.ai_type = ai_type
 
-@dataclass
-class Enemy(Character):
-    """敵。行動AIの種類などを後で足せる。"""
-    ai_type: str = "basic"
+    def copy(self) -> "Enemy":
+        return Enemy(self.name, self.max_hp, self.attack, self.defense, hp=self.hp, ai_type=self.ai_type)
@@ -1,23 +1,47 @@
 # entities/status.py
+from __future__ import annotations
+
 
 class Status:
-    """キャラクターの基本ステータス（純粋データモデル）"""
+    """
+    キャラクターの基本ステータス（純粋データモデル）
+
+    プレイヤーも敵もこの1つの型を使う（entities/models.py の Player / Enemy もこれの子）。
+    __slots__ でインスタンスごとの __dict__ を持たないので、たくさん作っても軽い。
+    もっと大量に扱うときは entities/combatant_store.py（列ごとの配列）を使う。
+    """
+
+    __slots__ = ("name", "max_hp", "hp", "attack", "defense")
 
-    def __init__(self, name: str, max_hp: int, attack: int, defense: int):
+    def __init__(self, name: str, max_hp: int, attack: int, defense: int = 0, hp: int | None = None):
         self.name = name
         self.max_hp = max_hp
-        self.hp = max_hp
+        self.hp = max_hp if hp is None else hp
         self.attack = attack
         self.defense = defense
 
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(name={self.name!r}, max_hp={self.max_hp}, hp={self.hp}, "
+                f"attack={self.attack}, defense={self.defense})")
+
     # --- 状態判定 ---
     def is_alive(self) -> bool:
         return self.hp > 0
 
+    @property
+    def is_dead(self) -> bool:
+        return self.hp <= 0
+
     # --- ダメージ処理 ---
-    def take_damage(self, damage: int) -> None:
-        self.hp = max(0, self.hp - damage)
+    def take_damage(self, damage: int) -> int:
+        """実際に減ったHP量を返す（0未満にならない）。"""
+        before = self.hp
+        self.hp = max(0, self.hp - max(0, int(damage)))
+        return before - self.hp
 
     # --- 回復 ---
     def heal_full(self) -> None:
         self.hp = self.max_hp
+
+    def copy(self) -> "Status":
+        return type(self)(self.name, self.max_hp, self.attack, self.defense, hp=self.hp)
@@ -2,11 +2,14 @@
 # CSVマップの読み込みとタイル画像の分割を行います。
 
 import csv
-from kivy.core.image import Image as CoreImage
+import json
 from pathlib import Path
 
+from systems.assets.texture_cache import texture_cache
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+MAP_DATA_PATH = BASE_DIR / "data" / "maps" / "map_data.json"
 
 def load_csv_as_tilemap(path):
     """
@@ -29,10 +32,12 @@ def load_csv_as_tilemap(path):
 def load_tileset_regions():
     """
     タイルセット画像を読み込み、各タイルをテクスチャとして切り出します。
+    画像も切り出しも texture_cache が共有するので、何度呼んでもデコードは1回です。
     """
     # 実際のリソースパスに合わせて変更してください
     tileset_path = BASE_DIR / "assets" / "maps" / "rustic_tileset.png"
-    texture = CoreImage(str(tileset_path)).texture
+    if texture_cache.get(tileset_path) is None:
+        return {}
     ts = 32  # タイルサイズ（configからインポートしても良いです）
     
     # 1枚の画像から各タイルを切り出して辞書に保存します
@@ -41,6 +46,55 @@ def load_tileset_regions():
     # 本来はタイルセットの枚数に合わせてループを回します
     for i in range(10): 
         # get_region(x, y, width, height)
-        tiles[i] = texture.get_region(i * ts, 0, ts, ts)
+        tiles[i] = texture_cache.get_region(tileset_path, i * ts, 0, ts, ts)
     
-    return tiles
\ No newline at end of file
+    return tiles
+
+
+def load_tile_layer(map_name):
+    """
+    data/maps/map_data.json の "{map_name}_data" を読み込みます。
+    戻り値: {"tileset": Path, "tile_size": int, "tiles": 2次元リスト（上の行から順）}
+    無い・壊れている・タイルセット画像が無いときは None（落とさない）。
+    """
+    try:
+        data = json.loads(MAP_DATA_PATH.read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"[WARN] map data load failed: {MAP_DATA_PATH} ({e})")
+        return None
+
+    layer = data.get(f"{map_name}_data")
+    if not layer:
+        return None
+
+    tiles = layer.get("tiles") or []
+    if not tiles or any(len(row) != len(tiles[0]) for row in tiles):
+        print(f"[WARN] tile layer is empty or ragged: {map_name}")
+        return None
+
+    tileset = BASE_DIR / layer.get("tileset", "")
+    if texture_cache.get(tileset) is None:
+        return None
+
+    return {
+        "tileset": tileset,
+        "tile_size": int(layer.get("tile_size", 32)),
+        "tiles": tiles,
+    }
+
+
+def tile_region(tileset_path, tile_id, tile_size):
+    """
+    タイル番号（左上から右へ 0, 1, 2...）の切り出しを返します。
+    Kivyのテクスチャは下が y=0 なので、行は下から数え直します。
+    """
+    texture = texture_cache.get(tileset_path)
+    if texture is None or tile_id < 0:
+        return None
+    columns = max(1, texture.width // tile_size)
+    rows = max(1, texture.height // tile_size)
+    col, row = tile_id % columns, tile_id // columns
+    if row >= rows:
+        return None
+    y = texture.height - (row + 1) * tile_size
+    return texture_cache.get_region(tileset_path, col * tile_size, y, tile_size, tile_size)
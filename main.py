@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
+# 起動時間の計測（VKRPG_PROFILE_STARTUP=1 のときだけ）。他の import より先に入れる
+from systems.startup_profiler import profiler
+
+profiler.install_import_hook()
+
 from pathlib import Path
 
 from kivymd.app import MDApp
+from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.core.text import LabelBase
 from kivy.resources import resource_add_path
@@ -31,7 +37,17 @@ class MainApp(MDApp):
         except Exception:
             pass
 
-        return SceneController()
+        with profiler.section("build", "SceneController"):
+            return SceneController()
+
+    def on_start(self):
+        # タイトルの最初のフレームが出たところで表を出す
+        Clock.schedule_once(lambda dt: profiler.report("title screen"), 0)
+
+    def on_stop(self):
+        # 閉じる前に最後のセーブ（書き終わるまで待つ）
+        if self.root is not None:
+            self.root.save_game()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from kivy.uix.screenmanager import Screen
 
-from ui.battle_window import BattleWindow
 from systems.battle.battle_controller import BattleController
 
+if TYPE_CHECKING:
+    from ui.battle_window import BattleWindow
+
 
 class BattleScreen(Screen):
     """
@@ -28,7 +32,10 @@ class BattleScreen(Screen):
         self._controller = controller
 
         # BattleWindowは“表示の責務”だけ
+        # 最初の戦闘で初めて読む（KV・フォントの読み込みを起動時に払わない）
         if self._window is None:
+            from ui.battle_window import BattleWindow
+
             self._window = BattleWindow()
             self.clear_widgets()
             self.add_widget(self._window)
@@ -1,21 +1,29 @@
 # -*- coding: utf-8 -*-
 """
-目的: ダンジョン画面の下地。方位UI（コンパス）と現在地表示、キーボード入力の基本。
+目的: ダンジョン画面。方位UI（コンパス）と現在地表示、一人称の景色と上から見た地図。
 なぜ: 「どの方向を向いていて、どこにいるか」をUIで確かめられるようにするため。
 前提: Compassウィジェット（ui/widgets/compass.py）が使える。
-入出力: maps/dungeon_01.json（今回は読み込まず、テキストマップを生成）。
-副作用: キーボードフォーカス要求（Window.request_keyboard）。
-例外: 一部の環境ではフォーカスが取れずに入力が効かない場合あり。
+入出力: data/maps/dungeon_01.json（最初に入ったときに読む。無ければ10×10の箱庭を作る）。
+副作用: 表示中はキー入力を InputDispatcher から受け取る（systems/input/dispatcher.py）。
 """
-from kivy.core.window import Window
 from kivy.properties import NumericProperty, StringProperty
 from kivymd.uix.screen import MDScreen
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.label import MDLabel
 
+from systems.input.dispatcher import input_dispatcher
+from systems.maps.dungeon import FACING_DELTAS, load_dungeon
+from systems.maps.visibility import VisibilityTable
+from systems.save.save_data import MapPosition
 from ui.widgets.compass import Compass
+from ui.widgets.dungeon_grid import DungeonGridView
+from ui.widgets.first_person_view import FirstPersonView
+
+MAP_W, MAP_H = 10, 10  # ★ヒント: データが無いときは10×10の箱庭でOK！
+
+# 方向キー → 向き
+ACTION_FACING = {"up": "N", "down": "S", "left": "W", "right": "E"}
 
-MAP_W, MAP_H = 10, 10  # ★ヒント: まずは10×10の箱庭でOK！
 
 class DungeonScreen(MDScreen):
     # ★ヒント: プレイヤの現在地と向きをプロパティにしてUIと連動させる。
@@ -23,84 +31,106 @@ class DungeonScreen(MDScreen):
     y = NumericProperty(1)
     facing = StringProperty("N")
 
+    dungeon_name = "dungeon_01"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.dungeon = None
+        self.grid_view = None
+        self.view = None
+        self.exploration = None
+        # セーブから戻す位置（最初に入ったときに1回だけ使う）
+        self._resume: MapPosition | None = None
+
     def on_pre_enter(self, *args):
+        # 画面は最初の1回だけ作る（2回目からは今の位置のまま続ける）
+        if self.dungeon is None:
+            # ★ヒント: ダンジョンのデータは、ここで初めて読むよ（起動時には読まない）。
+            self.dungeon = load_dungeon(self.dungeon_name, fallback_size=(MAP_W, MAP_H))
+            self.x, self.y = self.dungeon.start
+            self.facing = self.dungeon.start_facing
+            resume, self._resume = self._resume, None
+            if resume is not None and not self.dungeon.is_wall(resume.x, resume.y):
+                self.x, self.y = resume.x, resume.y
+                self.facing = resume.facing or self.facing
+            if self.manager is not None and hasattr(self.manager, "exploration"):
+                self.exploration = self.manager.exploration.get(
+                    self.dungeon.name, self.dungeon.width, self.dungeon.height
+                )
+            self._build()
+
+        # --- STEP3: キーボード（WASD/矢印） ---
+        # キーは InputDispatcher が「up」「left」などの名前にして届けてくれるよ。
+        input_dispatcher.register(self.name, self)
+
+    def _build(self):
         self.clear_widgets()
 
         # --- STEP1: 上部HUD（方位 + 現在地） ---
         root = MDBoxLayout(orientation="vertical", padding="12dp", spacing="8dp")
         hud = MDBoxLayout(orientation="horizontal", spacing="8dp", size_hint_y=None, height="48dp")
         self.compass = Compass(direction=self.facing)  # ★ヒント: directionが変わると表示が更新されるよ。
-        self.status = MDLabel(text=self._status_text(), halign="left")
+        self.status = MDLabel(text="", halign="left")
         hud.add_widget(self.compass)
         hud.add_widget(self.status)
 
-        # --- STEP2: マップ（今回はテキストでOK） ---
-        self.map_label = MDLabel(text=self._map_ascii(), halign="left")
+        # --- STEP2: 一人称の景色（左）+ 上から見た地図（右） ---
+        # ★ヒント: 「どの壁が見えるか」はここで全部のマス・向きぶん計算しておくよ。
+        body = MDBoxLayout(orientation="horizontal", spacing="8dp")
+        self.view = FirstPersonView(VisibilityTable(self.dungeon), size_hint_x=0.65)
+        self.view.show(self.x, self.y, self.facing)
+        # 画面ごと動く（遷移のスライドなど）ときも、一人称の切り取り範囲を合わせる
+        self.bind(pos=self.view.update_scissor)
+        # 地図は1マス=1ピクセルの絵。動いたマスと、新しく見えたマスだけ描き直す（オートマップ）
+        self.grid_view = DungeonGridView(self.dungeon, self.exploration, size_hint_x=0.35)
+        self.grid_view.set_player(self.x, self.y)
+        self.status.text = self._status_text()
+        body.add_widget(self.view)
+        body.add_widget(self.grid_view)
         root.add_widget(hud)
-        root.add_widget(self.map_label)
+        root.add_widget(body)
         self.add_widget(root)
 
-        # --- STEP3: キーボード（WASD/矢印） ---
-        # フォーカスが必要。ウィンドウを一度クリックしてから押すとうまくいくことが多いよ！
-        self._keyboard = Window.request_keyboard(self._kb_closed, self, 'text')
-        if self._keyboard:
-            self._keyboard.bind(on_key_down=self._on_key_down)
+    def on_leave(self, *args):
+        input_dispatcher.unregister(self.name, self)
 
-    # フォーカス解除時
-    def _kb_closed(self):
-        self._keyboard = None
+    def accepts_input(self, action):
+        return action in ACTION_FACING
 
-    def on_leave(self, *args):
-        if getattr(self, "_keyboard", None):
-            self._keyboard.unbind(on_key_down=self._on_key_down)
-            self._keyboard = None
-
-    def _on_key_down(self, *args):
-        # args: (keyboard, keycode, text, modifiers)
-        _, keycode, text, modifiers = args
-        key = keycode[1]
-
-        # ★ヒント: このif分岐を読み解こう！自分で elif を書き足しても良い。
-        dx = dy = 0
-        if key in ("up", "w"):
-            dy = -1; self.facing = "N"
-        elif key in ("down", "s"):
-            dy = 1; self.facing = "S"
-        elif key in ("left", "a"):
-            dx = -1; self.facing = "W"
-        elif key in ("right", "d"):
-            dx = 1; self.facing = "E"
-        else:
-            return False  # 他のキーは無視
-
-        # ★ヒント: まずは範囲チェックだけ。壁の当たり判定は次回やってみよう。
+    def on_input(self, action, pressed):
+        if not pressed:
+            return
+
+        # ★ヒント: キーの名前 → 向き → (dx, dy) の順に表を引くだけ。
+        self.facing = ACTION_FACING[action]
+        dx, dy = FACING_DELTAS[self.facing]
+
+        # ★ヒント: 壁のマスには入れない（範囲外も壁あつかい）。
         nx, ny = self.x + dx, self.y + dy
-        if 0 <= nx < MAP_W and 0 <= ny < MAP_H:
+        if not self.dungeon.is_wall(nx, ny):
             self.x, self.y = nx, ny
 
         self._refresh_hud()
-        return True
+
+    # --- セーブ ---
+    def save_position(self):
+        if self.dungeon is None:
+            return self._resume
+        return MapPosition(self.x, self.y, self.facing)
+
+    def restore_position(self, position):
+        self._resume = position
 
     # --- ヘルパ群 ---
     def _refresh_hud(self):
-        self.status.text = self._status_text()
         self.compass.direction = self.facing
-        self.map_label.text = self._map_ascii()
+        self.grid_view.set_player(self.x, self.y)
+        self.status.text = self._status_text()
+        self.view.show(self.x, self.y, self.facing)
 
     def _status_text(self):
-        return f"Pos: ({self.x},{self.y})  Facing: {self.facing}"
-
-    def _map_ascii(self):
-        # ★ヒント: '#'が壁、'.'が通路、'P'がプレイヤ。
-        rows = []
-        for j in range(MAP_H):
-            row = []
-            for i in range(MAP_W):
-                if i == self.x and j == self.y:
-                    row.append("P")
-                elif i in (0, MAP_W-1) or j in (0, MAP_H-1):
-                    row.append("#")
-                else:
-                    row.append(".")
-            rows.append("".join(row))
-        return "\\n".join(rows)
+        text = f"Pos: ({self.x},{self.y})  Facing: {self.facing}"
+        if self.exploration is not None:
+            # 踏破率（見えた壁も数える。全部歩けば 100% 近くになる）
+            text += f"  Map: {self.exploration.completion():.0%}"
+        return text
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from pathlib import Path
+
+from kivymd.uix.screen import MDScreen
+
+from field.map_loader_kivy import load_tile_layer
+from systems.maps.collision import load_collision_csv
+from systems.maps.region_stream import open_world
+from systems.save.save_data import MapPosition
+from ui.message_window import MessageWindow
+from ui.widgets.map_widget import MapWidget
+from ui.widgets.minimap import Minimap
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # プロジェクト直下想定
+
+
+class MapScreen(MDScreen):
+    """
+    MapScreen（Town / Field 共通の器）
+    - assets/maps/{map_name}_view.png（見た目）
+    - assets/maps/{map_name}_collision.csv（0/1の当たり判定）
+    を読み、MapWidgetに注入する（DI）
+    data/maps/map_data.json に "{map_name}_data"（タイル）があれば、1枚絵の代わりにタイルで描く
+
+    data/events/{map_name}.json のイベント（NPC・看板など）も MapWidget に渡し、
+    起きたイベントのセリフは MessageWindow で出す。
+
+    行ったマスの記録（SceneController.exploration）もマップ名で引いて渡す。
+    画面を出入りしても記録は SceneController に残るので、霧は晴れたまま。
+
+    右上にミニマップ（ui/widgets/minimap.py）を重ねる。地図の絵は当たり判定から1回だけ作り、
+    1歩ごとに動かすのは現在地の印だけ（MapWidget の on_player_cell で受け取る）。
+    まだ行っていない所は隠し、新しく行った四角だけ晴らす（on_explored で受け取る）。
+
+    world_dir を指定すると、当たり判定は分割済みワールド（systems/maps/region_stream.py）から
+    プレイヤーの周りだけを読む。画面遷移なしで端から端まで歩ける大きいマップ用。
+
+    セーブ: save_position() で今の位置と歩数を返し、restore_position() で次に入ったときの位置を決める。
+
+    再利用モード（reuse_map=True）:
+        MapWidget は最初の1回だけ作り、2回目以降は reset() で位置と歩数だけ戻す。
+        keep_position=True なら前回いた場所から続ける。
+    """
+
+    map_name = ""
+    start_cell: tuple[int, int] | None = None
+    reuse_map = True
+    keep_position = False
+    world_dir = ""  # 例: "data/worlds/overworld"（プロジェクト直下からの相対パス）
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._map: MapWidget | None = None
+        self._message: MessageWindow | None = None
+        self._minimap: Minimap | None = None
+        # セーブから戻す位置（次に入ったときに1回だけ使う）
+        self._resume: MapPosition | None = None
+
+    def on_pre_enter(self, *args):
+        maps_dir = BASE_DIR / "assets" / "maps"
+        if self.world_dir:
+            collision = open_world(BASE_DIR / self.world_dir)
+        else:
+            collision = load_collision_csv(maps_dir / f"{self.map_name}_collision.csv")
+
+        # エンカウント表（enemies.json / encounters.json から前計算したもの）
+        encounters = None
+        if self.manager is not None and hasattr(self.manager, "encounters"):
+            encounters = self.manager.encounters.table(self.map_name)
+        events = None
+        if self.manager is not None and hasattr(self.manager, "events"):
+            events = self.manager.events.map(self.map_name)
+        exploration = None
+        if collision is not None and self.manager is not None and hasattr(self.manager, "exploration"):
+            exploration = self.manager.exploration.get(self.map_name, collision.width, collision.height)
+
+        start_cell, keep_position = self.start_cell, self.keep_position
+        resume, self._resume = self._resume, None
+        if resume is not None:
+            start_cell, keep_position = (resume.x, resume.y), False
+
+        if self.reuse_map and self._map is not None:
+            self._map.set_collision(collision)
+            self._map.encounters = encounters
+            self._map.events = events
+            # 先にミニマップを合わせる（この後の reset で出る on_explored を受け取れるように）
+            self._minimap.set_grid(collision)
+            self._minimap.set_exploration(exploration)
+            self._map.set_exploration(exploration)
+            self._map.reset(start_cell=start_cell, keep_position=keep_position)
+            if resume is not None:
+                self._map.steps = resume.steps
+            return
+
+        self._map = MapWidget(
+            view_path=maps_dir / f"{self.map_name}_view.png",
+            collision=collision,
+            start_cell=start_cell,
+            encounters=encounters,
+            tile_layer=load_tile_layer(self.map_name),
+            events=events,
+            exploration=exploration,
+        )
+        if resume is not None:
+            self._map.steps = resume.steps
+        self._map.bind(on_map_event=self._on_map_event)
+        if self._minimap is None:
+            self._minimap = Minimap(size_hint=(None, None), size=("160dp", "128dp"),
+                                    pos_hint={"right": 0.98, "top": 0.98})
+        # ミニマップの霧は、MapWidget が最初の印を付けた後の記録から作る
+        self._minimap.set_grid(collision)
+        self._minimap.set_exploration(exploration)
+        self._minimap.set_player(self._map.px, self._map.py)
+        self._map.bind(on_player_cell=self._on_player_cell, on_explored=self._on_explored)
+        self.clear_widgets()
+        self.add_widget(self._map)
+        self.add_widget(self._minimap)
+
+    def save_position(self) -> MapPosition | None:
+        if self._map is None:
+            return self._resume
+        return MapPosition(self._map.px, self._map.py, steps=self._map.steps)
+
+    def restore_position(self, position: MapPosition) -> None:
+        self._resume = position
+
+    def _on_player_cell(self, map_widget, x, y):
+        self._minimap.set_player(x, y)
+
+    def _on_explored(self, map_widget, area):
+        self._minimap.reveal(area)
+
+    def _on_map_event(self, map_widget, event):
+        if not event.lines:
+            return
+        if self._message is None:
+            self._message = MessageWindow()
+        map_widget.show_message(self._message, event.lines)
@@ -21,6 +21,8 @@ class TitleScreen(MDScreen):
         self.add_widget(layout)
 
     def go_town(self, *args):
-        self.manager.current = "town"
+        # セーブがあれば、その画面から続ける（無ければ Town）
+        screen = getattr(self.manager, "resume_screen", "town")
+        self.manager.current = screen
         if hasattr(self.manager, "play_screen_bgm"):
-            self.manager.play_screen_bgm("town")
\ No newline at end of file
+            self.manager.play_screen_bgm(screen)
\ No newline at end of file
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+systems/assets/texture_cache.py
+画像テクスチャをプロセス全体で共有するキャッシュ。
+
+- キーは画像の絶対パス。同じ画像は何か所から頼まれても1回しかデコードしない
+- 切り出し（get_region）も親テクスチャと一緒に覚えておく
+  切り出しは親テクスチャの一部を指すだけ（GPUのメモリを増やさない）ので、予算には数えない
+- 合計サイズ（親テクスチャの幅×高さ×4byte）が予算を超えたら、古く使われたものから捨てる（LRU）
+  親を捨てるときは、その切り出しも一緒に捨てる
+- 見つからない画像も覚えておき、毎回ディスクを見に行かない
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+
+from kivy.core.image import Image as CoreImage
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+DEFAULT_BUDGET_BYTES = 96 * 1024 * 1024
+
+
+class _Entry:
+    __slots__ = ("texture", "nbytes", "regions")
+
+    def __init__(self, texture, nbytes: int):
+        self.texture = texture
+        self.nbytes = nbytes
+        self.regions: dict[tuple[int, int, int, int], object] = {}
+
+
+class TextureCache:
+    """パス → テクスチャ の LRU キャッシュ（予算はバイト数）"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._missing: set[str] = set()
+
+    @staticmethod
+    def _key(path) -> str:
+        p = Path(path)
+        if not p.is_absolute():
+            p = BASE_DIR / p
+        return str(p.resolve())
+
+    def get(self, path):
+        """テクスチャを返す。読めなければ None（落とさない）"""
+        if not path:
+            return None
+        key = self._key(path)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry.texture
+
+        if key in self._missing:
+            return None
+
+        texture = self._decode(key)
+        if texture is None:
+            self._missing.add(key)
+            return None
+
+        entry = _Entry(texture, texture.width * texture.height * 4)
+        self._entries[key] = entry
+        self.used_bytes += entry.nbytes
+        self._evict()
+        return texture
+
+    def get_region(self, path, x: int, y: int, width: int, height: int):
+        """画像の一部（タイルなど）を返す。親テクスチャを共有する。"""
+        texture = self.get(path)
+        if texture is None:
+            return None
+
+        entry = self._entries.get(self._key(path))
+        if entry is None:
+            # get() の直後なので普通は必ずある（念のため、覚えずに切り出しだけ返す）
+            return texture.get_region(x, y, width, height)
+
+        rect = (x, y, width, height)
+        region = entry.regions.get(rect)
+        if region is None:
+            region = texture.get_region(x, y, width, height)
+            entry.regions[rect] = region
+        return region
+
+    def prewarm(self, paths) -> None:
+        """先にまとめて読み込んでおく（戦闘開始時のデコード待ちを減らす）
+        例: texture_cache.prewarm(EnemyRepository().image_paths())
+        """
+        for path in paths:
+            self.get(path)
+
+    def discard(self, path) -> None:
+        key = self._key(path)
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.used_bytes -= entry.nbytes
+        self._missing.discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._missing.clear()
+        self.used_bytes = 0
+
+    def _decode(self, key: str):
+        if not Path(key).exists():
+            print(f"[WARN] image not found: {key}")
+            return None
+        try:
+            # Kivy 側のキャッシュとは二重に持たない
+            return CoreImage(key, nocache=True).texture
+        except Exception as e:
+            print(f"[WARN] image load failed: {key} ({e})")
+            return None
+
+    def _evict(self) -> None:
+        # 数えるのは親テクスチャの nbytes だけ（切り出しは 0 byte あつかい。親と一緒に消える）
+        # 最後に入れた1枚は残す（予算より大きくても今すぐ使うため）
+        while self.used_bytes > self.budget_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.used_bytes -= entry.nbytes
+            entry.regions.clear()
+
+
+# プロセスで1つだけ使う
+texture_cache = TextureCache()
@@ -1,50 +1,269 @@
 # -*- coding: utf-8 -*-
+"""
+systems/audio/bgm_manager.py
+BGMを1本だけ鳴らすマネージャ。
+
+- ファイルの確認と読み出し（ディスク待ち）は裏のスレッドで行い、Sound を作る SoundLoader.load は
+  メインスレッドで呼ぶ（Kivy の音声プロバイダは、スレッドから作ってよいとは限らないため）。
+  裏で一度読んだファイルは OS のキャッシュに載るので、メインスレッドの load はディスクを待たない
+- 読んだ曲は少しだけ覚えておく（町 ⇔ フィールド ⇔ 戦闘の行き来で読み直さない）
+- 見つからない曲も覚えておき、毎回ディスクを見に行かない
+- 曲の切り替えはクロスフェード（Clock で音量を少しずつ動かす）
+- kivy.core.audio（音声ライブラリの初期化）は最初に曲を頼まれたときに読む（起動を軽くする）
+"""
 from __future__ import annotations
 
-from kivy.core.audio import SoundLoader
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from kivy.clock import Clock
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# 覚えておく曲の数（鳴っている曲・フェード中の曲は数に関係なく捨てない）
+CACHE_SIZE = 4
+FADE_SECONDS = 0.6
+_FADE_INTERVAL = 1 / 30
 
 
 class BgmManager:
-    """BGMを1本だけ管理する簡易マネージャ"""
+    """BGMを1本だけ管理するマネージャ（裏読み + キャッシュ + クロスフェード）"""
 
-    def __init__(self):
+    def __init__(self, cache_size: int = CACHE_SIZE):
         self._sound = None
         self._current_path = ""
+        self._volume = 0.7
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, object]" = OrderedDict()
+        self._missing: set[str] = set()
+        self._pending: set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bgm")
+
+        # 読み終わったら鳴らしたい曲（後から別の曲を頼まれたら、そちらが優先）
+        self._wanted: tuple[str, float, float] | None = None
+
+        # クロスフェード
+        self._fade_event = None
+        # (曲, 始めの音量, 目標の音量) / [(曲, 始めの音量)]。始めの音量はフェードを始めた時点の音量
+        self._fade_in: tuple[object, float, float] | None = None
+        self._fade_out: list[tuple[object, float]] = []
+        self._fade_t = 0.0
+        self._fade_duration = 0.0
+
+    @staticmethod
+    def _key(path) -> str:
+        p = Path(path)
+        if not p.is_absolute():
+            p = BASE_DIR / p
+        return str(p.resolve())
+
+    # ----------------------------
+    # 読み込み（裏のスレッド → メインスレッド）
+    # ----------------------------
+    def preload(self, paths) -> None:
+        """曲を先に読んでおく（鳴らさない）。見つからない曲はここで覚える。"""
+        for path in paths:
+            if path:
+                self._request(self._key(path))
+
+    def is_missing(self, path) -> bool:
+        """鳴らせないと分かっている曲なら True（ファイルが無い・前に読めなかった）"""
+        key = self._key(path)
+        if key in self._missing:
+            return True
+        if key in self._cache or key in self._pending:
+            return False
+        if not Path(key).exists():
+            print(f"[BGM] not found: {key}")
+            self._missing.add(key)
+            return True
+        return False
+
+    @staticmethod
+    def _read_ahead(key: str) -> None:
+        """裏のスレッドで動く。ファイルを最後まで読んで捨てる（読めなければ OSError）"""
+        with open(key, "rb") as f:
+            while f.read(1 << 20):
+                pass
+
+    def _request(self, key: str) -> bool:
+        """読み込みを頼む。もう読んである/読んでいる途中なら何もしない。読めない曲なら False。"""
+        if self.is_missing(key):
+            return False
+        if key in self._cache or key in self._pending:
+            return True
+        self._pending.add(key)
+        future = self._executor.submit(self._read_ahead, key)
+        future.add_done_callback(lambda f, key=key: Clock.schedule_once(lambda dt: self._loaded(key, f), 0))
+        return True
+
+    def _loaded(self, key: str, future) -> None:
+        """メインスレッドで呼ばれる（Sound はここで作る）"""
+        from kivy.core.audio import SoundLoader
+
+        self._pending.discard(key)
+        try:
+            future.result()
+            sound = SoundLoader.load(key)
+        except Exception as e:
+            print(f"[BGM] load failed: {key} ({e})")
+            sound = None
+        if not sound:
+            self._missing.add(key)
+            if self._wanted is not None and self._wanted[0] == key:
+                self._wanted = None
+            return
+
+        try:
+            sound.loop = True
+        except Exception:
+            pass
+        self._cache[key] = sound
+        self._evict()
+
+        if self._wanted is not None and self._wanted[0] == key:
+            _, volume, fade = self._wanted
+            self._wanted = None
+            self._start(key, sound, volume, fade)
 
-    def play(self, path: str | None, volume: float = 0.7) -> None:
+    def _evict(self) -> None:
+        in_use = {id(self._sound)} | {id(s) for s, _ in self._fade_out}
+        for key in list(self._cache):
+            if len(self._cache) <= self.cache_size:
+                break
+            sound = self._cache[key]
+            if id(sound) in in_use:
+                continue
+            del self._cache[key]
+            try:
+                sound.unload()
+            except Exception:
+                pass
+
+    # ----------------------------
+    # 再生
+    # ----------------------------
+    def play(self, path: str | None, volume: float = 0.7, fade: float = FADE_SECONDS) -> None:
+        """
+        path の曲に切り替える。読み込み前なら裏で読み、読めた時点でフェードインする
+        （待っている間は前の曲をフェードアウトしておく）。
+        """
         if not path:
-            self.stop()
+            self.stop(fade=fade)
             return
 
+        key = self._key(path)
+
         # 同じ曲なら再生し直さない
-        if self._current_path == path and self._sound:
+        if self._current_path == key and self._sound:
             if self._sound.state != "play":
                 self._sound.play()
             return
 
-        self.stop()
+        sound = self._cache.get(key)
+        if sound is not None:
+            self._cache.move_to_end(key)
+            self._wanted = None
+            self._start(key, sound, volume, fade)
+            return
 
-        sound = SoundLoader.load(path)
-        if not sound:
-            print(f"[BGM] load failed: {path}")
+        if not self._request(key):
+            # 見つからない曲: 前の曲は止める（別の画面で前の曲が鳴り続けないように）
+            self.stop(fade=fade)
             return
 
-        sound.volume = volume
+        self._wanted = (key, volume, fade)
+        self._fade_to(None, volume, fade)
+
+    def _start(self, key: str, sound, volume: float, fade: float) -> None:
+        self._fade_to(sound, volume, fade)
+        self._current_path = key
+        print(f"[BGM] playing: {key}")
+
+    def stop(self, fade: float = 0.0) -> None:
+        self._wanted = None
+        if fade > 0:
+            self._fade_to(None, self._volume, fade)
+            return
+        self._cancel_fade()
+        for sound, _ in self._fade_out:
+            self._silence(sound)
+        self._fade_out = []
+        if self._sound:
+            self._silence(self._sound)
+        self._sound = None
+        self._current_path = ""
+
+    @staticmethod
+    def _silence(sound) -> None:
         try:
-            sound.loop = True
+            sound.stop()
         except Exception:
             pass
 
-        sound.play()
+    # ----------------------------
+    # クロスフェード
+    # ----------------------------
+    def _fade_to(self, sound, volume: float, fade: float) -> None:
+        """今の曲をフェードアウトし、sound（None なら無音）をフェードインする"""
+        # フェードの途中で次のフェードを始めるときは、今の音量から続ける（音量が跳ねないように）
+        self._fade_out = [(s, s.volume) for s, _ in self._fade_out]
+        if self._sound is not None and self._sound is not sound:
+            self._fade_out.append((self._sound, self._sound.volume))
+        if sound is None:
+            self._current_path = ""
         self._sound = sound
-        self._current_path = path
-        print(f"[BGM] playing: {path}")
+        self._volume = volume
 
-    def stop(self) -> None:
-        if self._sound:
-            try:
-                self._sound.stop()
-            except Exception:
-                pass
-        self._sound = None
-        self._current_path = ""
\ No newline at end of file
+        if sound is not None:
+            # フェードアウト中の曲に戻るときは、その音量から上げる
+            fading = any(s is sound for s, _ in self._fade_out)
+            self._fade_out = [(s, v) for s, v in self._fade_out if s is not sound]
+            start = sound.volume if fading else 0.0
+            sound.volume = start if fade > 0 else volume
+            if sound.state != "play":
+                sound.play()
+            self._fade_in = (sound, start, volume)
+        else:
+            self._fade_in = None
+
+        if fade <= 0:
+            self._finish_fade()
+            return
+        self._fade_t = 0.0
+        self._fade_duration = fade
+        if self._fade_event is None:
+            self._fade_event = Clock.schedule_interval(self._fade_step, _FADE_INTERVAL)
+
+    def _fade_step(self, dt) -> bool:
+        self._fade_t += dt
+        t = min(1.0, self._fade_t / self._fade_duration)
+        if self._fade_in is not None:
+            sound, start, target = self._fade_in
+            sound.volume = start + (target - start) * t
+        for sound, start in self._fade_out:
+            sound.volume = start * (1.0 - t)
+        if t < 1.0:
+            return True
+        self._fade_event = None
+        self._finish_fade()
+        return False
+
+    def _finish_fade(self) -> None:
+        self._cancel_fade()
+        if self._fade_in is not None:
+            sound, _, target = self._fade_in
+            sound.volume = target
+            self._fade_in = None
+        for sound, _ in self._fade_out:
+            self._silence(sound)
+        self._fade_out = []
+        self._evict()
+
+    def _cancel_fade(self) -> None:
+        if self._fade_event is not None:
+            self._fade_event.cancel()
+            self._fade_event = None
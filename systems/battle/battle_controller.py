@@ -1,12 +1,17 @@
 ﻿# systems/battle/battle_controller.py
 
 from __future__ import annotations
-import random
-from typing import TypedDict, Literal, Optional
+from collections import deque
+from typing import Iterator, TypedDict, Literal, Optional
 from entities.status import Status
+from systems.battle.damage import roll_damage
+from systems.rng import RngStream, rng_service
 
 Target = str
 
+# 会心: 20% で 2倍（倍率は damage.py。simulation.py もこの値を使う）
+CRITICAL_RATE = 0.2
+
 class BattleLog(TypedDict):
     text: str
     damage: int
@@ -15,22 +20,22 @@ class BattleLog(TypedDict):
 
 
 class BattleController:
-    def __init__(self, player: Status, enemy: Status):
+    def __init__(self, player: Status, enemy: Status, rng: RngStream | None = None):
         self.player = player
         self.enemy = enemy
+        # 乱数は注入できる（省略時は共有サービスの "battle" ストリーム）
+        self._rng = rng or rng_service.stream("battle")
         self._winner: Optional[str] = None
-        self._log_queue: list[BattleLog] = []
+        # 先頭から取り出すので deque（list.pop(0) は O(n)）
+        self._log_queue: deque[BattleLog] = deque()
 
     def start(self) -> None:
         self._winner = None
         self._log_queue.clear()
 
     def _calc_damage(self, attacker: Status, defender: Status) -> tuple[int, bool]:
-        base = max(1, attacker.attack - defender.defense)
-        critical = (random.random() < 0.2)  # 20%
-        if critical:
-            base *= 2
-        return base, critical
+        # 計算式は damage.roll_damage（まとめて版 roll_damage_batch と同じ結果になる）
+        return roll_damage(attacker.attack, defender.defense, self._rng, crit_rate=CRITICAL_RATE)
 
     def take_turn(self) -> None:
         if self.is_finished():
@@ -67,11 +72,32 @@ class BattleController:
     def has_log(self) -> bool:
         return len(self._log_queue) > 0
 
+    def pending_logs(self) -> int:
+        return len(self._log_queue)
+
     def pop_log(self) -> BattleLog | None:
         if self._log_queue:
-            return self._log_queue.pop(0)
+            return self._log_queue.popleft()
         return None
 
+    def drain(self, n: int | None = None) -> list[BattleLog]:
+        """
+        ログをまとめて取り出す。
+        n=None なら全部（早送り・オートバトル用）、n=1 なら pop_log と同じ。
+        """
+        queue = self._log_queue
+        if n is None or n >= len(queue):
+            logs = list(queue)
+            queue.clear()
+            return logs
+        return [queue.popleft() for _ in range(max(0, n))]
+
+    def iter_logs(self) -> Iterator[BattleLog]:
+        """取り出しながら1件ずつ返す（途中で止めれば残りはキューに残る）"""
+        queue = self._log_queue
+        while queue:
+            yield queue.popleft()
+
     def is_finished(self) -> bool:
         return self._winner is not None
 
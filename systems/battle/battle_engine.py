@@ -1,28 +1,31 @@
 # systems/battle/battle_engine.py
 # 戦闘の計算ロジックを管理するモジュールです。
 
-import random
+from entities.status import Status
+from systems.battle.damage import roll_damage
+from systems.rng import rng_service
 
-def player_attack(player, enemy):
+def player_attack(player: Status, enemy: Status, rng=None) -> int:
     """
     プレイヤーが敵に攻撃した時のダメージ計算です。
+    rng を省略すると乱数サービスの "battle" ストリームを使います。
     """
+    rng = rng or rng_service.stream("battle")
     # 基本ダメージ = 攻撃力 - 防御力（最低1ダメージ）
-    base_damage = max(1, player.attack - enemy.defense)
-    # 少しのランダム要素（乱数）を加えます
-    actual_damage = base_damage + random.randint(0, 2)
+    # 少しのランダム要素（0〜2 の乱数）を加えます（計算式は damage.roll_damage）
+    actual_damage, _ = roll_damage(player.attack, enemy.defense, rng, variance=2)
     
     enemy.hp -= actual_damage
     if enemy.hp < 0:
         enemy.hp = 0
     return actual_damage
 
-def enemy_attack(enemy, player):
+def enemy_attack(enemy: Status, player: Status, rng=None) -> int:
     """
     敵がプレイヤーに攻撃した時のダメージ計算です。
     """
-    base_damage = max(1, enemy.attack - player.defense)
-    actual_damage = base_damage + random.randint(0, 1)
+    rng = rng or rng_service.stream("battle")
+    actual_damage, _ = roll_damage(enemy.attack, player.defense, rng, variance=1)
     
     player.hp -= actual_damage
     if player.hp < 0:
@@ -34,15 +37,16 @@ class BattleEngine:
     戦闘の1ターン進行を管理するクラス
     """
 
-    def __init__(self, player, enemy):
+    def __init__(self, player: Status, enemy: Status, rng=None):
         self.player = player
         self.enemy = enemy
+        self.rng = rng or rng_service.stream("battle")
         self._is_finished = False
         self._result = None
 
     def process_turn(self):
         # 1) player attack
-        dmg = player_attack(self.player, self.enemy)
+        dmg = player_attack(self.player, self.enemy, self.rng)
         log = f"{self.player.name}のこうげき！{self.enemy.name}に {dmg} ダメージ！"
 
         if self.enemy.hp <= 0:
@@ -51,7 +55,7 @@ class BattleEngine:
             return log
 
         # 2) enemy attack
-        dmg2 = enemy_attack(self.enemy, self.player)
+        dmg2 = enemy_attack(self.enemy, self.player, self.rng)
         log += f"\n{self.enemy.name}のこうげき！{self.player.name}は {dmg2} ダメージ！"
 
         if self.player.hp <= 0:
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+systems/battle/damage.py
+ダメージ計算を1か所にまとめたモジュール（1発ずつ版 と まとめて版）。
+
+計算のルール（1発ぶん）:
+    1) 基本ダメージ = max(1, 攻撃力 - 防御力)
+    2) crit_rate > 0 なら 乱数を1つ使い、crit_rate 未満なら会心（×CRITICAL_MULTIPLIER）
+    3) variance > 0 なら 乱数を1つ使い、0〜variance のブレを足す
+
+乱数は必ず「会心 → ブレ」の順に1発ずつ使う。
+なので roll_damage_batch は、同じ状態の random.Random で roll_damage を
+C順（行ごと）に呼んだのとビット単位で同じ結果になり、呼んだ後の乱数の状態も同じになる。
+
+roll_damage_batch だけ NumPy を使う（無ければ RuntimeError。ゲーム本体は NumPy なしで動く）。
+"""
+from __future__ import annotations
+
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy はオフラインのバランス調整用（必須ではない）
+    np = None
+
+
+CRITICAL_MULTIPLIER = 2
+
+
+def roll_damage(attack: int, defense: int, rng=random, *,
+                crit_rate: float = 0.0, variance: int = 0) -> tuple[int, bool]:
+    """1発ぶんのダメージを計算して (ダメージ, 会心か) を返す。"""
+    damage = max(1, attack - defense)
+
+    critical = False
+    if crit_rate > 0:
+        critical = rng.random() < crit_rate
+        if critical:
+            damage *= CRITICAL_MULTIPLIER
+
+    if variance > 0:
+        # randint(0, variance) と同じ範囲（0〜variance の一様）
+        damage += int(rng.random() * (variance + 1))
+
+    return damage, critical
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("roll_damage_batch needs NumPy (pip install numpy)")
+
+
+def _to_numpy_state(rng: random.Random):
+    """random.Random と同じ状態の numpy.random.RandomState を作る（どちらも MT19937）"""
+    version, internal, gauss_next = rng.getstate()
+    keys = np.array(internal[:-1], dtype=np.uint32)
+    state = np.random.RandomState()
+    state.set_state(("MT19937", keys, internal[-1], 0, 0.0))
+    return state, version, gauss_next
+
+
+def _draw_uniforms(rng, count: int):
+    """rng.random() を count 回呼んだのと同じ値を配列で返す。rng の状態も進める。"""
+    if count == 0:
+        return np.empty(0, dtype=np.float64)
+
+    if hasattr(rng, "as_random"):
+        # systems.rng.RngStream: バッファ位置に合わせた Random を使う
+        rng = rng.as_random()
+
+    if isinstance(rng, random.Random):
+        state, version, gauss_next = _to_numpy_state(rng)
+        values = state.random_sample(count)
+        _, keys, pos, _, _ = state.get_state()
+        rng.setstate((version, tuple(int(k) for k in keys) + (int(pos),), gauss_next))
+        return values
+
+    if isinstance(rng, np.random.Generator):
+        return rng.random(count)
+
+    # random モジュールそのもの等（状態を移せないので1つずつ）
+    return np.fromiter((rng.random() for _ in range(count)), dtype=np.float64, count=count)
+
+
+def roll_damage_batch(attacks, defenses, rng=None, *,
+                      crit_rate: float = 0.0, variance: int = 0):
+    """
+    攻撃力と防御力の配列（NumPy のブロードキャスト）をまとめて計算する。
+    例: 3人 × 敵4体の総当たりなら roll_damage_batch(atk[:, None], dfn[None, :], rng)
+
+    rng:
+        random.Random / RngStream   -> roll_damage を順に呼んだのとビット単位で一致
+        numpy.random.Generator      -> 速いが random.Random とは別の乱数列
+        None                        -> random モジュールの共有状態を使う
+    戻り値: (damage: int64 配列, critical: bool 配列)
+    """
+    _require_numpy()
+    if rng is None:
+        rng = random._inst  # random.random() と同じ共有インスタンス
+
+    atk, dfn = np.broadcast_arrays(np.asarray(attacks, dtype=np.int64),
+                                   np.asarray(defenses, dtype=np.int64))
+    shape = atk.shape
+    n = atk.size
+
+    damage = np.maximum(1, atk - dfn).reshape(n)
+
+    columns = int(crit_rate > 0) + int(variance > 0)
+    rolls = _draw_uniforms(rng, n * columns).reshape(n, columns)
+
+    col = 0
+    critical = np.zeros(n, dtype=bool)
+    if crit_rate > 0:
+        critical = rolls[:, col] < crit_rate
+        damage = np.where(critical, damage * CRITICAL_MULTIPLIER, damage)
+        col += 1
+
+    if variance > 0:
+        damage = damage + np.floor(rolls[:, col] * (variance + 1)).astype(np.int64)
+
+    return damage.reshape(shape), critical.reshape(shape)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+systems/battle/enemy_repository.py
+enemies.json を1回だけ読み、敵IDから Status を素早く作るための入れ物。
+
+- 読み込み時に表全体をチェックする（足りない項目は起動時に分かる）
+- Status は事前に作った「ひな形」（name, max_hp, attack, defense）から作る
+- ファイルが更新されたら読み直す（ホットリロード）。壊れていたら前の表のまま続ける
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+import json
+
+from entities.status import Status
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_ENEMIES_PATH = BASE_DIR / "data" / "input" / "enemies.json"
+
+
+class EnemyDataError(ValueError):
+    """enemies.json の中身がおかしいとき"""
+
+
+def _validate(data) -> dict[str, tuple[tuple[str, int, int, int], Mapping]]:
+    """表全体をチェックして (ひな形, 情報) の辞書を作る。問題はまとめて報告する。"""
+    if not isinstance(data, dict) or not data:
+        raise EnemyDataError("enemy table must be a non-empty object")
+
+    table = {}
+    problems = []
+    for enemy_id, info in data.items():
+        if not isinstance(info, dict):
+            problems.append(f"{enemy_id}: entry must be an object")
+            continue
+
+        name = info.get("name")
+        if not isinstance(name, str) or not name:
+            problems.append(f"{enemy_id}: 'name' must be a non-empty string")
+
+        numbers = {}
+        for field, default in (("max_hp", None), ("attack", None), ("defense", 0)):
+            value = info.get(field, default)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                problems.append(f"{enemy_id}: '{field}' must be an integer >= 0")
+            numbers[field] = value
+        if numbers["max_hp"] == 0:
+            problems.append(f"{enemy_id}: 'max_hp' must be > 0")
+
+        for field in ("image", "bgm"):
+            if field in info and not isinstance(info[field], str):
+                problems.append(f"{enemy_id}: '{field}' must be a string")
+
+        # 出現の重み（例: {"field": 3, "field/2": 1}）。systems/maps/encounters.py が使う
+        encounter = info.get("encounter", {})
+        if not isinstance(encounter, dict) or any(
+            not isinstance(w, (int, float)) or isinstance(w, bool) or w < 0 for w in encounter.values()
+        ):
+            problems.append(f"{enemy_id}: 'encounter' must map area names to weights >= 0")
+
+        template = (name, numbers["max_hp"], numbers["attack"], numbers["defense"])
+        table[enemy_id] = (template, MappingProxyType(dict(info)))
+
+    if problems:
+        raise EnemyDataError("invalid enemy table:\n  " + "\n  ".join(problems))
+    return table
+
+
+class EnemyRepository:
+    """敵IDの表（1回読み込み + 変更時だけ読み直し）"""
+
+    def __init__(self, path: Path = DEFAULT_ENEMIES_PATH):
+        self.path = Path(path)
+        self._stamp: tuple[int, int] | None = None
+        # 読み直すたびに増える（前計算したもの＝エンカウント表などの作り直し判定用）
+        self.version = 0
+        self._table: dict[str, tuple[tuple[str, int, int, int], Mapping]] = {}
+        # 最初の読み込みは失敗したら例外（起動時に気付けるように）
+        self._load(self._current_stamp())
+
+    @classmethod
+    def empty(cls, path: Path = DEFAULT_ENEMIES_PATH) -> "EnemyRepository":
+        """
+        敵が1体もいない表（最初の読み込みに失敗したとき用。エンカウントは起きない）。
+        ファイルが直されたら reload_if_changed で読み直す。
+        """
+        repository = cls.__new__(cls)
+        repository.path = Path(path)
+        repository.version = 0
+        repository._table = {}
+        repository._stamp = repository._current_stamp()
+        return repository
+
+    def _current_stamp(self) -> tuple[int, int] | None:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, stamp) -> None:
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self._table = _validate(data)
+        self._stamp = stamp
+        self.version += 1
+
+    def reload_if_changed(self) -> bool:
+        """ファイルが変わっていれば読み直す。読み直したら True。"""
+        stamp = self._current_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        try:
+            self._load(stamp)
+        except (OSError, ValueError) as e:
+            # 編集途中などで壊れていても、前の表のまま続ける
+            print(f"[WARN] enemy table reload failed: {self.path} ({e})")
+            self._stamp = stamp
+            return False
+        print(f"[ENEMY] reloaded: {self.path}")
+        return True
+
+    def __contains__(self, enemy_id: str) -> bool:
+        return enemy_id in self._table
+
+    def ids(self) -> tuple[str, ...]:
+        return tuple(self._table)
+
+    def info(self, enemy_id: str) -> Mapping:
+        """enemies.json の1件（読み取り専用）"""
+        return self._entry(enemy_id)[1]
+
+    def create_status(self, enemy_id: str) -> Status:
+        """ひな形から新しい Status を作る（戦闘ごとにHPは満タン）"""
+        return Status(*self._entry(enemy_id)[0])
+
+    def load(self, enemy_id: str) -> tuple[Status, Mapping]:
+        """SceneController.load_enemy_status と同じ形 (Status, info) で返す。"""
+        template, info = self._entry(enemy_id)
+        return Status(*template), info
+
+    def image_paths(self) -> list[str]:
+        return [info["image"] for _, info in self._table.values() if info.get("image")]
+
+    def bgm_paths(self) -> list[str]:
+        return sorted({info["bgm"] for _, info in self._table.values() if info.get("bgm")})
+
+    def encounter_weights(self) -> dict[str, list[tuple[str, float]]]:
+        """エリア名（"field" や "field/2"）→ [(敵ID, 重み), ...]。重み0は入れない。"""
+        areas: dict[str, list[tuple[str, float]]] = {}
+        for enemy_id, (_, info) in self._table.items():
+            for area, weight in info.get("encounter", {}).items():
+                if weight > 0:
+                    areas.setdefault(area, []).append((enemy_id, weight))
+        return areas
+
+    def _entry(self, enemy_id: str):
+        self.reload_if_changed()
+        try:
+            return self._table[enemy_id]
+        except KeyError:
+            raise KeyError(f"unknown enemy id: {enemy_id!r} (known: {', '.join(self._table)})") from None
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+systems/battle/simulation.py
+画面なし（ヘッドレス）で戦闘を大量に回し、バランス調整の数字を出すモジュール。
+
+- ルールは BattleController.take_turn と同じ（プレイヤー先攻 / 最低1ダメージ / 会心20%で2倍）
+- Status は書き換えない。ログ文字列も作らない（整数だけで回す）
+- seed を渡せば結果は毎回同じ（乱数は random.Random を1つだけ使う）
+
+使い方（プロジェクト直下で python -m systems.battle.simulation でも回せる）:
+    result = simulate_battles(Status("Hero", 30, 8, 2), "goblin", 100_000, seed=1)
+    print(result.summary())
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+import random
+
+from entities.status import Status
+from systems.battle.battle_controller import CRITICAL_RATE
+from systems.battle.damage import CRITICAL_MULTIPLIER
+from systems.battle.enemy_repository import EnemyRepository
+
+
+@dataclass
+class SimulationResult:
+    """集計結果。分布は Counter（値 → 回数）で持つ。"""
+    battles: int = 0
+    wins: int = 0
+    # 決着までのターン数（勝ち / 負け 別）
+    win_turns: Counter = field(default_factory=Counter)
+    loss_turns: Counter = field(default_factory=Counter)
+    # 1発ごとのダメージ（与えた / 受けた）
+    damage_dealt: Counter = field(default_factory=Counter)
+    damage_taken: Counter = field(default_factory=Counter)
+    # 戦闘終了時のプレイヤー残りHP
+    player_hp_left: Counter = field(default_factory=Counter)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.battles if self.battles else 0.0
+
+    @property
+    def mean_turns_to_kill(self) -> float:
+        return _mean(self.win_turns)
+
+    def summary(self) -> str:
+        return (
+            f"battles={self.battles} win_rate={self.win_rate:.3%} "
+            f"turns_to_kill(mean)={self.mean_turns_to_kill:.2f} "
+            f"hit_dealt(mean)={_mean(self.damage_dealt):.2f} "
+            f"hit_taken(mean)={_mean(self.damage_taken):.2f}"
+        )
+
+
+def _mean(counter: Counter) -> float:
+    total = sum(counter.values())
+    if not total:
+        return 0.0
+    return sum(k * v for k, v in counter.items()) / total
+
+
+def simulate(player: Status, enemy: Status, n: int, *,
+             seed: int | None = None, rng: random.Random | None = None) -> SimulationResult:
+    """player 対 enemy を n 回戦わせる（どちらの Status も書き換えない）"""
+    rng = rng or random.Random(seed)
+    rand = rng.random
+
+    # 1発のダメージは「通常」と「会心」の2通りしかないので先に計算しておく
+    p_hit = max(1, player.attack - enemy.defense)
+    p_crit = p_hit * CRITICAL_MULTIPLIER
+    e_hit = max(1, enemy.attack - player.defense)
+    e_crit = e_hit * CRITICAL_MULTIPLIER
+    p_hp0 = player.hp
+    e_hp0 = enemy.hp
+    crit_rate = CRITICAL_RATE
+
+    wins = 0
+    win_turns: Counter = Counter()
+    loss_turns: Counter = Counter()
+    hp_left: Counter = Counter()
+    # ダメージ分布は「会心の回数」だけ数えれば復元できる
+    p_hits = p_crits = e_hits = e_crits = 0
+
+    for _ in range(n):
+        p_hp = p_hp0
+        e_hp = e_hp0
+        turns = 0
+        while True:
+            turns += 1
+
+            # --- プレイヤー攻撃 ---
+            p_hits += 1
+            if rand() < crit_rate:
+                p_crits += 1
+                e_hp -= p_crit
+            else:
+                e_hp -= p_hit
+            if e_hp <= 0:
+                wins += 1
+                win_turns[turns] += 1
+                break
+
+            # --- 敵反撃 ---
+            e_hits += 1
+            if rand() < crit_rate:
+                e_crits += 1
+                p_hp -= e_crit
+            else:
+                p_hp -= e_hit
+            if p_hp <= 0:
+                p_hp = 0
+                loss_turns[turns] += 1
+                break
+
+        hp_left[p_hp] += 1
+
+    result = SimulationResult(
+        battles=n,
+        wins=wins,
+        win_turns=win_turns,
+        loss_turns=loss_turns,
+        player_hp_left=hp_left,
+    )
+    result.damage_dealt.update({p_hit: p_hits - p_crits, p_crit: p_crits})
+    result.damage_taken.update({e_hit: e_hits - e_crits, e_crit: e_crits})
+    # 0回のキーは残さない
+    result.damage_dealt = +result.damage_dealt
+    result.damage_taken = +result.damage_taken
+    return result
+
+
+def simulate_battles(player: Status, enemy_id: str, n: int, *,
+                     seed: int | None = None, rng: random.Random | None = None,
+                     repository: EnemyRepository | None = None) -> SimulationResult:
+    """enemies.json の敵IDを指定して simulate する。"""
+    repository = repository or EnemyRepository()
+    return simulate(player, repository.create_status(enemy_id), n, seed=seed, rng=rng)
+
+
+if __name__ == "__main__":
+    import sys
+
+    hero = Status(name="Hero", max_hp=30, attack=8, defense=2)
+    repo = EnemyRepository()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for eid in repo.ids():
+        print(f"{eid:>8}: {simulate_battles(hero, eid, count, seed=0, repository=repo).summary()}")
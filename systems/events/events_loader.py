@@ -1,50 +1,247 @@
-# events/loader.py
-# マップ上のイベント（看板、NPC、宝箱など）を管理・読み込みするモジュールです。
+# -*- coding: utf-8 -*-
+"""
+systems/events/events_loader.py
+マップ上のイベント（看板、NPC、宝箱など）を読み込み、場所から素早く引けるようにするモジュールです。
+
+- 置き場所: data/events/{map_name}.json（マップごと。初めてそのマップに入ったときに読む）
+      [{"id": "npc_first", "type": "talk", "npc": "first_npc", "x": 10, "y": 22},
+       {"id": "gate", "type": "message", "x": 37, "y": 20, "h": 6, "trigger": "step", "lines": ["..."]}]
+  座標は MapWidget と同じ (x, y)（y=0 が一番下）。w / h を書くと複数マスにまたがるイベントになります
+- セリフ: "npc" を書くと data/input/events.json（NPC id → セリフのリスト）から引きます
+- trigger: "action"（向いているマスで決定キー）/ "step"（そのマスに乗ったとき）
+- solid: true なら、そのマスは歩けません（NPC・看板の既定は true）
+
+引き方は2通り持っています:
+    マス → イベント の辞書（events_at / 向いているマス / 乗ったマス）: 何個置いても O(1)
+    8×8 マスのバケツ（events_in_radius）: 半径に掛かるバケツだけを見ます
+"""
+from __future__ import annotations
 
-import json
 from pathlib import Path
+from types import MappingProxyType
+import json
+
+from data.input.controller import DIRECTIONS
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+EVENTS_DIR = BASE_DIR / "data" / "events"
+DIALOGUE_PATH = BASE_DIR / "data" / "input" / "events.json"
+
+BUCKET_SIZE = 8
+TRIGGERS = ("action", "step")
+# 何も書かなければ通れないイベント
+SOLID_TYPES = ("talk", "sign", "chest")
+
+Cell = tuple[int, int]
+
+
+class MapEvent:
+    """
+    1件ぶん。x, y が左下のマス、w × h マスを占めます。
+    読み込んだ後は書きかえない約束です（索引に入っているため）。
+    """
+
+    __slots__ = ("id", "type", "x", "y", "w", "h", "trigger", "solid", "once", "lines", "enemy_id")
+
+    def __init__(self, id: str, type: str, x: int, y: int, w: int = 1, h: int = 1,
+                 trigger: str = "action", solid: bool = False, once: bool = False,
+                 lines: tuple[str, ...] = (), enemy_id: str | None = None):
+        self.id = id
+        self.type = type
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.trigger = trigger
+        self.solid = solid
+        self.once = once
+        self.lines = lines
+        self.enemy_id = enemy_id
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(id={self.id!r}, type={self.type!r}, x={self.x}, y={self.y}, "
+                f"w={self.w}, h={self.h}, trigger={self.trigger!r})")
+
+    def cells(self):
+        for y in range(self.y, self.y + self.h):
+            for x in range(self.x, self.x + self.w):
+                yield x, y
+
+    def distance_to(self, x: int, y: int) -> int:
+        """(x, y) からこのイベントのいちばん近いマスまでの歩数（マンハッタン距離）"""
+        dx = max(self.x - x, 0, x - (self.x + self.w - 1))
+        dy = max(self.y - y, 0, y - (self.y + self.h - 1))
+        return dx + dy
+
+
+class MapEvents:
+    """1マップぶんのイベントと、その索引。"""
+
+    def __init__(self, map_name: str, events: list[MapEvent]):
+        self.map_name = map_name
+        self.events = tuple(events)
+        # マス → そのマスに掛かるイベント
+        self._tiles: dict[Cell, tuple[MapEvent, ...]] = {}
+        # バケツ → そのバケツに掛かるイベント（半径検索用）
+        self._buckets: dict[Cell, tuple[MapEvent, ...]] = {}
+        self._solid: set[Cell] = set()
+        # once のイベントで、もう起きたもの（id）
+        self.fired: set[str] = set()
+
+        tiles: dict[Cell, list[MapEvent]] = {}
+        buckets: dict[Cell, list[MapEvent]] = {}
+        for event in self.events:
+            for cell in event.cells():
+                tiles.setdefault(cell, []).append(event)
+                if event.solid:
+                    self._solid.add(cell)
+            for by in range(event.y // BUCKET_SIZE, (event.y + event.h - 1) // BUCKET_SIZE + 1):
+                for bx in range(event.x // BUCKET_SIZE, (event.x + event.w - 1) // BUCKET_SIZE + 1):
+                    buckets.setdefault((bx, by), []).append(event)
+        self._tiles = {cell: tuple(evs) for cell, evs in tiles.items()}
+        self._buckets = {key: tuple(evs) for key, evs in buckets.items()}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def events_at(self, x: int, y: int, *, trigger: str | None = None) -> tuple[MapEvent, ...]:
+        events = self._tiles.get((x, y), ())
+        if trigger is None or not events:
+            return events
+        return tuple(e for e in events if e.trigger == trigger and e.id not in self.fired)
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        """NPC や看板があって通れないマスなら True"""
+        return (x, y) in self._solid
+
+    def solid_cells(self) -> frozenset[Cell]:
+        """通れないマス全部（道順探しの前計算用）"""
+        return frozenset(self._solid)
+
+    def facing(self, x: int, y: int, direction: str) -> tuple[MapEvent, ...]:
+        """(x, y) に立って direction を向いたとき、目の前のマスで「調べる」と起きるイベント"""
+        dx, dy = DIRECTIONS[direction]
+        return self.events_at(x + dx, y + dy, trigger="action")
+
+    def stepped_on(self, x: int, y: int) -> tuple[MapEvent, ...]:
+        """(x, y) に乗ったときに起きるイベント（1歩ごとに呼ぶ）"""
+        return self.events_at(x, y, trigger="step")
+
+    def events_in_radius(self, x: int, y: int, radius: int) -> list[MapEvent]:
+        """(x, y) から radius 歩以内（マンハッタン距離）に掛かっているイベント。近い順。"""
+        found: dict[str, MapEvent] = {}
+        b0x, b1x = (x - radius) // BUCKET_SIZE, (x + radius) // BUCKET_SIZE
+        b0y, b1y = (y - radius) // BUCKET_SIZE, (y + radius) // BUCKET_SIZE
+        for by in range(b0y, b1y + 1):
+            for bx in range(b0x, b1x + 1):
+                for event in self._buckets.get((bx, by), ()):
+                    if event.id not in found and event.distance_to(x, y) <= radius:
+                        found[event.id] = event
+        return sorted(found.values(), key=lambda e: e.distance_to(x, y))
+
+    def mark_fired(self, event: MapEvent) -> None:
+        if event.once:
+            self.fired.add(event.id)
+
+
+def _load_json(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        print(f"[WARN] event file load failed: {path} ({e})")
+        return default
+
+
+def _parse_event(item: dict, dialogue, index: int) -> MapEvent:
+    event_type = item.get("type", "message")
+    trigger = item.get("trigger", "action")
+    if trigger not in TRIGGERS:
+        raise ValueError(f"unknown trigger {trigger!r} (use one of: {', '.join(TRIGGERS)})")
+
+    lines = item.get("lines")
+    if lines is None and item.get("npc"):
+        lines = dialogue.get(item["npc"], [])
+    if lines is None:
+        content = item.get("content", "")
+        lines = [content] if content else []
+
+    return MapEvent(
+        id=str(item.get("id", f"{event_type}_{index}")),
+        type=event_type,
+        x=int(item["x"]),
+        y=int(item["y"]),
+        w=max(1, int(item.get("w", 1))),
+        h=max(1, int(item.get("h", 1))),
+        trigger=trigger,
+        solid=bool(item.get("solid", event_type in SOLID_TYPES)),
+        once=bool(item.get("once", False)),
+        lines=tuple(str(line) for line in lines),
+        enemy_id=item.get("enemy_id"),
+    )
+
 
 class EventManager:
     """
-    マップ上のイベントを読み込み、管理するクラスです。
+    マップ名 → MapEvents を配ります（1マップにつき読み込みは1回）。
+    SceneController が1つ持ち、MapScreen が画面に入るときに引きます。
     """
-    def __init__(self):
-        self.events = {}  # (x, y) 座標をキーにしてイベント情報を保持します
-
-    def load_events(self, map_name):
-        """
-        指定されたマップ名に対応するイベントデータをJSONから読み込みます。
-        例: data/events/map1.json
-        """
-        self.events = {}
-        # 修正：パスはプロジェクトの構成に合わせて調整してくださいね
-        event_file = Path(f"data/events/{map_name}.json")
-        
-        if not event_file.exists():
-            print(f"通知: イベントファイル {event_file} が見つかりませんでしたわ。")
-            return
-
-        try:
-            with open(event_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for item in data:
-                    # 座標をタプルにしてキーにします（衝突判定を楽にするためですわ）
-                    pos = (item["x"], item["y"])
-                    self.events[pos] = {
-                        "type": item.get("type", "message"),
-                        "content": item.get("content", ""),
-                        "enemy_id": item.get("enemy_id", None) # 戦闘イベント用
-                    }
-        except Exception as e:
-            print(f"エラー: イベントの読み込みに失敗しましたわ。 {e}")
-
-    def get_event(self, x, y):
-        """
-        指定された座標にイベントがあるか確認し、あればその内容を返します。
-        """
-        return self.events.get((x, y))
-
-# --- 使用例（テスト用） ---
+
+    def __init__(self, events_dir: Path = EVENTS_DIR, dialogue_path: Path = DIALOGUE_PATH):
+        self.events_dir = Path(events_dir)
+        self.dialogue_path = Path(dialogue_path)
+        self._dialogue: dict | None = None
+        self._maps: dict[str, MapEvents] = {}
+        # 以前の使い方（load_events → get_event）用
+        self.current: MapEvents | None = None
+
+    @property
+    def dialogue(self):
+        """NPC id → セリフ（最初に要るときに1回だけ読む）"""
+        if self._dialogue is None:
+            self._dialogue = MappingProxyType(_load_json(self.dialogue_path, {}))
+        return self._dialogue
+
+    def map(self, map_name: str) -> MapEvents:
+        events = self._maps.get(map_name)
+        if events is None:
+            events = self._maps[map_name] = self._load(map_name)
+        return events
+
+    def _load(self, map_name: str) -> MapEvents:
+        path = self.events_dir / f"{map_name}.json"
+        items = _load_json(path, [])
+        if not isinstance(items, list):
+            print(f"[WARN] event file must be a list of events: {path}")
+            items = []
+        events = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                print(f"[WARN] bad event #{i} in {path}: not an object")
+                continue
+            try:
+                events.append(_parse_event(item, self.dialogue, i))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[WARN] bad event #{i} in {path}: {e}")
+        return MapEvents(map_name, events)
+
+    def load_events(self, map_name: str) -> MapEvents:
+        self.current = self.map(map_name)
+        return self.current
+
+    def get_event(self, x: int, y: int) -> MapEvent | None:
+        """load_events したマップの (x, y) にあるイベント（無ければ None）"""
+        if self.current is None:
+            return None
+        events = self.current.events_at(x, y)
+        return events[0] if events else None
+
+
 if __name__ == "__main__":
     manager = EventManager()
-    # manager.load_events("map1")
\ No newline at end of file
+    town = manager.map("town")
+    print(f"town: {len(town)} events")
+    for event in town.events_in_radius(20, 16, 10):
+        print(" ", event.id, (event.x, event.y), event.lines[:1])
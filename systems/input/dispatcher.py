@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+systems/input/dispatcher.py
+キー入力の受け口を1か所にまとめるモジュール。
+
+- Window への bind はここで1回だけ（画面やウィジェットを作り直しても bind が増えない）
+- キーコードは KEYMAP（キーコード → 操作名）を1回引くだけで「up」「confirm」などに直す
+- 受け取ったキーは決まった長さのキューに積み、次のフレームでまとめて配る
+- 配る先は「今表示中の画面」に登録されたハンドラ1つだけ
+
+ハンドラ（MapWidget / BattleWindow / DungeonScreen）が持つもの:
+    accepts_input(action) -> bool : その操作を今受け取るか（False なら Window に返す。Esc など）
+    on_input(action, pressed)      : pressed=True が押した、False が離した
+"""
+from __future__ import annotations
+
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+
+from data.input.controller import KEY_DIRECTIONS
+
+
+# キーコード → 操作名
+KEYMAP: dict[int, str] = {
+    **KEY_DIRECTIONS,          # 矢印キー / WASD
+    13: "confirm",             # Enter
+    271: "confirm",            # テンキーの Enter
+    32: "confirm",             # Space
+    101: "confirm",            # E（調べる）
+    27: "cancel",              # Esc
+}
+
+# 1フレームでためておけるキーの数（超えたら古いものから捨てる）
+QUEUE_SIZE = 32
+
+
+class InputDispatcher:
+    def __init__(self, keymap: dict[int, str] | None = None, queue_size: int = QUEUE_SIZE):
+        self.keymap = dict(KEYMAP if keymap is None else keymap)
+        self.manager = None
+        self._handlers: dict[str, object] = {}
+        # (ハンドラ, 操作名, 押した/離した)
+        self._queue: deque[tuple[object, str, bool]] = deque(maxlen=queue_size)
+        self._drain_trigger = Clock.create_trigger(self._drain, 0)
+        self._installed = False
+
+    def install(self, manager) -> None:
+        """ScreenManager を渡して Window に bind する（何度呼んでも bind は1回）"""
+        self.manager = manager
+        if not self._installed:
+            Window.bind(on_key_down=self._on_key_down, on_key_up=self._on_key_up)
+            self._installed = True
+
+    # --- 登録 ---
+    def register(self, screen_name: str, handler) -> None:
+        """screen_name の画面が表示中のとき handler にキーを配る（前の登録は置き換え）"""
+        self._handlers[screen_name] = handler
+
+    def unregister(self, screen_name: str, handler=None) -> None:
+        if handler is None or self._handlers.get(screen_name) is handler:
+            self._handlers.pop(screen_name, None)
+
+    def _active_handler(self):
+        if self.manager is None:
+            return None
+        return self._handlers.get(self.manager.current)
+
+    # --- Window から ---
+    def _on_key_down(self, _window, key, *args):
+        return self._push(key, True)
+
+    def _on_key_up(self, _window, key, *args):
+        return self._push(key, False)
+
+    def _push(self, key: int, pressed: bool) -> bool:
+        action = self.keymap.get(key)
+        if action is None:
+            return False
+        handler = self._active_handler()
+        if handler is None or not handler.accepts_input(action):
+            return False
+        self._queue.append((handler, action, pressed))
+        self._drain_trigger()
+        return True
+
+    def _drain(self, dt) -> None:
+        """次のフレームで、たまったキーを順に配る（画面が変わっていたら古い画面の分は捨てる）"""
+        queue = self._queue
+        while queue:
+            handler, action, pressed = queue.popleft()
+            if handler is self._active_handler():
+                handler.on_input(action, pressed)
+
+    def clear(self) -> None:
+        self._queue.clear()
+
+
+input_dispatcher = InputDispatcher()
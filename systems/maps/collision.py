@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/collision.py
+当たり判定CSV（0/1）を「一度だけ」バイナリに変換し、以後は mmap で読むモジュール。
+
+- 元データ: assets/maps/*_collision.csv（人が編集するのはこっち）
+- キャッシュ: .cache/maps/{CSV名}.{元パスの短いハッシュ}.{bits}bit.bin（自動生成。消しても次回作り直される）
+  別のフォルダに同じ名前のCSVがあっても、キャッシュが上書きし合わない
+- 元CSVの mtime / サイズをヘッダに記録し、変わっていたら作り直す
+- 同じプロセス内では読み込んだグリッドを使い回す（画面に入るたびのCSV解析をなくす）
+
+バイナリ形式（リトルエンディアン）:
+    ヘッダ 32byte = magic "VKGR", version, bits, (pad 2), width, height, src_mtime_ns, src_size
+    本体 = CSVと同じ「上の行から順」に、1行ずつ stride byte へ詰めたもの
+           bits=1 なら 1セル1bit（bit0 が左端）、bits=8 なら 1セル1byte
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import csv
+import hashlib
+import mmap
+import os
+import struct
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CACHE_DIR = BASE_DIR / ".cache" / "maps"
+
+_MAGIC = b"VKGR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBxxIIqQ")
+
+# 読み込み済みグリッド（キー: 元CSVの絶対パス + bits）
+_GRIDS: dict[tuple[str, int], "PackedGrid"] = {}
+
+
+class PackedGrid:
+    """
+    詰め込み済みのグリッド（読み取り専用）。
+
+    - value(col, row): CSVと同じ向き（row=0 が一番上）で値を返す
+    - is_blocked(x, y): MapWidget と同じ向き（y=0 が一番下）で壁かどうかを返す
+    """
+
+    __slots__ = ("path", "width", "height", "bits", "src_mtime_ns", "src_size", "_buf", "_stride")
+
+    def __init__(self, *, path: Path, width: int, height: int, bits: int,
+                 src_mtime_ns: int, src_size: int, buf):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self.src_mtime_ns = src_mtime_ns
+        self.src_size = src_size
+        self._buf = buf  # mmap か bytes（ヘッダの後ろから読む）
+        self._stride = _row_stride(width, bits)
+
+    def value(self, col: int, row: int) -> int:
+        base = _HEADER.size + row * self._stride
+        if self.bits == 1:
+            return (self._buf[base + (col >> 3)] >> (col & 7)) & 1
+        return self._buf[base + col]
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return self.value(x, self.height - 1 - y) != 0
+
+    def rows(self) -> list[list[int]]:
+        """list[list[int]] に展開する（デバッグ・移行用。毎フレーム呼ばないこと）"""
+        return [[self.value(c, r) for c in range(self.width)] for r in range(self.height)]
+
+    def is_stale(self) -> bool:
+        """元CSVが更新されていれば True。"""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return False
+        return (st.st_mtime_ns, st.st_size) != (self.src_mtime_ns, self.src_size)
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            try:
+                self._buf.close()
+            except Exception:
+                pass
+
+
+def _row_stride(width: int, bits: int) -> int:
+    return (width * bits + 7) // 8
+
+
+def _cache_path(src: Path, bits: int) -> Path:
+    # src は resolve 済みの絶対パス。そのハッシュの先頭8桁で、同じ名前のCSVを区別する
+    digest = hashlib.sha1(str(src).encode("utf-8")).hexdigest()[:8]
+    return CACHE_DIR / f"{src.stem}.{digest}.{bits}bit.bin"
+
+
+def _parse_csv(path: Path) -> list[list[int]] | None:
+    """CSVを数値の2次元リストにする。読めなければ None（落とさない）"""
+    with path.open("r", encoding="utf-8", newline="") as f:
+        rows = [[int(v) for v in row] for row in csv.reader(f) if row]
+    if not rows:
+        print(f"[WARN] collision csv is empty: {path}")
+        return None
+    # 形状チェック（行の長さが揃ってないときは落とさず None）
+    w = len(rows[0])
+    if any(len(r) != w for r in rows):
+        print(f"[WARN] collision csv has ragged rows: {path}")
+        return None
+    return rows
+
+
+def _pack(rows: list[list[int]], bits: int, src_mtime_ns: int, src_size: int) -> bytes:
+    height = len(rows)
+    width = len(rows[0])
+    stride = _row_stride(width, bits)
+    body = bytearray(stride * height)
+
+    for r, row in enumerate(rows):
+        base = r * stride
+        if bits == 1:
+            for c, v in enumerate(row):
+                if v:
+                    body[base + (c >> 3)] |= 1 << (c & 7)
+        else:
+            for c, v in enumerate(row):
+                body[base + c] = max(0, min(255, v))
+
+    header = _HEADER.pack(_MAGIC, _VERSION, bits, width, height, src_mtime_ns, src_size)
+    return header + bytes(body)
+
+
+def _read_header(buf) -> tuple[int, int, int, int, int] | None:
+    if len(buf) < _HEADER.size:
+        return None
+    magic, version, bits, width, height, mtime_ns, size = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC or version != _VERSION:
+        return None
+    if len(buf) < _HEADER.size + _row_stride(width, bits) * height:
+        return None
+    return bits, width, height, mtime_ns, size
+
+
+def _open_cached(src: Path, bits: int, st: os.stat_result) -> PackedGrid | None:
+    """キャッシュが新しければ mmap で開く。古い/壊れているなら None。"""
+    bin_path = _cache_path(src, bits)
+    if not bin_path.exists():
+        return None
+
+    try:
+        with bin_path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    header = _read_header(mm)
+    if header is None or header[0] != bits or header[3:] != (st.st_mtime_ns, st.st_size):
+        mm.close()
+        return None
+
+    _, width, height, mtime_ns, size = header
+    return PackedGrid(path=src, width=width, height=height, bits=bits,
+                      src_mtime_ns=mtime_ns, src_size=size, buf=mm)
+
+
+def _compile(src: Path, bits: int, st: os.stat_result) -> PackedGrid | None:
+    """CSV を解析してキャッシュを書き出す。書けない環境ではメモリ上で持つ。"""
+    rows = _parse_csv(src)
+    if rows is None:
+        return None
+
+    data = _pack(rows, bits, st.st_mtime_ns, st.st_size)
+    bin_path = _cache_path(src, bits)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = bin_path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, bin_path)
+    except OSError as e:
+        print(f"[WARN] collision cache write failed: {bin_path} ({e})")
+    else:
+        grid = _open_cached(src, bits, st)
+        if grid is not None:
+            return grid
+
+    return PackedGrid(path=src, width=len(rows[0]), height=len(rows), bits=bits,
+                      src_mtime_ns=st.st_mtime_ns, src_size=st.st_size, buf=data)
+
+
+def load_grid(path: Path, *, bits: int = 1) -> PackedGrid | None:
+    """
+    CSVグリッドを読み込む（キャッシュ優先）。読めなければ None（落とさない）
+
+    2回目以降は stat 1回だけで済む。CSVが更新されていれば作り直す。
+    """
+    src = Path(path).resolve()
+    key = (str(src), bits)
+    try:
+        st = src.stat()
+    except OSError:
+        print(f"[WARN] collision csv not found: {src}")
+        return None
+
+    grid = _GRIDS.get(key)
+    if grid is not None and (grid.src_mtime_ns, grid.src_size) == (st.st_mtime_ns, st.st_size):
+        return grid
+
+    try:
+        new_grid = _open_cached(src, bits, st) or _compile(src, bits, st)
+    except Exception as e:
+        print(f"[WARN] collision csv load failed: {src} ({e})")
+        return None
+
+    if new_grid is None:
+        return None
+    _GRIDS[key] = new_grid
+    return new_grid
+
+
+def pack_rows(rows: list[list[int]], bits: int = 1) -> bytes:
+    """2次元リスト（上の行から順）をこのモジュールのバイナリ形式にする（元CSVの記録は0）"""
+    return _pack(rows, bits, 0, 0)
+
+
+def read_packed(path: Path) -> PackedGrid | None:
+    """pack_rows で書いたファイルを丸ごと読む（小さいファイル向け。別スレッドから呼んでよい）"""
+    path = Path(path)
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    header = _read_header(data)
+    if header is None:
+        return None
+    bits, width, height, mtime_ns, size = header
+    return PackedGrid(path=path, width=width, height=height, bits=bits,
+                      src_mtime_ns=mtime_ns, src_size=size, buf=data)
+
+
+def load_collision_csv(path: Path) -> PackedGrid | None:
+    """0/1 の当たり判定CSVを 1セル1bit のグリッドとして読む。"""
+    return load_grid(path, bits=1)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/dungeon.py
+ダンジョンの地図（壁と通路）を持つモジュール。
+
+- データ: data/maps/{name}.json（初めてそのダンジョンに入ったときに1回だけ読む）
+      {"rows": ["#####", "#...#", ...], "start": [1, 1], "facing": "N"}
+      '#' が壁、それ以外は通路。座標は (x, y) で y=0 が一番上（DungeonScreen と同じ向き）
+- ファイルが無い・壊れているときは、外周だけ壁の箱庭を作って続ける（落とさない）
+- 中身は bytearray 1本（1マス1byte、0=通路 / 1=壁）。大きいダンジョンでも軽い
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import json
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DUNGEON_DIR = BASE_DIR / "data" / "maps"
+
+FLOOR = 0
+WALL = 1
+
+# 向き → (dx, dy)（y は下向きが正）
+FACING_DELTAS = {"N": (0, -1), "E": (1, 0), "S": (0, 1), "W": (-1, 0)}
+
+# 読み込み済みのダンジョン（キー: 名前）
+_DUNGEONS: dict[str, "DungeonMap"] = {}
+
+
+class DungeonMap:
+    __slots__ = ("name", "width", "height", "cells", "start", "start_facing")
+
+    def __init__(self, name: str, width: int, height: int, cells: bytearray,
+                 start: tuple[int, int] = (1, 1), start_facing: str = "N"):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.cells = cells
+        self.start = start
+        self.start_facing = start_facing
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_wall(self, x: int, y: int) -> bool:
+        """範囲外も壁"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return self.cells[y * self.width + x] == WALL
+
+    def rows(self) -> list[str]:
+        """'#' / '.' の文字列に戻す（デバッグ用）"""
+        w = self.width
+        return [
+            "".join("#" if c == WALL else "." for c in self.cells[y * w:(y + 1) * w])
+            for y in range(self.height)
+        ]
+
+
+def generate_box(name: str, width: int, height: int) -> DungeonMap:
+    """外周だけ壁の箱庭（データが無いときの代わり）"""
+    cells = bytearray(width * height)
+    for y in range(height):
+        for x in range(width):
+            if x in (0, width - 1) or y in (0, height - 1):
+                cells[y * width + x] = WALL
+    return DungeonMap(name, width, height, cells, (1, 1), "N")
+
+
+def _parse(name: str, data: dict) -> DungeonMap:
+    rows = data["rows"]
+    if not rows or not all(isinstance(r, str) for r in rows):
+        raise ValueError("'rows' must be a non-empty list of strings")
+    width = max(len(r) for r in rows)
+    height = len(rows)
+    cells = bytearray(width * height)
+    for y, row in enumerate(rows):
+        # 短い行の右側は壁で埋める
+        for x, ch in enumerate(row.ljust(width, "#")):
+            if ch == "#":
+                cells[y * width + x] = WALL
+
+    sx, sy = data.get("start", (1, 1))
+    facing = data.get("facing", "N")
+    if facing not in FACING_DELTAS:
+        raise ValueError(f"unknown facing {facing!r}")
+    dungeon = DungeonMap(name, width, height, cells, (int(sx), int(sy)), facing)
+    if dungeon.is_wall(*dungeon.start):
+        raise ValueError(f"start {dungeon.start} is inside a wall")
+    return dungeon
+
+
+def load_dungeon(name: str, *, fallback_size: tuple[int, int] = (10, 10)) -> DungeonMap:
+    """data/maps/{name}.json を読む（同じ名前なら使い回す）。読めなければ箱庭。"""
+    dungeon = _DUNGEONS.get(name)
+    if dungeon is not None:
+        return dungeon
+
+    path = DUNGEON_DIR / f"{name}.json"
+    try:
+        dungeon = _parse(name, json.loads(path.read_text(encoding="utf-8")))
+    except FileNotFoundError:
+        print(f"[WARN] dungeon not found: {path} (using a generated box)")
+        dungeon = generate_box(name, *fallback_size)
+    except Exception as e:
+        print(f"[WARN] dungeon load failed: {path} ({e}) (using a generated box)")
+        dungeon = generate_box(name, *fallback_size)
+
+    _DUNGEONS[name] = dungeon
+    return dungeon
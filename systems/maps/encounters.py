@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/encounters.py
+エンカウント（どこで・何歩で・どの敵が出るか）をデータから決めるモジュール。
+
+- 出現の重み: data/input/enemies.json の各敵の "encounter"
+      "encounter": {"field": 3, "field/2": 1}
+      "field" はそのマップ全体（地域0）、"field/2" は地域2だけの重み
+- 何歩で出るか: data/maps/encounters.json の地域ごとの "steps"（0 ならその地域では出ない）
+      {"field": {"region_layer": "field_region.csv", "regions": {"0": {"steps": 10}, "2": {"steps": 5}}}}
+- 地域: "region_layer" に書いた assets/maps/ のCSV（0〜255 の数字。当たり判定CSVと同じ大きさ）
+      書かなければマップ全体が地域0。当たり判定と同じく systems.maps.collision でキャッシュする
+
+重み付きの抽選は Alias 法で前計算しておくので、1歩ごとの処理は
+「地域を1回引く → 表を1回引く → 乱数1つで抽選」の O(1) で済む。
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import json
+
+from systems.battle.enemy_repository import EnemyRepository
+from systems.maps.collision import PackedGrid, load_grid
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_CONFIG_PATH = BASE_DIR / "data" / "maps" / "encounters.json"
+MAPS_DIR = BASE_DIR / "assets" / "maps"
+
+
+class AliasSampler:
+    """
+    重み付き抽選（Vose の Alias 法）。作るのは O(n)、1回の抽選は O(1)。
+    乱数は random() を1回だけ使う。
+    """
+
+    __slots__ = ("items", "_prob", "_alias")
+
+    def __init__(self, items, weights):
+        items = list(items)
+        weights = [float(w) for w in weights]
+        if not items or len(items) != len(weights):
+            raise ValueError("items and weights must be non-empty and the same length")
+        total = sum(weights)
+        if total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("weights must be >= 0 and not all zero")
+
+        n = len(items)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # 残りは誤差の範囲で 1.0 のもの
+        for i in small + large:
+            prob[i] = 1.0
+
+        self.items = items
+        self._prob = prob
+        self._alias = alias
+
+    def sample(self, rng):
+        x = rng.random() * len(self.items)
+        i = int(x)
+        if x - i < self._prob[i]:
+            return self.items[i]
+        return self.items[self._alias[i]]
+
+
+class EncounterTable:
+    """1マップぶん。地域番号（0〜255）→ (必要歩数, 抽選器) を配列で持つ。"""
+
+    __slots__ = ("map_name", "regions", "_slots")
+
+    def __init__(self, map_name: str, slots: list, regions: PackedGrid | None):
+        self.map_name = map_name
+        self.regions = regions
+        self._slots = slots  # 長さ256。None ならその地域では出ない
+
+    def region_at(self, x: int, y: int) -> int:
+        """MapWidget と同じ向き（y=0 が一番下）で地域番号を返す。"""
+        regions = self.regions
+        if regions is None or not (0 <= x < regions.width and 0 <= y < regions.height):
+            return 0
+        return regions.value(x, regions.height - 1 - y)
+
+    def steps_at(self, x: int, y: int) -> int:
+        slot = self._slots[self.region_at(x, y)]
+        return slot[0] if slot else 0
+
+    def roll(self, x: int, y: int, steps: int, rng) -> str | None:
+        """
+        1歩ごとに呼ぶ。歩数が足りていれば敵IDを返す（出なければ None）。
+        歩数のリセットは呼んだ側（MapWidget）が行う。
+        """
+        slot = self._slots[self.region_at(x, y)]
+        if slot is None or steps < slot[0]:
+            return None
+        return slot[1].sample(rng)
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _region_layers(config: dict) -> tuple[str, ...]:
+    return tuple(conf["region_layer"] for conf in config.values() if conf.get("region_layer"))
+
+
+def _load_config(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"[WARN] encounter config not found: {path}")
+    except Exception as e:
+        print(f"[WARN] encounter config load failed: {path} ({e})")
+    return {}
+
+
+def compile_tables(repository: EnemyRepository, config: dict) -> dict[str, EncounterTable]:
+    """enemies.json の重み + encounters.json の歩数 → マップごとの EncounterTable"""
+    weights = repository.encounter_weights()
+    tables = {}
+
+    for map_name, map_conf in config.items():
+        region_conf = map_conf.get("regions", {})
+        default = weights.get(map_name, [])
+        slots: list = [None] * 256
+
+        for region_key, conf in region_conf.items():
+            # 書き間違いで落とさない（その地域だけ飛ばす）
+            try:
+                region = int(region_key)
+                steps = int(conf.get("steps", 0))
+                if not 0 <= region < len(slots):
+                    raise ValueError(f"region must be 0..{len(slots) - 1}")
+            except (AttributeError, TypeError, ValueError) as e:
+                print(f"[WARN] bad encounter region {map_name}/{region_key}: {e}")
+                continue
+            pairs = weights.get(f"{map_name}/{region}") or default
+            if steps <= 0 or not pairs:
+                continue
+            ids, ws = zip(*pairs)
+            slots[region] = (steps, AliasSampler(ids, ws))
+
+        regions = None
+        layer_name = map_conf.get("region_layer")
+        if layer_name:
+            regions = load_grid(MAPS_DIR / layer_name, bits=8)
+
+        tables[map_name] = EncounterTable(map_name, slots, regions)
+
+    return tables
+
+
+class EncounterService:
+    """
+    マップ名 → EncounterTable を配る。
+    enemies.json・encounters.json・地域CSV のどれかが書き換わっていたら、
+    画面に入るタイミングで作り直す（1歩ごとには見ない）。
+    """
+
+    def __init__(self, repository: EnemyRepository, config_path: Path = DEFAULT_CONFIG_PATH):
+        self.repository = repository
+        self.config_path = Path(config_path)
+        self._stamp = None
+        # 前回読んだ encounters.json に書いてあった地域CSV（更新されたか見るため）
+        self._layers: tuple[str, ...] = ()
+        self._tables: dict[str, EncounterTable] = {}
+
+    def _current_stamp(self) -> tuple:
+        """作り直しの目印: 敵の表の版 + encounters.json と地域CSV の (mtime, size)"""
+        return (
+            self.repository.version,
+            _file_stamp(self.config_path),
+            tuple(_file_stamp(MAPS_DIR / name) for name in self._layers),
+        )
+
+    def table(self, map_name: str) -> EncounterTable | None:
+        self.repository.reload_if_changed()
+        if self._stamp is None or self._stamp != self._current_stamp():
+            config = _load_config(self.config_path)
+            self._tables = compile_tables(self.repository, config)
+            self._layers = _region_layers(config)
+            self._stamp = self._current_stamp()
+        return self._tables.get(map_name)
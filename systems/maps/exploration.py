@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/exploration.py
+「どのマスに行ったことがあるか」をマップごとに 1マス1bit で覚えるモジュール。
+
+- 印を付けるのは O(1)（ビットを1つ立てるだけ）。何マス分かったかも同時に数えておく
+- 地図・ミニマップ・踏破率は、みんなこの1つを読む（別々に覚えない）
+- 保存は zlib で縮めたバイト列（行ったことのある場所はかたまるので、とても小さくなる）
+      ヘッダ = magic "VKEX", version, width, height（リトルエンディアン）+ zlib(ビット列)
+- 座標の向き（y=0 が上か下か）は使う側に合わせる。このモジュールは (x, y) をそのまま覚えるだけ
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+
+
+_MAGIC = b"VKEX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBII")
+# ストアの保存: マップ数、その後 (名前の長さ, 名前, データの長さ, データ) の繰り返し
+_COUNT = struct.Struct("<H")
+_ITEM = struct.Struct("<HI")
+
+
+class ExplorationMap:
+    __slots__ = ("name", "width", "height", "explored", "version", "_bits")
+
+    def __init__(self, name: str, width: int, height: int, bits: bytearray | None = None):
+        if width <= 0 or height <= 0:
+            raise ValueError("exploration map must be at least 1x1")
+        self.name = name
+        self.width = width
+        self.height = height
+        nbytes = (width * height + 7) // 8
+        if bits is not None and len(bits) != nbytes:
+            raise ValueError(f"expected {nbytes} bytes of exploration bits, got {len(bits)}")
+        self._bits = bits if bits is not None else bytearray(nbytes)
+        self.explored = sum(bin(b).count("1") for b in self._bits) if bits is not None else 0
+        # 変わるたびに増える（セーブの「変わった所だけ書く」判定用）
+        self.version = 0
+
+    @property
+    def bits(self) -> bytes:
+        """1マス1bit のビット列（マス i = y * width + x は i>>3 byte目の下から i&7 bit目）"""
+        return bytes(self._bits)
+
+    def is_explored(self, x: int, y: int) -> bool:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        i = y * self.width + x
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def mark(self, x: int, y: int) -> bool:
+        """(x, y) に印を付ける。初めてのマスなら True"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        i = y * self.width + x
+        mask = 1 << (i & 7)
+        if self._bits[i >> 3] & mask:
+            return False
+        self._bits[i >> 3] |= mask
+        self.explored += 1
+        self.version += 1
+        return True
+
+    def mark_area(self, x: int, y: int, radius: int) -> tuple[int, int, int, int] | None:
+        """
+        (x, y) を中心に一辺 2*radius+1 の四角に印を付ける（radius が一定なら O(1)）。
+        新しく分かったマスがあれば、それを囲む四角 (x0, y0, x1, y1)（両端を含む）を返す。
+        """
+        x0 = x1 = y0 = y1 = None
+        for cy in range(max(0, y - radius), min(self.height, y + radius + 1)):
+            for cx in range(max(0, x - radius), min(self.width, x + radius + 1)):
+                if self.mark(cx, cy):
+                    if x0 is None:
+                        x0 = x1 = cx
+                        y0 = y1 = cy
+                    else:
+                        x0, x1 = min(x0, cx), max(x1, cx)
+                        y0, y1 = min(y0, cy), max(y1, cy)
+        if x0 is None:
+            return None
+        return x0, y0, x1, y1
+
+    def completion(self, total: int | None = None) -> float:
+        """踏破率（0.0〜1.0）。total に歩けるマスの数を渡せばそれを分母にする"""
+        total = total or self.width * self.height
+        return min(1.0, self.explored / total)
+
+    # --- 保存 ---
+    def to_blob(self) -> bytes:
+        return _HEADER.pack(_MAGIC, _VERSION, self.width, self.height) + zlib.compress(bytes(self._bits), 6)
+
+    @classmethod
+    def from_blob(cls, name: str, blob: bytes) -> "ExplorationMap":
+        if len(blob) < _HEADER.size:
+            raise ValueError("exploration blob is too short")
+        magic, version, width, height = _HEADER.unpack_from(blob, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not an exploration blob (or unsupported version)")
+        bits = bytearray(zlib.decompress(blob[_HEADER.size:]))
+        return cls(name, width, height, bits)
+
+
+class ExplorationStore:
+    """マップ名 → ExplorationMap。SceneController が1つ持つ。"""
+
+    def __init__(self):
+        self.maps: dict[str, ExplorationMap] = {}
+        # 捨てたマップの version と、作った・差し替えた回数を足していく（version が戻らないように）
+        self._base_version = 0
+
+    def get(self, name: str, width: int, height: int) -> ExplorationMap:
+        """無ければ作る。マップの大きさが変わっていたら作り直す（古い印は捨てる）"""
+        exploration = self.maps.get(name)
+        if exploration is None or (exploration.width, exploration.height) != (width, height):
+            self._discard(exploration)
+            exploration = self.maps[name] = ExplorationMap(name, width, height)
+        return exploration
+
+    def _discard(self, exploration: ExplorationMap | None) -> None:
+        self._base_version += 1 + (exploration.version if exploration is not None else 0)
+
+    @property
+    def version(self) -> int:
+        """印を付ける・マップを作る/差し替えるたびに必ず増える（前と同じ値には戻らない）"""
+        return self._base_version + sum(m.version for m in self.maps.values())
+
+    def to_blob(self) -> bytes:
+        parts = [_COUNT.pack(len(self.maps))]
+        for name, exploration in self.maps.items():
+            raw_name = name.encode("utf-8")
+            blob = exploration.to_blob()
+            parts.append(_ITEM.pack(len(raw_name), len(blob)))
+            parts.append(raw_name)
+            parts.append(blob)
+        return b"".join(parts)
+
+    def load_blob(self, data: bytes) -> None:
+        (count,) = _COUNT.unpack_from(data, 0)
+        offset = _COUNT.size
+        maps = {}
+        for _ in range(count):
+            name_len, blob_len = _ITEM.unpack_from(data, offset)
+            offset += _ITEM.size
+            name = data[offset:offset + name_len].decode("utf-8")
+            offset += name_len
+            maps[name] = ExplorationMap.from_blob(name, data[offset:offset + blob_len])
+            offset += blob_len
+        for exploration in self.maps.values():
+            self._discard(exploration)
+        self._discard(None)
+        self.maps = maps
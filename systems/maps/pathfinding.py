@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/pathfinding.py
+当たり判定グリッド（PackedGrid）の上で道順を探すモジュール。
+
+- 座標は MapWidget と同じ (x, y)（y=0 が一番下）。移動は上下左右の4方向、1マスのコストは1
+- 作るときに1回だけ:
+    歩けるかどうかを bytearray に写す（探索中は PackedGrid のビットを読まない）
+    blocked に渡したマス（NPC など、当たり判定CSVには無いが通れないマス）も壁にする
+    つながっている場所ごとに番号を振る（番号が違えば探索せずに「行けない」と分かる）
+- 探索は A* + Jump Point Search（4方向版）。まっすぐ進める間はノードを積まずに飛ぶ
+- 最近の結果は LRU で覚えておく。当たり判定が変わったら Pathfinder ごと作り直す（MapWidget.set_collision）
+
+4方向 JPS の決まりごと（同じ長さの道が何本もあるときは「曲がれるところで先に縦へ」）:
+    横に進んでいるとき: まっすぐだけ。ただし後ろ斜めが壁で、縦の隣が空いていれば曲がる（強制隣接）
+    縦に進んでいるとき: まっすぐ + 左右。左右へ飛んで何か見つかる場所で止まる
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from array import array
+from typing import Iterable
+import heapq
+
+from systems.maps.collision import PackedGrid
+
+
+PATH_CACHE_SIZE = 256
+
+Cell = tuple[int, int]
+
+
+class Pathfinder:
+    """1枚のグリッド専用。グリッドが変わったら作り直す。"""
+
+    def __init__(self, grid: PackedGrid, *, blocked: Iterable[Cell] = (),
+                 cache_size: int = PATH_CACHE_SIZE):
+        self.grid = grid
+        self.width = w = grid.width
+        self.height = h = grid.height
+        # 歩ける=1（y*w + x の1次元）
+        self._walk = bytearray(
+            0 if grid.is_blocked(x, y) else 1 for y in range(h) for x in range(w)
+        )
+        for x, y in blocked:
+            if 0 <= x < w and 0 <= y < h:
+                self._walk[y * w + x] = 0
+        self._labels = self._label_components()
+        self._cache: OrderedDict[tuple[Cell, Cell], tuple[Cell, ...] | None] = OrderedDict()
+        self._cache_size = cache_size
+
+    # --- 前計算 ---
+    def _label_components(self) -> array:
+        """つながっている歩けるマスに同じ番号を振る（壁は 0）"""
+        w, walk = self.width, self._walk
+        labels = array("i", bytes(4 * len(walk)))
+        label = 0
+        for start, ok in enumerate(walk):
+            if not ok or labels[start]:
+                continue
+            label += 1
+            labels[start] = label
+            queue = deque((start,))
+            while queue:
+                i = queue.popleft()
+                x = i % w
+                for j in (i - w, i + w, i - 1 if x > 0 else -1, i + 1 if x < w - 1 else -1):
+                    if 0 <= j < len(walk) and walk[j] and not labels[j]:
+                        labels[j] = label
+                        queue.append(j)
+        return labels
+
+    # --- 問い合わせ ---
+    def walkable(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and self._walk[y * self.width + x] == 1
+
+    def component(self, x: int, y: int) -> int:
+        """つながりの番号（壁・範囲外は 0）"""
+        if not self.walkable(x, y):
+            return 0
+        return self._labels[y * self.width + x]
+
+    def reachable(self, start: Cell, goal: Cell) -> bool:
+        label = self.component(*start)
+        return label != 0 and label == self.component(*goal)
+
+    def find_path(self, start: Cell, goal: Cell) -> list[Cell] | None:
+        """
+        start から goal までのマスを順に返す（両端を含む）。行けなければ None。
+        同じ問い合わせは LRU から返す。
+        """
+        start, goal = tuple(start), tuple(goal)
+        key = (start, goal)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            path = self._cache[key]
+            return list(path) if path is not None else None
+
+        if not self.reachable(start, goal):
+            path = None
+        elif start == goal:
+            path = (start,)
+        else:
+            path = tuple(self._search(start, goal))
+
+        self._cache[key] = path
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return list(path) if path is not None else None
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    # --- JPS ---
+    def _jump_h(self, x: int, y: int, dx: int, goal: Cell) -> Cell | None:
+        """横に飛ぶ。止まる場所（ゴール or 曲がる必要がある場所）か None"""
+        ok = self.walkable
+        while True:
+            x += dx
+            if not ok(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            # 後ろ斜めが壁で、縦の隣が空いている → ここで曲がる道がある
+            if (ok(x, y + 1) and not ok(x - dx, y + 1)) or (ok(x, y - 1) and not ok(x - dx, y - 1)):
+                return x, y
+
+    def _jump_v(self, x: int, y: int, dy: int, goal: Cell) -> Cell | None:
+        """縦に飛ぶ。左右どちらかへ飛んで何か見つかる場所で止まる"""
+        ok = self.walkable
+        while True:
+            y += dy
+            if not ok(x, y):
+                return None
+            if (x, y) == goal:
+                return x, y
+            if self._jump_h(x, y, 1, goal) is not None or self._jump_h(x, y, -1, goal) is not None:
+                return x, y
+
+    def _successors(self, node: Cell, parent: Cell | None, goal: Cell):
+        x, y = node
+        if parent is None:
+            dirs = ((1, 0), (-1, 0), (0, 1), (0, -1))
+        else:
+            px, py = parent
+            dx = (x > px) - (x < px)
+            dy = (y > py) - (y < py)
+            if dy:
+                # 縦に来た: まっすぐ + 左右
+                dirs = ((0, dy), (1, 0), (-1, 0))
+            else:
+                # 横に来た: まっすぐ + 強制隣接の縦だけ
+                ok = self.walkable
+                dirs = [(dx, 0)]
+                for vy in (1, -1):
+                    if ok(x, y + vy) and not ok(x - dx, y + vy):
+                        dirs.append((0, vy))
+
+        for dx, dy in dirs:
+            if dx:
+                point = self._jump_h(x, y, dx, goal)
+            else:
+                point = self._jump_v(x, y, dy, goal)
+            if point is not None:
+                yield point
+
+    def _search(self, start: Cell, goal: Cell) -> list[Cell]:
+        gx, gy = goal
+        g_cost = {start: 0}
+        parent: dict[Cell, Cell | None] = {start: None}
+        open_heap = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+
+        while open_heap:
+            _, g, node = heapq.heappop(open_heap)
+            if node == goal:
+                return self._expand(parent, goal)
+            if g > g_cost[node]:
+                continue
+            for nxt in self._successors(node, parent[node], goal):
+                ng = g + abs(nxt[0] - node[0]) + abs(nxt[1] - node[1])
+                if ng < g_cost.get(nxt, 1 << 60):
+                    g_cost[nxt] = ng
+                    parent[nxt] = node
+                    heapq.heappush(open_heap, (ng + abs(nxt[0] - gx) + abs(nxt[1] - gy), ng, nxt))
+
+        # つながりの番号で確認済みなので、ここには来ないはず
+        raise RuntimeError(f"no path from {start} to {goal} despite matching components")
+
+    @staticmethod
+    def _expand(parent: dict[Cell, Cell | None], goal: Cell) -> list[Cell]:
+        """飛び先（ジャンプポイント）の列を、1マスずつの列に戻す"""
+        points = []
+        node: Cell | None = goal
+        while node is not None:
+            points.append(node)
+            node = parent[node]
+        points.reverse()
+
+        path = [points[0]]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            dx = (x1 > x0) - (x1 < x0)
+            dy = (y1 > y0) - (y1 < y0)
+            x, y = x0, y0
+            while (x, y) != (x1, y1):
+                x += dx
+                y += dy
+                path.append((x, y))
+        return path
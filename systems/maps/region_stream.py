@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/region_stream.py
+とても大きいマップ（ワールド）を「地域ファイル」に分けておき、プレイヤーの近くだけ読むモジュール。
+
+- 分割: split_world() が CSV を region_size×region_size ごとの .bin（collision と同じ形式）に分ける
+      出力先には world.json（幅・高さ・地域の大きさ・bits）と r_{列}_{行}.bin が並ぶ
+      CSV は region_size 行ずつしか持たないので、分割中もメモリは増えない
+- 実行時: StreamedGrid は PackedGrid と同じ顔（width / height / value / is_blocked）をしているので
+      MapWidget からはどちらでも同じように使える
+- update_focus(x, y) で周りの地域を裏のスレッドで読み、遠くなった地域は捨てる（メモリは一定）
+- まだ読めていない地域のセルは fill（既定 1 = 壁）として扱う（読み込み前に踏み込まない）
+
+    python -m systems.maps.region_stream assets/maps/field_collision.csv data/worlds/field
+"""
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import csv
+import json
+import os
+import sys
+import threading
+
+from systems.maps.collision import PackedGrid, pack_rows, read_packed
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+MANIFEST_NAME = "world.json"
+DEFAULT_REGION_SIZE = 32
+
+# 開いたワールド（キー: ディレクトリの絶対パス）
+_WORLDS: dict[str, "StreamedGrid"] = {}
+
+
+def _region_path(world_dir: Path, rc: int, rr: int) -> Path:
+    return world_dir / f"r_{rc}_{rr}.bin"
+
+
+def _write_region(world_dir: Path, rc: int, rr: int, rows: list[list[int]], bits: int) -> None:
+    path = _region_path(world_dir, rc, rr)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(pack_rows(rows, bits))
+    os.replace(tmp, path)
+
+
+def split_world(csv_path: Path, out_dir: Path, *, region_size: int = DEFAULT_REGION_SIZE,
+                bits: int = 1) -> dict:
+    """
+    CSV（上の行から順）を地域ファイルに分ける。作った world.json の中身を返す。
+    地域の番号は CSV と同じ向き（rr=0 が一番上の帯）。端の地域は小さくなる。
+    """
+    if region_size <= 0:
+        raise ValueError("region_size must be > 0")
+    csv_path = Path(csv_path)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    width = None
+    height = 0
+    band: list[list[int]] = []
+
+    def flush(rr: int) -> None:
+        for rc in range(0, (width + region_size - 1) // region_size):
+            c0 = rc * region_size
+            _write_region(out_dir, rc, rr, [row[c0:c0 + region_size] for row in band], bits)
+
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            values = [int(v) for v in row]
+            if width is None:
+                width = len(values)
+            elif len(values) != width:
+                raise ValueError(f"ragged row {height} in {csv_path}")
+            band.append(values)
+            height += 1
+            if len(band) == region_size:
+                flush(height // region_size - 1)
+                band = []
+
+    if width is None:
+        raise ValueError(f"empty csv: {csv_path}")
+    if band:
+        flush(height // region_size)
+
+    manifest = {"width": width, "height": height, "region_size": region_size, "bits": bits}
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    return manifest
+
+
+class StreamedGrid:
+    """
+    地域ファイルを必要な分だけ持つグリッド（読み取り専用）。
+
+    - value(col, row): CSVと同じ向き（row=0 が一番上）
+    - is_blocked(x, y): MapWidget と同じ向き（y=0 が一番下）。範囲外・未読み込みは壁
+    - update_focus(x, y): (x, y) の地域から radius 以内を読み、radius+1 より遠い地域を捨てる
+    """
+
+    def __init__(self, world_dir: Path, *, radius: int = 1, fill: int = 1,
+                 executor: ThreadPoolExecutor | None = None):
+        self.path = Path(world_dir)
+        manifest = json.loads((self.path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.width = int(manifest["width"])
+        self.height = int(manifest["height"])
+        self.region_size = int(manifest["region_size"])
+        self.bits = int(manifest.get("bits", 1))
+        self.radius = radius
+        self.fill = fill
+
+        self._cols = (self.width + self.region_size - 1) // self.region_size
+        self._rows = (self.height + self.region_size - 1) // self.region_size
+        # 読み込み済みの地域。書くのは _load（裏スレッド）と update_focus（メイン）だけ
+        self._regions: dict[tuple[int, int], PackedGrid] = {}
+        # 読み込み中の地域 → (頼んだときの目印, Future)。目印が変わっていたら、その読み込みは古い
+        self._pending: dict[tuple[int, int], tuple[object, Future]] = {}
+        # 最後に update_focus した地域（読み終わった地域を入れてよいかの判定用）
+        self._focus: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="region")
+        self._owns_executor = executor is None
+
+    # --- PackedGrid と同じ読み取り ---
+    def value(self, col: int, row: int) -> int:
+        size = self.region_size
+        region = self._regions.get((col // size, row // size))
+        if region is None:
+            return self.fill
+        return region.value(col % size, row % size)
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return self.value(x, self.height - 1 - y) != 0
+
+    def is_stale(self) -> bool:
+        return False
+
+    # --- 読み込み / 破棄 ---
+    def region_of(self, x: int, y: int) -> tuple[int, int]:
+        """MapWidget の座標（y=0 が一番下）→ 地域番号 (rc, rr)"""
+        return x // self.region_size, (self.height - 1 - y) // self.region_size
+
+    def is_loaded(self, x: int, y: int) -> bool:
+        return self.region_of(x, y) in self._regions
+
+    def loaded_regions(self) -> list[tuple[int, int]]:
+        return sorted(self._regions)
+
+    def _is_near(self, key: tuple[int, int]) -> bool:
+        """今の地域から radius+1 以内か（これより遠い地域は持たない）"""
+        if self._focus is None:
+            return False
+        cc, cr = self._focus
+        return max(abs(key[0] - cc), abs(key[1] - cr)) <= self.radius + 1
+
+    def _load(self, key: tuple[int, int], ticket: object) -> None:
+        """
+        裏スレッドで動く。読めなかった地域は未読み込み（= 壁）のまま。
+        走り出した後で取り消された読み込み（遠くなった・頼み直された）の結果は捨てる。
+        """
+        region = read_packed(_region_path(self.path, *key))
+        if region is None:
+            print(f"[WARN] world region load failed: {self.path} {key}")
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None or pending[0] is not ticket:
+                return
+            del self._pending[key]
+            if region is not None and self._is_near(key):
+                self._regions[key] = region
+
+    def update_focus(self, x: int, y: int, *, wait: bool = False) -> None:
+        """
+        1歩ごとに呼ぶ。地域が変わらなければ辞書を数回引くだけ。
+        wait=True なら自分のいる地域だけは読み終わるまで待つ（開始位置・ワープ用）
+        """
+        cc, cr = self.region_of(x, y)
+        r = self.radius
+        wanted = [
+            (rc, rr)
+            for rr in range(max(0, cr - r), min(self._rows, cr + r + 1))
+            for rc in range(max(0, cc - r), min(self._cols, cc + r + 1))
+        ]
+
+        with self._lock:
+            self._focus = (cc, cr)
+            # 遠くなった地域を捨てる（radius+1 まで残して、境目の行き来で読み直さない）
+            for key in [k for k in self._regions if not self._is_near(k)]:
+                del self._regions[key]
+            # 走り出している読み込みは cancel() では止まらないので、_load が目印を見て結果を捨てる
+            for key in [k for k in self._pending if not self._is_near(k)]:
+                self._pending.pop(key)[1].cancel()
+
+            # 今いる地域を先に並べる（スレッドは1本なので先に読まれる）
+            wanted.sort(key=lambda k: max(abs(k[0] - cc), abs(k[1] - cr)))
+            for key in wanted:
+                if key not in self._regions and key not in self._pending:
+                    ticket = object()
+                    self._pending[key] = (ticket, self._executor.submit(self._load, key, ticket))
+            center = self._pending.get((cc, cr))
+
+        if wait and center is not None:
+            center[1].result()
+
+    def close(self) -> None:
+        with self._lock:
+            for _, future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._focus = None
+            self._regions.clear()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
+def open_world(world_dir: Path, *, radius: int = 1) -> StreamedGrid | None:
+    """分割済みのワールドを開く（同じディレクトリなら使い回す）。無ければ None（落とさない）"""
+    world_dir = Path(world_dir).resolve()
+    key = str(world_dir)
+    grid = _WORLDS.get(key)
+    if grid is not None:
+        return grid
+    try:
+        grid = StreamedGrid(world_dir, radius=radius)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] world open failed: {world_dir} ({e})")
+        return None
+    _WORLDS[key] = grid
+    return grid
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python -m systems.maps.region_stream <csv> <out_dir> [region_size]")
+        sys.exit(1)
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_REGION_SIZE
+    print(split_world(Path(sys.argv[1]), Path(sys.argv[2]), region_size=size))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+systems/maps/visibility.py
+一人称ダンジョン表示で「どの壁が見えるか」を前もって全部計算しておくモジュール。
+
+- 見えるものは「壁の面（セグメント）」の列。マスごと・向きごとに1回だけ計算して表にする
+      ("front", k, l): 前方 k マス・横 l マス（l=-1 左 / 0 正面 / +1 右）のマスの手前の面
+      ("side", d, s):  前方 d マスにいるとき、s 側（-1 左 / +1 右）にある壁の面
+  並びは遠い → 近い（画家のアルゴリズム。そのまま描けば近い壁が上に重なる）
+- 正面が壁になったところで打ち切る（その先は見えない）
+- 1歩ごとの処理は table.segments(x, y, facing) の辞書引き1回だけ
+"""
+from __future__ import annotations
+
+from systems.maps.dungeon import FACING_DELTAS, DungeonMap
+
+
+DEFAULT_DEPTH = 4
+
+Segment = tuple[str, int, int]
+
+
+def right_of(facing: str) -> tuple[int, int]:
+    """向いている方向に対して右手の (dx, dy)（y は下向きが正）"""
+    fx, fy = FACING_DELTAS[facing]
+    return -fy, fx
+
+
+def compute_segments(dungeon: DungeonMap, x: int, y: int, facing: str, depth: int) -> tuple[Segment, ...]:
+    """(x, y) で facing を向いたときに見える壁の面（遠い順）"""
+    fx, fy = FACING_DELTAS[facing]
+    rx, ry = right_of(facing)
+
+    def wall(d: int, l: int) -> bool:
+        return dungeon.is_wall(x + fx * d + rx * l, y + fy * d + ry * l)
+
+    near_to_far: list[Segment] = []
+    for d in range(depth):
+        # 横の壁。無ければ（横道）、その先のマスの手前の面が見える
+        for side in (-1, 1):
+            if wall(d, side):
+                near_to_far.append(("side", d, side))
+            elif wall(d + 1, side):
+                near_to_far.append(("front", d + 1, side))
+        if wall(d + 1, 0):
+            near_to_far.append(("front", d + 1, 0))
+            break
+
+    near_to_far.reverse()
+    return tuple(near_to_far)
+
+
+class VisibilityTable:
+    """ダンジョン1つぶんの表。(x, y, 向き) → 見える面の列"""
+
+    def __init__(self, dungeon: DungeonMap, depth: int = DEFAULT_DEPTH):
+        self.dungeon = dungeon
+        self.depth = depth
+        self._table: dict[tuple[int, int, str], tuple[Segment, ...]] = {}
+        # 歩けるマスは全部、最初に計算してしまう（壁の中には立たないので入れない）
+        for y in range(dungeon.height):
+            for x in range(dungeon.width):
+                if dungeon.is_wall(x, y):
+                    continue
+                for facing in FACING_DELTAS:
+                    self._table[(x, y, facing)] = compute_segments(dungeon, x, y, facing, depth)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def segments(self, x: int, y: int, facing: str) -> tuple[Segment, ...]:
+        segments = self._table.get((x, y, facing))
+        if segments is None:
+            # 表に無い場所（壁の中など）は、その場で計算して覚える
+            segments = self._table[(x, y, facing)] = compute_segments(
+                self.dungeon, x, y, facing, self.depth
+            )
+        return segments
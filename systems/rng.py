@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+systems/rng.py
+ゲーム全体の乱数をまとめて管理する「乱数サービス」。
+
+- 用途ごとに別の乱数列（ストリーム）を持つ: "battle" / "encounter" など
+  → 戦闘で乱数を何回使っても、エンカウントの乱数はずれない
+- 各ストリームの種は「全体の seed + 名前」から決まる（同じ seed なら毎回同じ展開）
+- random() はまとめて作った値（バッファ）から1つずつ返すので速い
+- snapshot() / restore() で全ストリームの状態を保存・復元できる（リプレイ・セーブ用）
+
+使い方:
+    from systems.rng import rng_service
+    rng = rng_service.stream("battle")
+    if rng.random() < 0.2: ...
+"""
+from __future__ import annotations
+
+import random
+import zlib
+
+
+BUFFER_SIZE = 256
+
+
+class RngStream:
+    """
+    1つの乱数列。random.Random と同じ random() / randint() / choice() を持つ。
+
+    random() は BUFFER_SIZE 個ずつ先に作っておいた値を返す。
+    値の並びは random.Random(seed).random() を順に呼んだものと同じ。
+    """
+
+    __slots__ = ("name", "_rng", "_buffer", "_pos", "_buffer_start")
+
+    def __init__(self, name: str, seed: int):
+        self.name = name
+        self._rng = random.Random(seed)
+        self._buffer: list[float] = []
+        self._pos = 0
+        self._buffer_start = None  # バッファを作る前の Random の状態
+
+    def _refill(self) -> None:
+        self._buffer_start = self._rng.getstate()
+        rand = self._rng.random
+        self._buffer = [rand() for _ in range(BUFFER_SIZE)]
+        self._pos = 0
+
+    def random(self) -> float:
+        if self._pos >= len(self._buffer):
+            self._refill()
+        value = self._buffer[self._pos]
+        self._pos += 1
+        return value
+
+    def randoms(self, count: int) -> list[float]:
+        """random() を count 回呼んだのと同じ値をまとめて返す。"""
+        out: list[float] = []
+        while count > 0:
+            if self._pos >= len(self._buffer):
+                self._refill()
+            take = min(count, len(self._buffer) - self._pos)
+            out.extend(self._buffer[self._pos:self._pos + take])
+            self._pos += take
+            count -= take
+        return out
+
+    def randint(self, a: int, b: int) -> int:
+        """a 以上 b 以下の整数（random() 1回ぶん）"""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        if not seq:
+            raise IndexError("cannot choose from an empty sequence")
+        return seq[int(self.random() * len(seq))]
+
+    def _sync(self) -> None:
+        """使っていないバッファを捨てて、内部の Random をちょうど今の位置に合わせる。"""
+        if self._pos < len(self._buffer):
+            used = self._pos
+            self._rng.setstate(self._buffer_start)
+            rand = self._rng.random
+            for _ in range(used):
+                rand()
+        self._buffer = []
+        self._pos = 0
+        self._buffer_start = None
+
+    def as_random(self) -> random.Random:
+        """
+        今の位置に合わせた random.Random を返す（roll_damage_batch などに渡す用）。
+        これで乱数を使った後も、このストリームはその続きから返す。
+        """
+        self._sync()
+        return self._rng
+
+    def getstate(self):
+        self._sync()
+        return self._rng.getstate()
+
+    def setstate(self, state) -> None:
+        self._rng.setstate(state)
+        self._buffer = []
+        self._pos = 0
+        self._buffer_start = None
+
+
+class RngService:
+    """用途ごとの RngStream を配る。seed を決めれば全体の展開が再現できる。"""
+
+    def __init__(self, seed: int | None = None):
+        self.reseed(seed)
+
+    def reseed(self, seed: int | None = None) -> None:
+        """全体の seed を決め直す（None なら毎回ちがう展開）。既存のストリームも作り直す。"""
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.seed = seed
+        self._streams: dict[str, RngStream] = {}
+
+    def _stream_seed(self, name: str) -> int:
+        # hash() はプロセスごとに変わるので crc32 で名前を数値にする
+        return (self.seed << 32) ^ zlib.crc32(name.encode("utf-8"))
+
+    def stream(self, name: str) -> RngStream:
+        rng = self._streams.get(name)
+        if rng is None:
+            rng = RngStream(name, self._stream_seed(name))
+            self._streams[name] = rng
+        return rng
+
+    def snapshot(self) -> dict:
+        """全ストリームの状態（pickle / 保存用にそのまま使える）"""
+        return {
+            "seed": self.seed,
+            "streams": {name: rng.getstate() for name, rng in self._streams.items()},
+        }
+
+    def restore(self, snapshot: dict) -> None:
+        self.seed = snapshot["seed"]
+        self._streams = {}
+        for name, state in snapshot["streams"].items():
+            self.stream(name).setstate(state)
+
+
+# プロセスで1つだけ使う（テストやシミュレーションでは RngService(seed) を別に作ればよい）
+rng_service = RngService()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+systems/save/save_data.py
+セーブデータの形（バイナリ）を決めるモジュール。ファイルの読み書きは save_manager.py。
+
+ファイル = ヘッダ + セクションの並び（すべてリトルエンディアン）
+    ヘッダ:     magic "VKSV", 形式の版 (H), セクション数 (H)
+    セクション: tag (4byte), flags (B), 長さ (I), crc32 (I) + 中身
+        flags の bit0 = 中身が zlib で縮めてある（大きいセクションだけ。縮まなければそのまま）
+        crc32 は縮める前の中身のもの（壊れたセクションは読まずに捨てる）
+
+セクション（知らない tag は読み飛ばすので、後から増やしても古い版で開ける）
+    PLYR: プレイヤーの Status（名前 + max_hp, hp, attack, defense）
+    POSN: 今の画面名 + マップごとの位置（x, y, 向き, 歩数）
+    EXPL: 行ったマスの記録（ExplorationStore.to_blob() のまま）
+    RNG : 乱数サービスの状態（seed + ストリームごとの Mersenne Twister の状態）
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+
+from entities.status import Status
+
+
+MAGIC = b"VKSV"
+FORMAT_VERSION = 1
+
+TAG_PLAYER = b"PLYR"
+TAG_POSITION = b"POSN"
+TAG_EXPLORATION = b"EXPL"
+TAG_RNG = b"RNG "
+
+# これより小さいセクションは縮めない（縮めても得にならない）
+COMPRESS_MIN_SIZE = 256
+FLAG_ZLIB = 1
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<4sBII")
+_STATUS = struct.Struct("<iiii")
+_POSITION = struct.Struct("<iiBI")
+_COUNT = struct.Struct("<H")
+_MT_STATE = struct.Struct("<B625I")
+_GAUSS = struct.Struct("<Bd")
+
+# 向きは1byteで持つ（無い＝255）
+FACINGS = ("N", "E", "S", "W")
+NO_FACING = 255
+
+
+class MapPosition:
+    """マップ1枚ぶんの位置（向きが無いマップは facing=""）"""
+
+    __slots__ = ("x", "y", "facing", "steps")
+
+    def __init__(self, x: int, y: int, facing: str = "", steps: int = 0):
+        self.x = x
+        self.y = y
+        self.facing = facing
+        self.steps = steps
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(x={self.x}, y={self.y}, facing={self.facing!r}, steps={self.steps})"
+
+
+class SaveData:
+    """読み込んだセーブの中身。無かったセクションは None / 空のまま"""
+
+    __slots__ = ("player", "screen", "positions", "exploration", "rng")
+
+    def __init__(self):
+        self.player: Status | None = None
+        self.screen = ""
+        self.positions: dict[str, MapPosition] = {}
+        self.exploration: bytes | None = None
+        self.rng: dict | None = None
+
+
+# --- 文字列（長さ H + UTF-8） ---
+def _pack_str(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    return _COUNT.pack(len(raw)) + raw
+
+
+def _unpack_str(data: bytes, offset: int) -> tuple[str, int]:
+    (length,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    return data[offset:offset + length].decode("utf-8"), offset + length
+
+
+# --- PLYR ---
+def encode_player(status: Status) -> bytes:
+    return _pack_str(status.name) + _STATUS.pack(status.max_hp, status.hp, status.attack, status.defense)
+
+
+def decode_player(data: bytes) -> Status:
+    name, offset = _unpack_str(data, 0)
+    max_hp, hp, attack, defense = _STATUS.unpack_from(data, offset)
+    return Status(name=name, max_hp=max_hp, attack=attack, defense=defense, hp=hp)
+
+
+# --- POSN ---
+def encode_positions(screen: str, positions: dict[str, MapPosition]) -> bytes:
+    parts = [_pack_str(screen), _COUNT.pack(len(positions))]
+    for name, pos in positions.items():
+        facing = FACINGS.index(pos.facing) if pos.facing in FACINGS else NO_FACING
+        parts.append(_pack_str(name))
+        parts.append(_POSITION.pack(pos.x, pos.y, facing, pos.steps))
+    return b"".join(parts)
+
+
+def decode_positions(data: bytes) -> tuple[str, dict[str, MapPosition]]:
+    screen, offset = _unpack_str(data, 0)
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    positions = {}
+    for _ in range(count):
+        name, offset = _unpack_str(data, offset)
+        x, y, facing, steps = _POSITION.unpack_from(data, offset)
+        offset += _POSITION.size
+        positions[name] = MapPosition(x, y, FACINGS[facing] if facing < len(FACINGS) else "", steps)
+    return screen, positions
+
+
+# --- RNG ---
+def encode_rng(snapshot: dict) -> bytes:
+    """RngService.snapshot() を詰める（random.Random.getstate() の形: (版, 625個の整数, gauss)）"""
+    # seed は大きさが決まっていない int なので10進の文字列で持つ
+    parts = [_pack_str(str(snapshot["seed"])), _COUNT.pack(len(snapshot["streams"]))]
+    for name, (version, internal, gauss_next) in snapshot["streams"].items():
+        parts.append(_pack_str(name))
+        parts.append(_MT_STATE.pack(version, *internal))
+        parts.append(_GAUSS.pack(gauss_next is not None, gauss_next or 0.0))
+    return b"".join(parts)
+
+
+def decode_rng(data: bytes) -> dict:
+    seed, offset = _unpack_str(data, 0)
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    streams = {}
+    for _ in range(count):
+        name, offset = _unpack_str(data, offset)
+        version, *internal = _MT_STATE.unpack_from(data, offset)
+        offset += _MT_STATE.size
+        has_gauss, gauss = _GAUSS.unpack_from(data, offset)
+        offset += _GAUSS.size
+        streams[name] = (version, tuple(internal), gauss if has_gauss else None)
+    return {"seed": int(seed), "streams": streams}
+
+
+# --- ファイル全体 ---
+def pack_section(tag: bytes, raw: bytes) -> bytes:
+    """セクション1つぶん（ヘッダ + 中身）。大きければ zlib で縮める"""
+    payload, flags = raw, 0
+    if len(raw) >= COMPRESS_MIN_SIZE:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            payload, flags = packed, FLAG_ZLIB
+    return _SECTION.pack(tag, flags, len(payload), zlib.crc32(raw)) + payload
+
+
+def pack_file(sections: list[bytes]) -> bytes:
+    """pack_section で作ったものを並べて1つのファイルにする"""
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)) + b"".join(sections)
+
+
+def unpack_file(data: bytes) -> dict[bytes, bytes]:
+    """tag → 中身（縮めたものは戻す）。形式が違えば ValueError。壊れたセクションは入れない"""
+    if len(data) < _HEADER.size:
+        raise ValueError("save file is too short")
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a save file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported save format version: {version}")
+
+    sections = {}
+    offset = _HEADER.size
+    for _ in range(count):
+        if offset + _SECTION.size > len(data):
+            raise ValueError("save file is truncated")
+        tag, flags, length, crc = _SECTION.unpack_from(data, offset)
+        offset += _SECTION.size
+        payload = data[offset:offset + length]
+        offset += length
+        if len(payload) != length:
+            raise ValueError("save file is truncated")
+        try:
+            raw = zlib.decompress(payload) if flags & FLAG_ZLIB else payload
+        except zlib.error:
+            raw = None
+        if raw is None or zlib.crc32(raw) != crc:
+            print(f"[WARN] save section {tag!r} is corrupted (skipped)")
+            continue
+        sections[tag] = raw
+    return sections
+
+
+def decode_save(data: bytes) -> SaveData:
+    """ファイルの中身 → SaveData"""
+    return decode_sections(unpack_file(data))
+
+
+def decode_sections(sections: dict[bytes, bytes]) -> SaveData:
+    """unpack_file の結果 → SaveData（知らないセクションは無視）"""
+    save = SaveData()
+    if TAG_PLAYER in sections:
+        save.player = decode_player(sections[TAG_PLAYER])
+    if TAG_POSITION in sections:
+        save.screen, save.positions = decode_positions(sections[TAG_POSITION])
+    if TAG_EXPLORATION in sections:
+        save.exploration = sections[TAG_EXPLORATION]
+    if TAG_RNG in sections:
+        save.rng = decode_rng(sections[TAG_RNG])
+    return save
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+systems/save/save_manager.py
+セーブファイルの読み書き（形は save_data.py）。
+
+- セクションは add_section(tag, encode, version) で登録する
+      encode():  今の状態 → バイト列（メインスレッドで呼ぶ。ゲームの状態に触るのはここだけ）
+      version(): 変わったかどうかの目印（省略可）。前回と同じなら encode も呼ばない
+- autosave() は「前回から変わったセクション」があるときだけ書く。変わっていなければ何もしない
+  変わっていないセクションは前回作ったバイト列（縮めたもの）をそのまま使う
+- ファイルへの書き込みは裏のスレッドで行う（画面切り替えの瞬間に UI が止まらない）
+  いったん *.tmp に書いて fsync してから os.replace で入れ替えるので、
+  途中で落ちても前のセーブが残る（半分だけ書かれたファイルにはならない）
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from systems.save.save_data import SaveData, decode_sections, pack_file, pack_section, unpack_file
+
+
+class SaveManager:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+
+        # tag → (encode, version)。登録した順にファイルへ並べる
+        self._sections: dict[bytes, tuple[Callable[[], bytes], Callable[[], object] | None]] = {}
+        # メインスレッド側: 前回の中身と目印
+        self._raw: dict[bytes, bytes] = {}
+        self._versions: dict[bytes, object] = {}
+        # 書き込みスレッド側: tag → (中身, pack_section した結果)
+        self._packed: dict[bytes, tuple[bytes, bytes]] = {}
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save")
+        self._future: Future | None = None
+        # 書き込みに失敗したら、次は全部を「変わった」ことにして書き直す
+        self._failed = False
+
+    def add_section(self, tag: bytes, encode: Callable[[], bytes],
+                    version: Callable[[], object] | None = None) -> None:
+        self._sections[tag] = (encode, version)
+
+    # ----------------------------
+    # 読み込み
+    # ----------------------------
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> SaveData | None:
+        """セーブを読む。無い・壊れているときは None（落とさない）"""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"[WARN] save load failed: {self.path} ({e})")
+            return None
+
+        try:
+            sections = unpack_file(data)
+            save = decode_sections(sections)
+        except Exception as e:
+            print(f"[WARN] save file is broken: {self.path} ({e})")
+            return None
+
+        # 読んだ中身を「前回の中身」にしておく（何も変わっていなければ次の autosave は書かない）
+        self._raw = dict(sections)
+        self._versions.clear()
+        return save
+
+    # ----------------------------
+    # 書き込み
+    # ----------------------------
+    def _collect(self) -> dict[bytes, bytes] | None:
+        """今の中身を集める。前回から何も変わっていなければ None"""
+        dirty = self._failed
+        raws = {}
+        for tag, (encode, version) in self._sections.items():
+            key = version() if version is not None else None
+            if key is not None and tag in self._raw and self._versions.get(tag) == key:
+                raws[tag] = self._raw[tag]
+                continue
+            raw = encode()
+            if raw != self._raw.get(tag):
+                dirty = True
+                self._raw[tag] = raw
+            raws[tag] = self._raw[tag]
+            if key is not None:
+                self._versions[tag] = key
+        if not dirty:
+            return None
+        self._failed = False
+        return raws
+
+    def autosave(self) -> bool:
+        """変わったセクションがあれば裏のスレッドで書く（書くことにしたら True）"""
+        raws = self._collect()
+        if raws is None:
+            return False
+        self._future = self._executor.submit(self._write, raws)
+        return True
+
+    def save_now(self) -> None:
+        """今すぐ書いて、書き終わるまで待つ（アプリを閉じるとき用）"""
+        raws = self._collect()
+        if raws is not None:
+            self._future = self._executor.submit(self._write, raws)
+        self.wait()
+
+    def wait(self) -> None:
+        if self._future is not None:
+            self._future.result()
+
+    def _write(self, raws: dict[bytes, bytes]) -> None:
+        """書き込みスレッドで動く。変わっていないセクションは前回の結果を使い回す"""
+        sections = []
+        for tag, raw in raws.items():
+            cached = self._packed.get(tag)
+            if cached is None or cached[0] != raw:
+                cached = self._packed[tag] = (raw, pack_section(tag, raw))
+            sections.append(cached[1])
+        data = pack_file(sections)
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(self._tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] save write failed: {self.path} ({e})")
+            self._failed = True
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+systems/startup_profiler.py
+起動にかかった時間を「import ごと」「画面を作るごと」に測って、タイトルが出たところで表にして出す。
+
+    VKRPG_PROFILE_STARTUP=1 python main.py
+
+- 環境変数が無ければ何もしない（section() も素通り。普段の起動には影響しない）
+- import は builtins.__import__ を包んで、まだ読まれていないモジュールだけ測る
+  （時間は「中で読んだ import も含む」合計。字下げが深いほど内側）
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from time import perf_counter
+import builtins
+import os
+import sys
+
+
+ENV_VAR = "VKRPG_PROFILE_STARTUP"
+# 表に出す import の最低時間（ms）。細かいものまで出すと読めないので
+MIN_IMPORT_MS = 5.0
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.t0 = perf_counter()
+        # (種類, 名前, ms, 深さ, 始まった時刻)
+        self.records: list[tuple[str, str, float, int, float]] = []
+        self._depth = 0
+        self._orig_import = None
+        self.reported = False
+
+    @contextmanager
+    def section(self, kind: str, name: str):
+        """with profiler.section("screen", "town"): ... の中の時間を記録する"""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.records.append((kind, name, (perf_counter() - start) * 1000, self._depth, start))
+
+    def install_import_hook(self) -> None:
+        if not self.enabled or self._orig_import is not None:
+            return
+        orig = self._orig_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return orig(name, globals, locals, fromlist, level)
+            with self.section("import", name):
+                return orig(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = timed_import
+
+    def uninstall_import_hook(self) -> None:
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    def report(self, label: str = "first frame") -> None:
+        """ここまでの記録を表にして出す（1回だけ）。import の計測もここで止める。"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        self.uninstall_import_hook()
+
+        total = (perf_counter() - self.t0) * 1000
+        print(f"[STARTUP] {label}: {total:.1f} ms since launch")
+        for kind, name, ms, depth, _ in sorted(self.records, key=lambda r: r[4]):
+            if kind == "import" and ms < MIN_IMPORT_MS:
+                continue
+            print(f"[STARTUP] {ms:8.1f} ms  {'  ' * depth}{kind}: {name}")
+
+
+profiler = StartupProfiler(enabled=os.environ.get(ENV_VAR, "") not in ("", "0"))
@@ -1,35 +1,56 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from collections import deque
 from pathlib import Path
 
 from kivy.animation import Animation
 from kivy.clock import Clock
 from kivy.core.text import LabelBase
-from kivy.core.window import Window
 from kivy.lang import Builder
 from kivy.metrics import dp
-from kivy.properties import NumericProperty, ObjectProperty, StringProperty
+from kivy.properties import BooleanProperty, NumericProperty, ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 
+from systems.assets.texture_cache import texture_cache
 from systems.battle.battle_controller import BattleController
+from systems.input.dispatcher import input_dispatcher
 
 
-# フォント登録
 _FONT_PATH = Path(__file__).resolve().parent.parent / "assets" / "fonts" / "GenShinGothic-Regular.ttf"
-if _FONT_PATH.exists():
-    try:
-        LabelBase.register(name="GenShin", fn_regular=str(_FONT_PATH))
-    except Exception:
-        pass
-
-# KV読み込み
-Builder.load_file(str(Path(__file__).resolve().parent / "battle_window.kv"))
+_KV_PATH = Path(__file__).resolve().parent / "battle_window.kv"
+_resources_loaded = False
+
+# 同時に出しておくダメージ表示の上限（超えたら一番古いものを使い回す）
+MAX_POPUPS = 6
+POPUP_DURATION = 0.8
+# HP表示が目標に追いつくまでの時間（ダメージの大きさに関係なく一定）
+HP_TWEEN_SECONDS = 0.4
+
+
+def load_battle_resources() -> None:
+    """
+    フォント登録 + KV読み込み（最初の BattleWindow を作るときに1回だけ）。
+    import しただけでは読まないので、タイトルが出るまでの時間に入らない。
+    """
+    global _resources_loaded
+    if _resources_loaded:
+        return
+    _resources_loaded = True
+
+    if _FONT_PATH.exists():
+        try:
+            LabelBase.register(name="GenShin", fn_regular=str(_FONT_PATH))
+        except Exception:
+            pass
+    Builder.load_file(str(_KV_PATH))
 
 
 class BattleWindow(BoxLayout):
     enemy_image = StringProperty("")
+    # 敵画像は texture_cache から受け取る（同じ敵なら2戦目以降はデコードしない）
+    enemy_texture = ObjectProperty(None, allownone=True)
 
     # 表示用
     message = StringProperty("コマンド？")
@@ -48,6 +69,8 @@ class BattleWindow(BoxLayout):
 
     # 制御
     mode = StringProperty("command")  # command / resolving / finished
+    # 早送り: たまったログを1フレームで全部流す（オートバトル・演出スキップ用）
+    fast_forward = BooleanProperty(False)
     _controller = ObjectProperty(None, rebind=True)
     _event = ObjectProperty(None, allownone=True)
 
@@ -56,15 +79,32 @@ class BattleWindow(BoxLayout):
     _selected_index = 0
 
     def __init__(self, **kwargs):
+        # KV のルールは super().__init__ で当たるので、その前に読む
+        load_battle_resources()
         super().__init__(**kwargs)
-        Window.bind(on_key_down=self._on_key_down)
+        self._screen_name = ""
+
+        # ダメージ表示の Label は使い回す（1ヒットごとに作って捨てない）
+        self._popup_pool: list[Label] = []
+        self._live_popups: deque[tuple[Label, Animation]] = deque()
+        # 演出の Animation は作ったものを覚えておく（キー: 形が決まる値）
+        self._popup_anims: dict[tuple, Animation] = {}
+        self._shake_anims: dict[tuple, Animation] = {}
+        self._shake_rest_x: float | None = None
+        self._hero_anim: Animation | None = None
+
+        # HPの表示アニメ（1本だけ。途中で新しい目標が来たら今の表示から引き直す）
+        self._hp_event = None
+        self._hp_from = (0.0, 0.0)
+        self._hp_elapsed = 0.0
 
     def on_parent(self, *args):
+        # キー入力は InputDispatcher から（載っている画面が表示中のときだけ届く）
         if self.parent is None:
-            try:
-                Window.unbind(on_key_down=self._on_key_down)
-            except Exception:
-                pass
+            input_dispatcher.unregister(self._screen_name, self)
+            return
+        self._screen_name = getattr(self.parent, "name", "")
+        input_dispatcher.register(self._screen_name, self)
 
     # ----------------------------
     # 戦闘開始
@@ -80,6 +120,7 @@ class BattleWindow(BoxLayout):
         self.player_name = controller.player.name
         self.enemy_name = controller.enemy.name
         self.enemy_image = enemy_info.get("image", "") if enemy_info else ""
+        self.enemy_texture = texture_cache.get(self.enemy_image)
 
         self.display_player_hp = controller.player.hp
         self.display_enemy_hp = controller.enemy.hp
@@ -88,11 +129,13 @@ class BattleWindow(BoxLayout):
 
         self.player_hp = f"HP: {self.display_player_hp}"
         self.enemy_hp = f"HP: {self.display_enemy_hp}"
+        self._stop_hp_tween()
 
         self.mode = "command"
         self._selected_index = 0
         self._refresh_command_text()
         self.message = "コマンド？"
+        self.clear_popups()
 
         if self._event is not None:
             try:
@@ -114,40 +157,29 @@ class BattleWindow(BoxLayout):
     # ----------------------------
     # 入力
     # ----------------------------
-    def _on_key_down(self, _window, key, scancode, codepoint, modifiers):
-        if self.parent is None:
-            return False
+    def accepts_input(self, action: str) -> bool:
+        """コマンド選択中だけ、上下・決定・Esc を受け取る（それ以外は Window に返す）"""
+        return self.mode == "command" and action in ("up", "down", "confirm", "cancel")
 
-        if self.mode == "finished":
-            return False
-
-        if self.mode == "command":
-            # 上
-            if key == 273 or codepoint in ("w", "W"):
-                self._selected_index = (self._selected_index - 1) % len(self._commands)
-                self._refresh_command_text()
-                return True
-
-            # 下
-            if key == 274 or codepoint in ("s", "S"):
-                self._selected_index = (self._selected_index + 1) % len(self._commands)
-                self._refresh_command_text()
-                return True
-
-            # 決定
-            if key in (13, 32, 271):  # Enter / Space / Numpad Enter
-                if self._selected_index == 0:
-                    self._do_attack()
-                else:
-                    self._do_escape()
-                return True
+    def on_input(self, action: str, pressed: bool) -> None:
+        # 押したときだけ（離したときは何もしない）。キューに残っていた分はモードで弾く
+        if not pressed or self.mode != "command":
+            return
 
-            # Esc は にげる
-            if key == 27:
+        if action == "up":
+            self._selected_index = (self._selected_index - 1) % len(self._commands)
+            self._refresh_command_text()
+        elif action == "down":
+            self._selected_index = (self._selected_index + 1) % len(self._commands)
+            self._refresh_command_text()
+        elif action == "confirm":
+            if self._selected_index == 0:
+                self._do_attack()
+            else:
                 self._do_escape()
-                return True
-
-        return False
+        elif action == "cancel":
+            # Esc は にげる
+            self._do_escape()
 
     # ----------------------------
     # コマンド処理
@@ -164,8 +196,11 @@ class BattleWindow(BoxLayout):
         # ここで初めて1ターン処理
         self._controller.take_turn()
 
-        # ログを時間差で流す
-        self._event = Clock.schedule_interval(self._consume_log, 0.8)
+        # ログを時間差で流す（早送り中は次のフレームでまとめて）
+        if self.fast_forward:
+            self._event = Clock.schedule_once(self._consume_log, 0)
+        else:
+            self._event = Clock.schedule_interval(self._consume_log, 0.8)
         
     def _do_escape(self):
         self.mode = "finished"
@@ -188,29 +223,15 @@ class BattleWindow(BoxLayout):
             self.message = "コマンド？"
             return False
 
-        # まだログがある間は1件ずつ流す
+        # まだログがある間は1件ずつ流す（早送りなら全部まとめて）
         if self._controller.has_log():
-            log = self._controller.pop_log()
-            if not log:
-                # 想定外でも止まらず次ターンへ戻す
-                self.mode = "command"
-                self._selected_index = 0
-                self._refresh_command_text()
-                self.message = "コマンド？"
-                return False
-
-            self.show_message(log["text"])
-
-            damage = log.get("damage", 0)
-            critical = log.get("critical", False)
-            target = log.get("target", "enemy")
-
-            if damage:
-                self.shake()
-                self.show_damage_popup(damage, target, critical=critical)
+            logs = self._controller.drain(None if self.fast_forward else 1)
+            for log in logs:
+                self._apply_log(log)
 
             self.update_status(self._controller.player, self._controller.enemy)
-            return True
+            if not self.fast_forward:
+                return True
 
         # ここに来た時点でログは空
         if self._event is not None:
@@ -243,17 +264,45 @@ class BattleWindow(BoxLayout):
         return False
     
     
+    def _apply_log(self, log):
+        self.show_message(log["text"])
+
+        damage = log.get("damage", 0)
+        critical = log.get("critical", False)
+        target = log.get("target", "enemy")
+
+        if damage:
+            self.shake()
+            self.show_damage_popup(damage, target, critical=critical)
+
     def shake(self, strength=dp(10), duration=0.05):
         stage = self.ids.battle_stage
-        original_x = stage.x
 
-        anim = (
-            Animation(x=original_x - strength, duration=duration) +
-            Animation(x=original_x + strength, duration=duration) +
-            Animation(x=original_x - strength / 2, duration=duration) +
-            Animation(x=original_x, duration=duration)
-        )
+        # 揺れている途中なら止めて元の位置から揺らし直す（途中の x を基準にしてずれないように）
+        if self._shake_rest_x is None:
+            self._shake_rest_x = stage.x
+        else:
+            Animation.cancel_all(stage, "x")
+            stage.x = self._shake_rest_x
+        original_x = self._shake_rest_x
+
+        key = (original_x, strength, duration)
+        anim = self._shake_anims.get(key)
+        if anim is None:
+            if len(self._shake_anims) > 8:
+                self._shake_anims.clear()  # 画面サイズが何度も変わったとき用
+            anim = (
+                Animation(x=original_x - strength, duration=duration) +
+                Animation(x=original_x + strength, duration=duration) +
+                Animation(x=original_x - strength / 2, duration=duration) +
+                Animation(x=original_x, duration=duration)
+            )
+            anim.bind(on_complete=self._on_shake_complete)
+            self._shake_anims[key] = anim
         anim.start(stage)
+
+    def _on_shake_complete(self, _anim, _stage):
+        self._shake_rest_x = None
     
     def _return_to_field(self, dt):
         if self.parent and self.parent.manager:
@@ -265,26 +314,47 @@ class BattleWindow(BoxLayout):
     # 表示更新
     # ----------------------------
     def update_status(self, player_status, enemy_status):
+        """
+        HP表示を新しい値へ動かす。HP_TWEEN_SECONDS かけて比例で近づける。
+        動いている途中に呼ばれても Clock は増やさず、今の表示位置から新しい目標へ引き直す。
+        """
+        if (player_status.hp, enemy_status.hp) == (self._target_player_hp, self._target_enemy_hp):
+            return
         self._target_player_hp = player_status.hp
         self._target_enemy_hp = enemy_status.hp
-        Clock.schedule_interval(self._animate_hp, 0.05)
+        self._hp_from = (self.display_player_hp, self.display_enemy_hp)
+        self._hp_elapsed = 0.0
+        if self._hp_event is None:
+            self._hp_event = Clock.schedule_interval(self._animate_hp, 0)
 
     def _animate_hp(self, dt):
-        finished = True
-
-        if self.display_player_hp > self._target_player_hp:
-            self.display_player_hp -= 1
-            finished = False
+        self._hp_elapsed += dt
+        t = min(1.0, self._hp_elapsed / HP_TWEEN_SECONDS)
+        from_player, from_enemy = self._hp_from
 
-        if self.display_enemy_hp > self._target_enemy_hp:
-            self.display_enemy_hp -= 1
-            finished = False
-
-        self.player_hp = f"HP: {self.display_player_hp}"
-        self.enemy_hp = f"HP: {self.display_enemy_hp}"
+        self._set_display_hp(
+            round(from_player + (self._target_player_hp - from_player) * t),
+            round(from_enemy + (self._target_enemy_hp - from_enemy) * t),
+        )
 
-        if finished:
+        if t >= 1.0:
+            self._hp_event = None
             return False
+        return True
+
+    def _set_display_hp(self, player_hp: int, enemy_hp: int) -> None:
+        # 数字が変わったフレームだけ文字列を作り直す
+        if player_hp != self.display_player_hp:
+            self.display_player_hp = player_hp
+            self.player_hp = f"HP: {player_hp}"
+        if enemy_hp != self.display_enemy_hp:
+            self.display_enemy_hp = enemy_hp
+            self.enemy_hp = f"HP: {enemy_hp}"
+
+    def _stop_hp_tween(self):
+        if self._hp_event is not None:
+            self._hp_event.cancel()
+            self._hp_event = None
 
     def show_message(self, text: str):
         self.message = text
@@ -293,37 +363,73 @@ class BattleWindow(BoxLayout):
     # ダメージ演出（簡易）
     # ----------------------------
     def show_damage_popup(self, damage, target, critical=False):
-        label = Label(
-            text=str(damage),
+        stage = self.ids.battle_stage
+
+        # 出しすぎたら一番古いものを引き上げて使い回す
+        if len(self._live_popups) >= MAX_POPUPS:
+            old_label, old_anim = self._live_popups[0]
+            old_anim.cancel(old_label)
+            self._release_popup(old_label)
+
+        label = self._popup_pool.pop() if self._popup_pool else Label(
             font_name="GenShin",
             font_size="32sp",
             color=(1, 0, 0, 1),
             size_hint=(None, None),
             size=(dp(100), dp(50)),
         )
-
-        stage = self.ids.battle_stage
+        label.text = str(damage)
+        label.opacity = 1
 
         if target == "enemy":
             label.center = (stage.width * 0.50, stage.height * 0.55)
         else:
             label.center = (stage.width * 0.22, stage.height * 0.30)
 
-        stage.add_widget(label)
+        if label.parent is None:
+            stage.add_widget(label)
 
-        anim = Animation(y=label.y + dp(40), opacity=0, duration=0.8)
-        anim.bind(on_complete=lambda *x: stage.remove_widget(label))
+        # 同じ出発点なら同じ Animation を使う（1つの Animation は複数の Label に同時に掛けられる）
+        key = (target, label.y)
+        anim = self._popup_anims.get(key)
+        if anim is None:
+            if len(self._popup_anims) > 8:
+                self._popup_anims.clear()
+            anim = Animation(y=label.y + dp(40), opacity=0, duration=POPUP_DURATION)
+            anim.bind(on_complete=lambda _anim, widget: self._release_popup(widget))
+            self._popup_anims[key] = anim
+
+        self._live_popups.append((label, anim))
         anim.start(label)
-        
-        
+
+    def _release_popup(self, label):
+        """表示を終えた Label を片付けてプールへ戻す"""
+        for i, (live, _) in enumerate(self._live_popups):
+            if live is label:
+                del self._live_popups[i]
+                break
+        else:
+            return
+        if label.parent is not None:
+            label.parent.remove_widget(label)
+        self._popup_pool.append(label)
+
+    def clear_popups(self):
+        while self._live_popups:
+            label, anim = self._live_popups[0]
+            anim.cancel(label)
+            self._release_popup(label)
+
     def animate_hero_attack(self):
         hero = self.ids.hero_image
 
-        original_cx = hero.pos_hint.get("center_x", 0.78)
-        forward_cx = original_cx - 0.12   # 左へ前進（敵が左側なので）
-
-        anim = (
-            Animation(pos_hint={"center_x": forward_cx, "center_y": 0.52}, duration=0.12) +
-            Animation(pos_hint={"center_x": original_cx, "center_y": 0.52}, duration=0.12)
-        )
-        anim.start(hero)
\ No newline at end of file
+        # 1回目に作った前進→戻りの Animation を使い回す（pos_hint は比率なので画面サイズに依らない）
+        if self._hero_anim is None:
+            original_cx = hero.pos_hint.get("center_x", 0.78)
+            forward_cx = original_cx - 0.12   # 左へ前進（敵が左側なので）
+            self._hero_anim = (
+                Animation(pos_hint={"center_x": forward_cx, "center_y": 0.52}, duration=0.12) +
+                Animation(pos_hint={"center_x": original_cx, "center_y": 0.52}, duration=0.12)
+            )
+        Animation.cancel_all(hero, "pos_hint")
+        self._hero_anim.start(hero)
\ No newline at end of file
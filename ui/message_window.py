@@ -1,14 +1,32 @@
+from pathlib import Path
+
+from kivy.lang import Builder
 from kivy.uix.boxlayout import BoxLayout
 from kivy.properties import StringProperty
 
 
+Builder.load_file(str(Path(__file__).resolve().parent / "message_window.kv"))
+
+
 class MessageWindow(BoxLayout):
     # 画面下部にメッセージを表示するシンプルなウィンドウ
     text = StringProperty("")
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lines = []
+        self._index = 0
+
     def show_message(self, text_list):
-        # セリフのリストを受け取り、最初の1行だけ表示する簡易版。
-        if not text_list:
-            self.text = ""
-            return
-        self.text = text_list[0]
+        # セリフのリストを受け取り、最初の1行を表示する。続きは advance() で送る。
+        self._lines = list(text_list or [])
+        self._index = 0
+        self.text = self._lines[0] if self._lines else ""
+
+    def advance(self) -> bool:
+        # 次の行へ。もう行が無ければ False（閉じるのは呼んだ側）
+        self._index += 1
+        if self._index >= len(self._lines):
+            return False
+        self.text = self._lines[self._index]
+        return True
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+目的: ダンジョンを上から見た図を「1マス=1ピクセル」のテクスチャで描く。
+なぜ: 1歩ごとに地図全体の文字列を作り直すと、大きいダンジョンほど重くなるため。
+
+- 色は bytearray（1マス4byte, RGBA）に持っておき、最初に1回だけテクスチャへ書く
+- プレイヤが動いたら「出たマス」と「入ったマス」の2マスだけ書き直す（blit_buffer の部分転送）
+- 拡大表示は nearest（ぼかさない）。マスが正方形になるよう、ウィジェットの中に収める
+- exploration（ExplorationMap）を渡すとオートマップになる。まだ見ていないマスは塗りつぶし、
+  1歩ごとに新しく見えた四角だけを部分転送する
+"""
+from __future__ import annotations
+
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
+from kivy.uix.widget import Widget
+
+from systems.maps.dungeon import DungeonMap
+from systems.maps.exploration import ExplorationMap
+
+FLOOR_RGBA = bytes((40, 40, 48, 255))
+WALL_RGBA = bytes((150, 140, 120, 255))
+PLAYER_RGBA = bytes((240, 200, 60, 255))
+UNKNOWN_RGBA = bytes((0, 0, 0, 255))
+
+# 1歩ごとに「見た」ことにする範囲（となりのマスの壁まで）
+REVEAL_RADIUS = 1
+
+
+class DungeonGridView(Widget):
+    def __init__(self, dungeon: DungeonMap, exploration: ExplorationMap | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.dungeon = dungeon
+        self.exploration = exploration
+        self.player: tuple[int, int] | None = None
+
+        w, h = dungeon.width, dungeon.height
+        self._buf = bytearray(w * h * 4)
+        for y in range(h):
+            for x in range(w):
+                self._buf_set(x, y, self.cell_rgba(x, y))
+
+        self._texture = Texture.create(size=(w, h), colorfmt="rgba")
+        self._texture.mag_filter = "nearest"
+        self._texture.min_filter = "nearest"
+        self._texture.blit_buffer(bytes(self._buf), colorfmt="rgba", bufferfmt="ubyte")
+
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self._rect = Rectangle(texture=self._texture)
+        self.bind(pos=self._layout, size=self._layout)
+        self._layout()
+
+    def _offset(self, x: int, y: int) -> int:
+        # テクスチャは下の行から。ダンジョンは y=0 が上なのでひっくり返す
+        return ((self.dungeon.height - 1 - y) * self.dungeon.width + x) * 4
+
+    def _buf_set(self, x: int, y: int, rgba: bytes) -> None:
+        i = self._offset(x, y)
+        self._buf[i:i + 4] = rgba
+
+    def _layout(self, *args) -> None:
+        w, h = self.dungeon.width, self.dungeon.height
+        cell = min(self.width / w, self.height / h) if w and h else 0
+        size = (cell * w, cell * h)
+        self._rect.size = size
+        self._rect.pos = (self.center_x - size[0] / 2, self.center_y - size[1] / 2)
+
+    def _paint(self, x: int, y: int, rgba: bytes) -> None:
+        """1マスだけ書き直す（bytearray とテクスチャの両方）"""
+        self._buf_set(x, y, rgba)
+        self._texture.blit_buffer(
+            rgba, pos=(x, self.dungeon.height - 1 - y), size=(1, 1),
+            colorfmt="rgba", bufferfmt="ubyte",
+        )
+
+    def _paint_area(self, area: tuple[int, int, int, int]) -> None:
+        """area = (x0, y0, x1, y1)（両端を含む）をまとめて書き直す（部分転送は1回）"""
+        x0, y0, x1, y1 = area
+        rows = []
+        # テクスチャの下の行（= ダンジョンの y が大きい方）から並べる
+        for y in range(y1, y0 - 1, -1):
+            for x in range(x0, x1 + 1):
+                self._buf_set(x, y, PLAYER_RGBA if self.player == (x, y) else self.cell_rgba(x, y))
+            i = self._offset(x0, y)
+            rows.append(self._buf[i:i + (x1 - x0 + 1) * 4])
+        self._texture.blit_buffer(
+            b"".join(rows), pos=(x0, self.dungeon.height - 1 - y1), size=(x1 - x0 + 1, y1 - y0 + 1),
+            colorfmt="rgba", bufferfmt="ubyte",
+        )
+
+    def cell_rgba(self, x: int, y: int) -> bytes:
+        if self.exploration is not None and not self.exploration.is_explored(x, y):
+            return UNKNOWN_RGBA
+        return WALL_RGBA if self.dungeon.is_wall(x, y) else FLOOR_RGBA
+
+    def set_player(self, x: int, y: int) -> None:
+        """プレイヤの位置を変える。書き直すのは前のマスと今のマスだけ"""
+        if self.player == (x, y):
+            return
+        if self.player is not None:
+            self._paint(*self.player, self.cell_rgba(*self.player))
+        self.player = (x, y)
+        self._paint(x, y, PLAYER_RGBA)
+        if self.exploration is not None:
+            area = self.exploration.mark_area(x, y, REVEAL_RADIUS)
+            if area is not None:
+                self._paint_area(area)
+        self.canvas.ask_update()
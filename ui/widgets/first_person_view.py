@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+目的: ダンジョンを一人称（Wizardry 風のワイヤーフレームならぬ面塗り）で描く。
+なぜ: 見える壁は VisibilityTable が前計算済みなので、1歩ごとは「表を引いて並べ替える」だけにするため。
+
+- 壁の面（セグメント）ごとに、色 + 四角形の InstructionGroup を1回だけ作って覚えておく
+- 1歩ごとに _walls（InstructionGroup）の中身を入れ替えるだけ（新しい図形は作らない）
+- ウィジェットの大きさが変わったときだけ、覚えた図形を捨てて作り直す
+- 遠いほど暗く。奥行き k の枠は、画面の大きさに SHRINK の k 乗を掛けたもの
+- はみ出しは ScissorPush〜Pop で切り取る。Scissor はウィンドウ座標なので to_window で直す
+  （画面＝RelativeLayout が動く遷移中は、画面側から update_scissor を呼んでもらう）
+"""
+from __future__ import annotations
+
+from kivy.graphics import Color, InstructionGroup, Quad, Rectangle, ScissorPop, ScissorPush
+from kivy.uix.widget import Widget
+
+from systems.maps.visibility import Segment, VisibilityTable
+
+# 奥へ1マス進むごとに枠が縮む割合
+SHRINK = 0.55
+
+CEILING_RGB = (0.10, 0.10, 0.14)
+FLOOR_RGB = (0.22, 0.18, 0.14)
+FRONT_RGB = (0.62, 0.56, 0.46)
+SIDE_RGB = (0.48, 0.43, 0.35)
+
+
+class FirstPersonView(Widget):
+    def __init__(self, table: VisibilityTable, **kwargs):
+        super().__init__(**kwargs)
+        self.table = table
+        self._segments: tuple[Segment, ...] = ()
+        self._cache: dict[Segment, InstructionGroup] = {}
+
+        # 横の面はウィジェットの外にはみ出すので、ScissorPush〜Pop で切り取る
+        # （Push と Pop は必ず対で入れておく。大きさ・位置は update_scissor で書きかえるだけ）
+        with self.canvas.before:
+            self._scissor = ScissorPush(x=0, y=0, width=0, height=0)
+        with self.canvas.after:
+            ScissorPop()
+        with self.canvas:
+            Color(*CEILING_RGB, 1)
+            self._ceiling = Rectangle()
+            Color(*FLOOR_RGB, 1)
+            self._floor = Rectangle()
+        self._walls = InstructionGroup()
+        self.canvas.add(self._walls)
+
+        self.bind(pos=self._on_resize, size=self._on_resize)
+
+    def show(self, x: int, y: int, facing: str) -> None:
+        """(x, y) から facing を向いた景色にする（表を1回引くだけ）"""
+        segments = self.table.segments(x, y, facing)
+        if segments == self._segments:
+            return
+        self._segments = segments
+        self._rebuild_walls()
+
+    # --- 描画 ---
+    def update_scissor(self, *args) -> None:
+        """切り取る四角をウィンドウ座標で合わせる（親の RelativeLayout が動いたときも呼ぶ）"""
+        wx, wy = self.to_window(self.x, self.y)
+        self._scissor.pos = (int(wx), int(wy))
+        self._scissor.size = (int(self.width), int(self.height))
+
+    def _on_resize(self, *args) -> None:
+        self.update_scissor()
+        half = self.height / 2
+        self._ceiling.pos = (self.x, self.y + half)
+        self._ceiling.size = (self.width, half)
+        self._floor.pos = self.pos
+        self._floor.size = (self.width, half)
+        # 形は大きさで決まるので、覚えていた図形は使えない
+        self._cache.clear()
+        self._rebuild_walls()
+
+    def _rebuild_walls(self) -> None:
+        self._walls.clear()
+        for segment in self._segments:
+            group = self._cache.get(segment)
+            if group is None:
+                group = self._cache[segment] = self._build_segment(segment)
+            self._walls.add(group)
+
+    def _frame(self, k: int) -> tuple[float, float, float, float]:
+        """奥行き k の境目の枠 (left, bottom, right, top)"""
+        s = SHRINK ** k
+        hw, hh = self.width / 2 * s, self.height / 2 * s
+        cx, cy = self.center
+        return cx - hw, cy - hh, cx + hw, cy + hh
+
+    def _build_segment(self, segment: Segment) -> InstructionGroup:
+        kind, k, lateral = segment
+        group = InstructionGroup()
+        shade = 1.0 / (1.0 + 0.45 * k)
+
+        if kind == "front":
+            left, bottom, right, top = self._frame(k)
+            width = right - left
+            group.add(Color(*(c * shade for c in FRONT_RGB), 1))
+            group.add(Rectangle(pos=(left + lateral * width, bottom), size=(width, top - bottom)))
+            return group
+
+        # side: 奥行き k と k+1 の枠の間の台形
+        l0, b0, r0, t0 = self._frame(k)
+        l1, b1, r1, t1 = self._frame(k + 1)
+        group.add(Color(*(c * shade for c in SIDE_RGB), 1))
+        if lateral < 0:
+            points = (l0, b0, l1, b1, l1, t1, l0, t0)
+        else:
+            points = (r0, b0, r0, t0, r1, t1, r1, b1)
+        group.add(Quad(points=points))
+        return group
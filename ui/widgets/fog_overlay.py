@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+目的: まだ行っていないマスを暗くする「霧」を、1マス=1ピクセルのテクスチャで重ねる。
+なぜ: 1歩ごとに霧を全部描き直すと、大きいマップほど重くなるため。
+
+- 霧の色は bytearray（1マス4byte, RGBA）に持っておき、最初に1回だけテクスチャへ書く
+  最初の bytearray は ExplorationMap のビット列から1byte（8マス）ずつ表引きで作る（1マスずつ見ない）
+- 新しく分かったマスは、それを囲む四角だけを blit_buffer で部分転送する
+- どこが分かったかは ExplorationMap（systems/maps/exploration.py）が覚えている。ここは見た目だけ
+- 座標は MapWidget と同じ左下原点（テクスチャと同じ向きなので、ひっくり返さない）
+"""
+from __future__ import annotations
+
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
+
+from systems.maps.exploration import ExplorationMap
+
+FOG_RGBA = bytes((0, 0, 0, 160))
+
+# これより大きいマップは霧を描かない（テクスチャの大きさの上限。印は付け続ける）
+MAX_FOG_SIZE = 4096
+
+
+class FogOverlay:
+    """MapWidget・Minimap の canvas に instructions を入れて使う（Widget ではない）"""
+
+    def __init__(self, exploration: ExplorationMap, rgba: bytes = FOG_RGBA):
+        self.exploration = exploration
+        w, h = exploration.width, exploration.height
+        # ビット列の1byte（8マスぶん、下位ビットから）→ 32byte の RGBA。行ったマスは透明
+        clear = rgba[:3] + b"\x00"
+        table = [
+            b"".join(clear if bits & (1 << i) else rgba for i in range(8))
+            for bits in range(256)
+        ]
+        self._buf = bytearray(b"".join(map(table.__getitem__, exploration.bits)))
+        del self._buf[w * h * 4:]  # 最後の byte の余りのビット
+
+        self._texture = Texture.create(size=(w, h), colorfmt="rgba")
+        self._texture.mag_filter = "nearest"
+        self._texture.min_filter = "nearest"
+        self._texture.blit_buffer(bytes(self._buf), colorfmt="rgba", bufferfmt="ubyte")
+
+        self._rect = Rectangle(texture=self._texture)
+        self.instructions = (Color(1, 1, 1, 1), self._rect)
+
+    @staticmethod
+    def supports(exploration: ExplorationMap) -> bool:
+        return exploration.width <= MAX_FOG_SIZE and exploration.height <= MAX_FOG_SIZE
+
+    def set_geometry(self, pos: tuple[float, float], size: tuple[float, float]) -> None:
+        self._rect.pos = pos
+        self._rect.size = size
+
+    def reveal(self, area: tuple[int, int, int, int]) -> None:
+        """area = (x0, y0, x1, y1)（両端を含む）の霧を、今の ExplorationMap に合わせて書き直す"""
+        x0, y0, x1, y1 = area
+        w = self.exploration.width
+        rows = []
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                if self.exploration.is_explored(x, y):
+                    self._buf[(y * w + x) * 4 + 3] = 0
+            rows.append(self._buf[(y * w + x0) * 4:(y * w + x1 + 1) * 4])
+        self._texture.blit_buffer(
+            b"".join(rows), pos=(x0, y0), size=(x1 - x0 + 1, y1 - y0 + 1),
+            colorfmt="rgba", bufferfmt="ubyte",
+        )
@@ -3,130 +3,279 @@
 from __future__ import annotations
 from pathlib import Path
 
-from kivy.core.image import Image as CoreImage
-from kivy.core.window import Window
-from kivy.graphics import Color, Rectangle
+from kivy.clock import Clock
+from kivy.graphics import Color, InstructionGroup, PopMatrix, PushMatrix, Rectangle, Translate
 from kivy.uix.widget import Widget
 
-import random
+from data.input.controller import DIRECTIONS, PlayerController
+from systems.assets.texture_cache import texture_cache
+from systems.events.events_loader import MapEvent, MapEvents
+from systems.input.dispatcher import input_dispatcher
+from systems.maps.collision import PackedGrid
+from systems.maps.region_stream import StreamedGrid
+from systems.maps.encounters import EncounterTable
+from systems.maps.exploration import ExplorationMap
+from systems.maps.pathfinding import Pathfinder
+from systems.rng import rng_service
+from ui.widgets.fog_overlay import FogOverlay
+from ui.widgets.tilemap_renderer import TileMapRenderer
+
+# 1歩ごとに「行った」ことにする範囲（プレイヤーを中心に一辺 2*REVEAL_RADIUS+1 マス）
+REVEAL_RADIUS = 3
 
 
 class MapWidget(Widget):
     """
     MapWidget
     - 背景画像(view_path)を表示する
-    - collision(0/1)で移動可否を判定する
+      tile_layer（map_data.json のタイル）があれば、チャンク描画 + プレイヤー追従カメラにする
+    - collision(PackedGrid: 0/1)で移動可否を判定する
+      StreamedGrid（地域ごとに分けた大きいワールド）なら、歩くたびに周りの地域だけ読み込む
     - start_cell が渡されたら、そのセルを開始位置にする
+    - 移動は PlayerController（押しっぱなし + 固定タイムステップ + マス間の補間）
     - Town は右端だけ Field へ出る
-    - Field では一定歩数で戦闘へ入る
+    - encounters（EncounterTable）があれば、地域ごとの歩数で戦闘へ入る
+    - find_path / walk_to で道順を探して自動で歩く（当たり判定が PackedGrid のときだけ）
+    - events（MapEvents）があれば、1歩ごとに「乗ったマス」、決定キーで「向いているマス」を引く
+      （辞書を1回引くだけなので、イベントがいくつあっても同じ手間）
+      起きたイベントは on_map_event で外へ知らせる（会話の表示は MapScreen の仕事）
+    - 今いるマスが変わったら on_player_cell(x, y)、新しく行ったマスがあれば on_explored(area) で
+      知らせる（ミニマップなどHUD用。area は新しく分かったマスを囲む四角）
+    - exploration（ExplorationMap）があれば、1歩ごとに周りのマスへ「行った」印を付け、
+      まだ行っていない所に霧（FogOverlay）を重ねる。書き直すのは新しく分かった四角だけ
     """
 
     def __init__(
         self,
         *,
         view_path: Path,
-        collision: list[list[int]] | None,
+        collision: PackedGrid | StreamedGrid | None,
         start_cell: tuple[int, int] | None = None,
+        encounters: EncounterTable | None = None,
+        tile_layer: dict | None = None,
+        events: MapEvents | None = None,
+        exploration: ExplorationMap | None = None,
         **kwargs,
     ):
+        self.register_event_type("on_map_event")
+        self.register_event_type("on_player_cell")
+        self.register_event_type("on_explored")
         super().__init__(**kwargs)
 
-        self.player_tex = None
+        # テクスチャは texture_cache が持つ（画面を出入りしてもデコードは1回だけ）
         player_path = Path(__file__).resolve().parent.parent.parent / "assets" / "images" / "brave_man.png"
-        if player_path.exists():
-            try:
-                self.player_tex = CoreImage(str(player_path)).texture
-            except Exception as e:
-                print(f"[WARN] player image load failed: {player_path} ({e})")
-                self.player_tex = None
+        self.player_tex = texture_cache.get(player_path)
 
         # 入力保持
         self.view_path = Path(view_path)
         self.collision = collision
         self.start_cell = start_cell
-
-        # グリッドサイズ確定
-        if self.collision:
-            self.grid_h = len(self.collision)
-            self.grid_w = len(self.collision[0])
-        else:
-            # フォールバック
-            self.grid_w = 40
-            self.grid_h = 32
+        self.encounters = encounters
+        self.events = events
+        self.tile_layer = tile_layer
+        # 表示中のメッセージ（advance() を持つもの）。出ている間は歩かない
+        self.message = None
+        # 登録している画面名（InputDispatcher 用）
+        self._screen_name = ""
+        self._update_grid_size()
 
         # 開始位置確定
-        if start_cell is not None:
-            self.px, self.py = start_cell
-        else:
-            self.px = max(0, min(self.grid_w - 1, self.grid_w // 2))
-            self.py = max(0, min(self.grid_h - 1, self.grid_h // 2))
+        self.px, self.py = self._initial_cell()
+        self._stream_focus(wait=True)
 
         # 歩数カウンタ
         self.steps = 0
 
-        # 背景テクスチャ読み込み
-        self.bg_tex = None
-        if self.view_path.exists():
-            try:
-                self.bg_tex = CoreImage(str(self.view_path)).texture
-            except Exception as e:
-                print(f"[WARN] map image load failed: {self.view_path} ({e})")
-                self.bg_tex = None
-        else:
-            print(f"[WARN] map image not found: {self.view_path}")
+        # 移動（Clock は歩いている間だけ回す）
+        self.controller = PlayerController(self)
+        self._tick_event = None
 
-        # 描画
-        with self.canvas:
-            self._bg_color = Color(1, 1, 1, 1)
-            self._bg = Rectangle(pos=self.pos, size=self.size, texture=self.bg_tex)
+        # 道順探し（最初に使うときに作る。当たり判定・イベントが変わったら作り直す）
+        self._pathfinder: Pathfinder | None = None
+        # 上の Pathfinder を作ったときの events（差し替えられたら作り直す）
+        self._pathfinder_events: MapEvents | None = None
 
-            self._player_color = Color(1, 1, 1, 1)
-            self._player = Rectangle(pos=(0, 0), size=(0, 0), texture=self.player_tex)
+        # 背景テクスチャ読み込み（タイル描画のときは使わない）
+        self.bg_tex = None if tile_layer else texture_cache.get(self.view_path)
+
+        # 描画
+        # 背景(1枚絵) → [カメラ移動 → タイルのチャンク → 霧 → プレイヤー] の順
+        self._bg_color = Color(1, 1, 1, 1)
+        self._bg = Rectangle(pos=self.pos, size=self.size, texture=self.bg_tex)
+        self._camera = Translate(0, 0)
+        self._tile_group = InstructionGroup()
+        self._fog_group = InstructionGroup()
+        self._player_color = Color(1, 1, 1, 1)
+        self._player = Rectangle(pos=(0, 0), size=(0, 0), texture=self.player_tex)
+        for instruction in (self._bg_color, self._bg, PushMatrix(), self._camera,
+                            self._tile_group, self._fog_group, self._player_color, self._player, PopMatrix()):
+            self.canvas.add(instruction)
+
+        self.tilemap = None
+        if tile_layer:
+            self.tilemap = TileMapRenderer(self._tile_group, **tile_layer)
+
+        # 行ったマスの印と霧
+        self.exploration: ExplorationMap | None = None
+        self._fog: FogOverlay | None = None
+        self.set_exploration(exploration)
 
         self.bind(pos=self._sync, size=self._sync)
         self._sync()
 
-        # キー入力
-        Window.bind(on_key_down=self._on_key)
+    def _update_grid_size(self) -> None:
+        """グリッドサイズ確定"""
+        if self.collision:
+            self.grid_h = self.collision.height
+            self.grid_w = self.collision.width
+        elif self.tile_layer:
+            self.grid_h = len(self.tile_layer["tiles"])
+            self.grid_w = len(self.tile_layer["tiles"][0])
+        else:
+            # フォールバック
+            self.grid_w = 40
+            self.grid_h = 32
+
+    def _initial_cell(self) -> tuple[int, int]:
+        if self.start_cell is not None:
+            return self.start_cell
+        return (
+            max(0, min(self.grid_w - 1, self.grid_w // 2)),
+            max(0, min(self.grid_h - 1, self.grid_h // 2)),
+        )
+
+    def reset(self, *, start_cell: tuple[int, int] | None = None, keep_position: bool = False) -> None:
+        """
+        画面に入り直したときに呼ぶ（再利用モード）。
+        テクスチャやキャンバスは作り直さず、位置と歩数だけ戻す。
+        keep_position=True なら前回の位置・歩数のまま続ける。
+        """
+        self._stop_moving()
+        if keep_position:
+            self._sync_player()
+            self.dispatch("on_player_cell", self.px, self.py)
+            return
+        self.start_cell = start_cell
+        self.px, self.py = self._initial_cell()
+        self._stream_focus(wait=True)
+        self.steps = 0
+        self._explore()
+        self._sync_player()
+        self.dispatch("on_player_cell", self.px, self.py)
+
+    def set_collision(self, collision: PackedGrid | StreamedGrid | None) -> None:
+        """当たり判定を差し替える（CSVが更新されたときだけ呼ばれる想定）"""
+        if collision is self.collision:
+            return
+        self.collision = collision
+        self._pathfinder = None
+        self._update_grid_size()
+        self.px = max(0, min(self.grid_w - 1, self.px))
+        self.py = max(0, min(self.grid_h - 1, self.py))
+        self._stream_focus(wait=True)
+        self._sync()
+
+    def set_exploration(self, exploration: ExplorationMap | None) -> None:
+        """行ったマスの記録を差し替える（霧のテクスチャはマップが変わったときだけ作り直す）"""
+        if exploration is self.exploration:
+            return
+        self.exploration = exploration
+        self._fog = None
+        self._fog_group.clear()
+        if exploration is not None and FogOverlay.supports(exploration):
+            self._fog = FogOverlay(exploration)
+            for instruction in self._fog.instructions:
+                self._fog_group.add(instruction)
+        self._explore()
+        self._sync_fog()
+
+    def _explore(self) -> None:
+        """今いるマスの周りに印を付け、新しく分かった四角だけ霧を晴らす"""
+        if self.exploration is None:
+            return
+        area = self.exploration.mark_area(self.px, self.py, REVEAL_RADIUS)
+        if area is None:
+            return
+        if self._fog is not None:
+            self._fog.reveal(area)
+            self.canvas.ask_update()
+        self.dispatch("on_explored", area)
+
+    def _sync_fog(self) -> None:
+        if self._fog is None:
+            return
+        if self.tilemap is not None:
+            # タイル描画のときはワールド座標（カメラの Translate の内側）
+            self._fog.set_geometry((0, 0), self.tilemap.world_size)
+        else:
+            self._fog.set_geometry(self.pos, self.size)
+
+    def _stream_focus(self, *, wait: bool = False) -> None:
+        """地域ストリーミングのときだけ、今いる場所の周りを読ませる（遠くは捨てられる）"""
+        update_focus = getattr(self.collision, "update_focus", None)
+        if update_focus is not None:
+            update_focus(self.px, self.py, wait=wait)
 
     def on_parent(self, *args):
-        """親から外れたらキー入力解除。"""
+        """画面に載ったらキー入力を受け取る登録、外れたら解除。"""
         if self.parent is None:
-            try:
-                Window.unbind(on_key_down=self._on_key)
-            except Exception:
-                pass
-
-    def _cell_to_world(self, cx: int, cy: int) -> tuple[float, float]:
+            self._stop_moving()
+            self.close_message()
+            input_dispatcher.unregister(self._screen_name, self)
+            return
+        self._screen_name = getattr(self.parent, "name", "")
+        input_dispatcher.register(self._screen_name, self)
+
+    def _cell_size(self) -> tuple[float, float]:
+        if self.tilemap is not None:
+            return self.tilemap.tile_size, self.tilemap.tile_size
+        return self.width / self.grid_w, self.height / self.grid_h
+
+    def _cell_to_world(self, cx: float, cy: float) -> tuple[float, float]:
         """
-        セル座標 -> Widget座標
+        セル座標 -> Widget座標（タイル描画のときはワールド座標。ずらすのはカメラ）
         内部座標は左下原点。
         """
-        cell_w = self.width / self.grid_w
-        cell_h = self.height / self.grid_h
+        cell_w, cell_h = self._cell_size()
+        if self.tilemap is not None:
+            return cx * cell_w, cy * cell_h
 
         x = self.x + cx * cell_w
         y = self.y + cy * cell_h
         return x, y
 
     def _sync(self, *args):
-        """背景とプレイヤー位置を再描画。"""
+        """背景とプレイヤー位置を再描画（位置・サイズが変わったとき）。"""
         self._bg.pos = self.pos
-        self._bg.size = self.size
+        # タイル描画のときは1枚絵を出さない
+        self._bg.size = (0, 0) if self.tilemap is not None else self.size
         self._bg.texture = self.bg_tex
+        self._player.texture = self.player_tex
+        self._sync_fog()
+        self._sync_player()
 
-        cell_w = self.width / self.grid_w
-        cell_h = self.height / self.grid_h
+    def _sync_player(self):
+        """プレイヤーの四角形だけ動かす（移動中は1フレームに1回だけ呼ばれる）。"""
+        cell_w, cell_h = self._cell_size()
 
-        wx, wy = self._cell_to_world(self.px, self.py)
+        # 移動中はマスとマスの間を補間した位置
+        wx, wy = self._cell_to_world(*self.controller.render_cell())
         pad_x = cell_w * 0.10
         pad_y = cell_h * 0.10
 
         self._player.pos = (wx + pad_x, wy + pad_y)
         self._player.size = (cell_w - pad_x * 2, cell_h - pad_y * 2)
 
-        self._player.texture = self.player_tex
+        if self.tilemap is not None:
+            self._update_camera(wx + cell_w / 2, wy + cell_h / 2)
 
+    def _update_camera(self, focus_x: float, focus_y: float) -> None:
+        """プレイヤーを画面の中央に（マップの端では止める）。描くのは映るチャンクだけ。"""
+        world_w, world_h = self.tilemap.world_size
+        cam_x = max(0.0, min(focus_x - self.width / 2, world_w - self.width))
+        cam_y = max(0.0, min(focus_y - self.height / 2, world_h - self.height))
+        self._camera.xy = (self.x - cam_x, self.y - cam_y)
+        self.tilemap.update_view(cam_x, cam_y, self.width, self.height)
 
     def _can_walk(self, nx: int, ny: int) -> bool:
         """
@@ -134,86 +283,180 @@ class MapWidget(Widget):
 
         CSVは上から下へ並ぶ。
         内部座標は下から上へ増える。
-        なので参照時だけ row を変換する。
+        row の変換は PackedGrid.is_blocked がやってくれる。
         """
         if not (0 <= nx < self.grid_w and 0 <= ny < self.grid_h):
             return False
 
+        if self.events is not None and self.events.is_blocked(nx, ny):
+            return False
+
         if not self.collision:
             return True
 
-        csv_row = self.grid_h - 1 - ny
-        return self.collision[csv_row][nx] == 0
+        return not self.collision.is_blocked(nx, ny)
+
+    # PlayerController から呼ばれる名前
+    can_walk = _can_walk
 
-    def _on_key(self, _w, key, scancode, codepoint, modifiers):
-        # 今表示中の Screen でなければ反応しない
-        if not self.parent or not self.parent.manager:
+    def find_path(self, goal: tuple[int, int], start: tuple[int, int] | None = None):
+        """
+        start（省略時は今いるマス）から goal までのマスの列。行けなければ None。
+        地域ストリーミングのワールドは全体を持たないので対象外（None）。
+        """
+        if not isinstance(self.collision, PackedGrid):
+            return None
+        if self._pathfinder is None or self._pathfinder_events is not self.events:
+            # NPC など通れないイベントのマスも壁として前計算に入れる（途中で止まる道を作らない）
+            blocked = self.events.solid_cells() if self.events is not None else ()
+            self._pathfinder = Pathfinder(self.collision, blocked=blocked)
+            self._pathfinder_events = self.events
+        return self._pathfinder.find_path(start or (self.px, self.py), goal)
+
+    def walk_to(self, goal: tuple[int, int]) -> bool:
+        """goal まで自動で歩き始める。道が無ければ False。"""
+        path = self.find_path(goal)
+        if not path:
             return False
-        if self.parent.manager.current != self.parent.name:
+        self.controller.follow(path)
+        self._start_moving()
+        return True
+
+    def accepts_input(self, action: str) -> bool:
+        """InputDispatcher から: 方向と決定だけ受け取る（Esc などは Window に返す）"""
+        return action in DIRECTIONS or action == "confirm"
+
+    def on_input(self, action: str, pressed: bool) -> None:
+        """表示中の画面のときだけ InputDispatcher から呼ばれる"""
+        if action == "confirm":
+            if not pressed:
+                return
+            # 決定キー: メッセージが出ていれば送る / 無ければ目の前を調べる
+            if self.message is not None:
+                if not self.message.advance():
+                    self.close_message()
+                return
+            self.controller.handle_action()
+            return
+
+        # 方向（押されている間だけ歩く。キーリピートは無視される）
+        if not pressed:
+            self.controller.release(action)
+            return
+        if self.message is not None:
+            return
+        self.controller.press(action)
+        self._start_moving()
+
+    # ----------------------------
+    # 移動ループ（Clock）
+    # ----------------------------
+    def _start_moving(self):
+        if self._tick_event is None:
+            self._tick_event = Clock.schedule_interval(self._tick, 0)
+
+    def _stop_moving(self):
+        self.controller.stop()
+        if self._tick_event is not None:
+            self._tick_event.cancel()
+            self._tick_event = None
+
+    def _tick(self, dt):
+        self.controller.update(dt)
+        # キャンバス更新は1フレームに1回だけ
+        self._sync_player()
+        if self.controller.idle:
+            self._tick_event = None
             return False
-
-        dx = dy = 0
-
-        # 矢印キー
-        if key == 273:          # Up
-            dy = 1
-        elif key == 274:        # Down
-            dy = -1
-        elif key == 276:        # Left
-            dx = -1
-        elif key == 275:        # Right
-            dx = 1
-        else:
-            # WASD
-            if codepoint in ("w", "W"):
-                dy = 1
-            elif codepoint in ("s", "S"):
-                dy = -1
-            elif codepoint in ("a", "A"):
-                dx = -1
-            elif codepoint in ("d", "D"):
-                dx = 1
-            else:
-                return False
-
-        nx, ny = self.px + dx, self.py + dy
-
-        if self._can_walk(nx, ny):
-            self.px, self.py = nx, ny
-            self._sync()
-            self.steps += 1
-
-            screen_name = getattr(self.parent, "name", "")
-
-            # Town は右端だけ Field へ
-            if screen_name == "town":
-                if self.px == self.grid_w - 1:
-                    if self.parent and self.parent.manager:
-                        self.parent.manager.current = "field"
-                        
-                        if hasattr(self.parent.manager, "play_screen_bgm"):
-                            self.parent.manager.play_screen_bgm("field")
-
-                    return True
-
-            # Field は左端で Town へ戻る
-            if screen_name == "field":
-                if self.px == 0:
-                    if self.parent and self.parent.manager:
-                        self.parent.manager.current = "town"
-                        if hasattr(self.parent.manager, "play_screen_bgm"):
-                            self.parent.manager.play_screen_bgm("town")                       
-                    return True
-
-                # Fieldだけ一定歩数で戦闘
-                if self.steps >= 10:
-                    self.steps = 0
-                    if self.parent and self.parent.manager:
-                        sc = self.parent.manager
-                        player = sc.get_player_status()
-                        enemy_id = random.choice(["slime", "knight", "goblin", "zoma"])
-                        enemy, enemy_info = sc.load_enemy_status(enemy_id)
-                        sc.start_battle(enemy=enemy, player=player, enemy_info=enemy_info)
-                    return True
-
-        return True
\ No newline at end of file
+        return True
+
+    # ----------------------------
+    # イベント
+    # ----------------------------
+    def trigger_event(self, event: MapEvent) -> None:
+        """イベントを起こす（PlayerController.handle_action / on_arrive から）"""
+        if self.events is not None:
+            self.events.mark_fired(event)
+        if event.type == "battle" and event.enemy_id:
+            self.controller.stop()
+            self._start_battle(event.enemy_id)
+            return
+        self.dispatch("on_map_event", event)
+
+    def on_player_cell(self, x: int, y: int) -> None:
+        """既定では何もしない（MapScreen が bind してミニマップの印を動かす）"""
+
+    def on_explored(self, area: tuple[int, int, int, int]) -> None:
+        """既定では何もしない（MapScreen が bind してミニマップの霧を晴らす）"""
+
+    def on_map_event(self, event: MapEvent) -> None:
+        """既定では何もしない（MapScreen が bind してメッセージを出す）"""
+
+    def show_message(self, window, lines) -> None:
+        """window（MessageWindow）を重ねてセリフを出す。閉じるまで歩けない。"""
+        self.controller.stop()
+        window.show_message(lines)
+        if window.parent is None and self.parent is not None:
+            self.parent.add_widget(window)
+        self.message = window
+
+    def close_message(self) -> None:
+        if self.message is not None and self.message.parent is not None:
+            self.message.parent.remove_widget(self.message)
+        self.message = None
+
+    def _start_battle(self, enemy_id: str) -> None:
+        if self.parent and self.parent.manager:
+            sc = self.parent.manager
+            sc.enemies.reload_if_changed()
+            if enemy_id not in sc.enemies:
+                print(f"[WARN] unknown enemy id: {enemy_id} (battle skipped)")
+                return
+            player = sc.get_player_status()
+            enemy, enemy_info = sc.load_enemy_status(enemy_id)
+            sc.start_battle(enemy=enemy, player=player, enemy_info=enemy_info)
+
+    def on_arrive(self):
+        """1マス歩き終えたとき（PlayerController から呼ばれる）"""
+        self.steps += 1
+        self._stream_focus()
+        self._explore()
+        self.dispatch("on_player_cell", self.px, self.py)
+
+        # 乗ったマスのイベント（看板の前・門など。マスの辞書を1回引くだけ）
+        if self.events is not None:
+            stepped = self.events.stepped_on(self.px, self.py)
+            if stepped:
+                self.trigger_event(stepped[0])
+                return
+
+        screen_name = getattr(self.parent, "name", "")
+
+        # Town は右端だけ Field へ
+        if screen_name == "town":
+            if self.px == self.grid_w - 1:
+                self.controller.stop()
+                if self.parent and self.parent.manager:
+                    self.parent.manager.current = "field"
+
+                    if hasattr(self.parent.manager, "play_screen_bgm"):
+                        self.parent.manager.play_screen_bgm("field")
+                return
+
+        # Field は左端で Town へ戻る
+        if screen_name == "field":
+            if self.px == 0:
+                self.controller.stop()
+                if self.parent and self.parent.manager:
+                    self.parent.manager.current = "town"
+                    if hasattr(self.parent.manager, "play_screen_bgm"):
+                        self.parent.manager.play_screen_bgm("town")
+                return
+
+        # エンカウント表があるマップだけ、地域ごとの歩数で戦闘（表を引くだけの O(1)）
+        if self.encounters is not None:
+            enemy_id = self.encounters.roll(self.px, self.py, self.steps, rng_service.stream("encounter"))
+            if enemy_id is not None:
+                self.steps = 0
+                self.controller.stop()
+                self._start_battle(enemy_id)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+目的: 画面のすみに出す小さな地図（ミニマップ）。
+なぜ: 1歩ごとに地図を描き直すと重いので、地図は1回だけ絵にして、動かすのは現在地の印だけにするため。
+
+- 当たり判定（PackedGrid）から「1マス=1ピクセル」のテクスチャを1回だけ作ってGPUへ送る
+  同じCSVなら画面を作り直してもテクスチャは使い回す（_TEXTURES）
+- 1歩ごとの仕事は、印の Rectangle.pos を1回書きかえるだけ
+- Compass と同じく、プロパティ（cell = (x, y)）が変わると表示が追いつく
+- 行ったマスの記録（ExplorationMap）を渡すと、まだ行っていない所は FogOverlay で隠す
+  （MapWidget と同じ記録を読む。新しく分かった四角だけ reveal で部分転送する）
+"""
+from __future__ import annotations
+
+from kivy.graphics import Color, InstructionGroup, Rectangle
+from kivy.graphics.texture import Texture
+from kivy.properties import ObjectProperty
+from kivy.uix.widget import Widget
+
+from systems.maps.collision import PackedGrid
+from systems.maps.exploration import ExplorationMap
+from ui.widgets.fog_overlay import FogOverlay
+
+WALL_RGBA = bytes((70, 60, 50, 255))
+FLOOR_RGBA = bytes((190, 200, 170, 255))
+MARKER_RGB = (0.95, 0.25, 0.2)
+# まだ行っていないマス（ミニマップでは透けさせずに隠す）
+UNKNOWN_RGBA = bytes((20, 20, 24, 255))
+
+# 印はマスより小さくならないように（小さい画面でも見えるように）
+MIN_MARKER_SIZE = 3
+
+# (CSVのパス, 更新時刻, サイズ) → テクスチャ。CSVが変わらなければ作り直さない
+_TEXTURES: dict[tuple[str, int, int], Texture] = {}
+
+
+def minimap_texture(grid: PackedGrid) -> Texture:
+    """当たり判定から1マス=1ピクセルのテクスチャを作る（同じCSVなら2回目からは作らない）"""
+    key = (str(grid.path), grid.src_mtime_ns, grid.src_size)
+    texture = _TEXTURES.get(key)
+    if texture is not None:
+        return texture
+
+    w, h = grid.width, grid.height
+    buf = bytearray(w * h * 4)
+    # テクスチャは下の行から。PackedGrid.is_blocked も y=0 が下なのでそのまま並べる
+    for y in range(h):
+        for x in range(w):
+            i = (y * w + x) * 4
+            buf[i:i + 4] = WALL_RGBA if grid.is_blocked(x, y) else FLOOR_RGBA
+
+    texture = Texture.create(size=(w, h), colorfmt="rgba")
+    texture.mag_filter = "nearest"
+    texture.min_filter = "nearest"
+    texture.blit_buffer(bytes(buf), colorfmt="rgba", bufferfmt="ubyte")
+    _TEXTURES[key] = texture
+    return texture
+
+
+class Minimap(Widget):
+    # 今いるマス (x, y)。まとめて1つのプロパティにして、1歩で印の pos を1回だけ書く
+    cell = ObjectProperty((0, 0))
+
+    def __init__(self, grid: PackedGrid | None = None, exploration: ExplorationMap | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.grid: PackedGrid | None = None
+        self.exploration: ExplorationMap | None = None
+        self._fog: FogOverlay | None = None
+        self._cell = 0.0
+        self._origin = (0.0, 0.0)
+
+        with self.canvas:
+            Color(0, 0, 0, 0.5)
+            self._frame = Rectangle()
+            Color(1, 1, 1, 0.9)
+            self._map = Rectangle()
+        self._fog_group = InstructionGroup()
+        self.canvas.add(self._fog_group)
+        with self.canvas:
+            Color(*MARKER_RGB, 1)
+            self._marker = Rectangle(size=(0, 0))
+
+        # ★ヒント: 現在地が変わったら印だけ動かす（地図の絵はそのまま）。
+        self.bind(cell=self._update_marker)
+        self.bind(pos=self._layout, size=self._layout)
+        self.set_grid(grid)
+        self.set_exploration(exploration)
+
+    def set_grid(self, grid: PackedGrid | None) -> None:
+        """地図を差し替える（PackedGrid 以外＝地域ストリーミングの大きいワールドは出さない）"""
+        if not isinstance(grid, PackedGrid):
+            grid = None
+        if grid is self.grid:
+            return
+        self.grid = grid
+        self._map.texture = minimap_texture(grid) if grid is not None else None
+        self._layout()
+
+    def set_exploration(self, exploration: ExplorationMap | None) -> None:
+        """行ったマスの記録を差し替える（霧のテクスチャは記録が変わったときだけ作る）"""
+        if exploration is self.exploration:
+            return
+        self.exploration = exploration
+        self._fog = None
+        self._fog_group.clear()
+        if exploration is not None and FogOverlay.supports(exploration):
+            self._fog = FogOverlay(exploration, UNKNOWN_RGBA)
+            for instruction in self._fog.instructions:
+                self._fog_group.add(instruction)
+        self._layout()
+
+    def reveal(self, area: tuple[int, int, int, int]) -> None:
+        """MapWidget.on_explored から。新しく分かった四角だけ霧を晴らす"""
+        if self._fog is not None:
+            self._fog.reveal(area)
+            self.canvas.ask_update()
+
+    def set_player(self, x: int, y: int) -> None:
+        self.cell = (x, y)
+
+    def _layout(self, *args) -> None:
+        if self.grid is None:
+            self._frame.size = self._map.size = self._marker.size = (0, 0)
+            if self._fog is not None:
+                self._fog.set_geometry(self.pos, (0, 0))
+            return
+        w, h = self.grid.width, self.grid.height
+        self._cell = min(self.width / w, self.height / h)
+        size = (self._cell * w, self._cell * h)
+        self._origin = (self.right - size[0], self.top - size[1])  # 右上に寄せる
+        self._frame.pos = self._map.pos = self._origin
+        self._frame.size = self._map.size = size
+        if self._fog is not None:
+            self._fog.set_geometry(self._origin, size)
+        marker = max(self._cell, MIN_MARKER_SIZE)
+        self._marker.size = (marker, marker)
+        self._update_marker()
+
+    def _update_marker(self, *args) -> None:
+        if self.grid is None:
+            return
+        # マスの中心に印の中心を合わせる
+        x, y = self.cell
+        offset = (self._cell - self._marker.size[0]) / 2
+        self._marker.pos = (
+            self._origin[0] + x * self._cell + offset,
+            self._origin[1] + y * self._cell + offset,
+        )
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+目的: タイルマップを「チャンク（16×16タイルのかたまり）」単位で描く。
+なぜ: 画面より大きいマップでも、描く量を「画面に映っている分」だけにするため。
+
+- チャンクは最初に映ったときに1回だけ作る（InstructionGroup。以後は作り直さない）
+- カメラが動いても、映るチャンクの組み合わせが変わったときだけ足し引きする
+- 座標はワールド座標（タイル左下が (x*tile_size, y*tile_size)）。カメラは親の Translate が担当
+"""
+from __future__ import annotations
+
+from kivy.graphics import Color, InstructionGroup, Rectangle
+
+from field.map_loader_kivy import tile_region
+
+CHUNK_TILES = 16
+
+
+class TileMapRenderer:
+    """
+    tiles: 2次元リスト（CSVと同じく上の行から順）。-1 は「描かない」
+    group: チャンクを入れる InstructionGroup（MapWidget のキャンバスの中にある）
+    """
+
+    def __init__(self, group: InstructionGroup, *, tiles, tileset, tile_size: int):
+        self.group = group
+        self.tiles = tiles
+        self.tileset = tileset
+        self.tile_size = tile_size
+        self.rows = len(tiles)
+        self.cols = len(tiles[0]) if tiles else 0
+
+        self._chunks: dict[tuple[int, int], InstructionGroup] = {}
+        self._visible: set[tuple[int, int]] = set()
+        self._regions: dict[int, object] = {}
+
+    @property
+    def world_size(self) -> tuple[int, int]:
+        return self.cols * self.tile_size, self.rows * self.tile_size
+
+    def _region(self, tile_id: int):
+        region = self._regions.get(tile_id)
+        if region is None and tile_id not in self._regions:
+            region = tile_region(self.tileset, tile_id, self.tile_size)
+            self._regions[tile_id] = region
+        return region
+
+    def _build_chunk(self, ci: int, cj: int) -> InstructionGroup:
+        """チャンク1つぶんの Rectangle をまとめる（1回だけ）"""
+        ts = self.tile_size
+        chunk = InstructionGroup()
+        chunk.add(Color(1, 1, 1, 1))
+
+        x0, y0 = ci * CHUNK_TILES, cj * CHUNK_TILES
+        for y in range(y0, min(y0 + CHUNK_TILES, self.rows)):
+            # ワールドの y（下が0）→ データの行（上が0）
+            row = self.tiles[self.rows - 1 - y]
+            for x in range(x0, min(x0 + CHUNK_TILES, self.cols)):
+                region = self._region(row[x])
+                if region is not None:
+                    chunk.add(Rectangle(pos=(x * ts, y * ts), size=(ts, ts), texture=region))
+        return chunk
+
+    def update_view(self, left: float, bottom: float, width: float, height: float) -> None:
+        """
+        カメラに映っている範囲（ワールド座標）を渡す。
+        映るチャンクが変わったときだけ group を書き換える。
+        """
+        span = CHUNK_TILES * self.tile_size
+        max_ci = (self.cols - 1) // CHUNK_TILES
+        max_cj = (self.rows - 1) // CHUNK_TILES
+        ci0 = max(0, int(left // span))
+        cj0 = max(0, int(bottom // span))
+        ci1 = min(max_ci, int((left + width) // span))
+        cj1 = min(max_cj, int((bottom + height) // span))
+
+        wanted = {(ci, cj) for ci in range(ci0, ci1 + 1) for cj in range(cj0, cj1 + 1)}
+        if wanted == self._visible:
+            return
+
+        for key in self._visible - wanted:
+            self.group.remove(self._chunks[key])
+        for key in wanted - self._visible:
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._chunks[key] = self._build_chunk(*key)
+            self.group.add(chunk)
+        self._visible = wanted